@@ -0,0 +1,79 @@
+"""Library for reading and writing markdown anchor manifests.
+
+A manifest records the anchors of each markdown file in a repository, so that
+links into that repository can be checked without cloning or parsing it.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import posixpath
+import sys
+from typing import Dict, FrozenSet, Iterable, Mapping, Optional, Set
+
+# Increment when the manifest format changes incompatibly.
+_VERSION = 1
+
+
+class AnchorManifest(object):
+    """Anchors for markdown files, keyed by repository-relative path."""
+
+    def __init__(self, anchors: Mapping[str, Iterable[str]]) -> None:
+        self._anchors: Dict[str, FrozenSet[str]] = {
+            path: frozenset(sys.intern(anchor) for anchor in path_anchors)
+            for path, path_anchors in anchors.items()
+        }
+        # Track directories so that directory links can be resolved.
+        self._dirs: Set[str] = set()
+        for path in self._anchors:
+            parent = posixpath.dirname(path)
+            while parent and parent not in self._dirs:
+                self._dirs.add(parent)
+                parent = posixpath.dirname(parent)
+
+    def get(self, path: str) -> Optional[FrozenSet[str]]:
+        """Returns anchors for the file, or None if it isn't present."""
+        return self._anchors.get(path)
+
+    def is_dir(self, path: str) -> bool:
+        """Returns true if the path is a directory containing files."""
+        return path == "" or path in self._dirs
+
+    def dump(self, path: str) -> None:
+        """Writes the manifest to a file."""
+        data = {
+            "version": _VERSION,
+            "anchors": {
+                file_path: sorted(self._anchors[file_path])
+                for file_path in sorted(self._anchors)
+            },
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.write("\n")
+
+    @classmethod
+    def load(cls, path: str) -> "AnchorManifest":
+        """Reads a manifest from a file."""
+        with open(path) as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get("version") != _VERSION:
+            raise ValueError(
+                "Unsupported anchor manifest version in %s: expected %d"
+                % (path, _VERSION)
+            )
+        return cls(data["anchors"])
@@ -0,0 +1,62 @@
+"""Tests for anchor_manifest.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import tempfile
+import unittest
+
+from pre_commit_hooks import anchor_manifest
+
+
+class TestAnchorManifest(unittest.TestCase):
+    def test_lookup(self) -> None:
+        manifest = anchor_manifest.AnchorManifest(
+            {"README.md": ["intro"], "docs/guide/a.md": ["foo", "bar"]}
+        )
+        self.assertEqual(manifest.get("README.md"), frozenset(["intro"]))
+        self.assertEqual(manifest.get("docs/guide/a.md"), {"foo", "bar"})
+        self.assertIsNone(manifest.get("docs/b.md"))
+        self.assertTrue(manifest.is_dir(""))
+        self.assertTrue(manifest.is_dir("docs"))
+        self.assertTrue(manifest.is_dir("docs/guide"))
+        self.assertFalse(manifest.is_dir("docs/guide/a.md"))
+        self.assertFalse(manifest.is_dir("other"))
+
+    def test_round_trip(self) -> None:
+        manifest = anchor_manifest.AnchorManifest({"a.md": ["y", "x"]})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "anchors.json")
+            manifest.dump(path)
+            with open(path) as f:
+                self.assertEqual(
+                    f.read(), '{"version":1,"anchors":{"a.md":["x","y"]}}\n'
+                )
+            loaded = anchor_manifest.AnchorManifest.load(path)
+        self.assertEqual(loaded.get("a.md"), frozenset(["x", "y"]))
+
+    def test_bad_version(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "anchors.json")
+            with open(path, "w") as f:
+                f.write('{"version":0,"anchors":{}}')
+            self.assertRaisesRegex(
+                ValueError,
+                "Unsupported anchor manifest version",
+                anchor_manifest.AnchorManifest.load,
+                path,
+            )
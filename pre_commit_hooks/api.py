@@ -0,0 +1,146 @@
+"""A Python API for running hooks in-process.
+
+Unlike the command-line hooks, checks neither print, write files, nor exit:
+they return findings and fixed contents, for services that check many
+documents without starting a process for each. For example:
+
+    checker = api.Checker(hooks=["check-links"], repo_root="/path/to/repo")
+    result = checker.check("docs/index.md")
+    for finding in result.findings:
+        print(finding.line, finding.message)
+
+Files are read through `vfs.current()`, so documents that aren't on disk can
+be checked by layering a `vfs.MemoryFileSystem` over the disk.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from pre_commit_hooks import check_copyright
+from pre_commit_hooks import check_links
+from pre_commit_hooks import findings
+from pre_commit_hooks import runner
+from pre_commit_hooks import vfs
+
+# The IDs of hooks that can be run, in the order they're applied.
+HOOKS = runner.HOOKS
+
+Finding = findings.Finding
+
+
+class FileResult(NamedTuple):
+    path: str
+    # The contents with fixes applied, which are the original contents if
+    # nothing was fixed.
+    contents: str
+    # Whether contents differ from the original contents.
+    changed: bool
+    findings: List[Finding]
+
+
+class Checker(object):
+    """Runs hooks over files, reusing parsed files across checks.
+
+    Options match the hooks' flags. Raises ValueError for unknown hooks or
+    invalid patterns. The repository root is found with git if not given.
+    """
+
+    def __init__(
+        self,
+        hooks: Sequence[str] = HOOKS,
+        *,
+        copyright: str = check_copyright.DEFAULT_COPYRIGHT,
+        skip_pattern: str = check_copyright.DEFAULT_SKIP_PATTERN,
+        custom_formats: Sequence[Tuple[str, str, str, str]] = (),
+        anchors_only: bool = False,
+        import_anchors: Sequence[Tuple[str, str]] = (),
+        link_cache_size: int = check_links.DEFAULT_LINK_CACHE_SIZE,
+        repo_root: Optional[str] = None,
+    ) -> None:
+        for hook in hooks:
+            if hook not in HOOKS:
+                raise ValueError(
+                    "Unknown hook `%s`; expected one of: %s"
+                    % (hook, ", ".join(HOOKS))
+                )
+        # The options that hooks read from parsed flags.
+        options = argparse.Namespace(
+            hooks=list(hooks),
+            copyright=copyright,
+            skip_pattern=skip_pattern,
+            custom_formats=[list(f) for f in custom_formats] or None,
+            anchors_only=anchors_only,
+            import_anchors=[
+                (prefix.strip("/"), manifest_path)
+                for prefix, manifest_path in import_anchors
+            ],
+            link_cache_size=link_cache_size,
+            export_anchors=None,
+            graph=None,
+            cache=False,
+            watch=None,
+        )
+        self._runner = runner.Runner(
+            options, Path(repo_root).resolve() if repo_root else None
+        )
+        self._checked = False
+
+    def wants(self, path: str) -> bool:
+        """Returns true if any hook applies to a file."""
+        return self._runner.wants(path)
+
+    def check(self, path: str, contents: Optional[str] = None) -> FileResult:
+        """Checks a file, returning its findings and fixed contents.
+
+        contents are checked instead of the file's, if given. Files that
+        hooks don't apply to have no findings. Raises UnicodeDecodeError for
+        files that can't be read as text.
+        """
+        if self._checked:
+            # Files may have changed since they were cached.
+            self._runner.refresh()
+        self._checked = True
+        given = contents is not None
+        if contents is None:
+            contents = vfs.current().read(path)
+        new_contents, errors = self._runner.check(path, contents, write=False)
+        changed = new_contents != contents
+        if given or changed:
+            # Other files should see the file as it is, not as checked.
+            self._runner.invalidate(path)
+        return FileResult(path, new_contents, changed, errors)
+
+    def check_paths(self, paths: Sequence[str]) -> List[FileResult]:
+        """Checks files, returning results for those that hooks apply to."""
+        return [self.check(path) for path in paths if self.wants(path)]
+
+
+def check(
+    path: str,
+    contents: Optional[str] = None,
+    hooks: Sequence[str] = HOOKS,
+    **options: Any,
+) -> FileResult:
+    """Checks a single file, with options as for Checker.
+
+    Services checking many files should reuse a Checker, which keeps parsed
+    files for links between them.
+    """
+    return Checker(hooks, **options).check(path, contents)
@@ -0,0 +1,146 @@
+"""Tests for api.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from pre_commit_hooks import api
+
+
+class TestApi(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+        self._checker = api.Checker(
+            ["check-google-doc-style", "markdown-toc", "check-links"],
+            repo_root=self._temp_dir.name,
+        )
+
+    def _write(self, filename: str, contents: str) -> str:
+        path = os.path.join(self._temp_dir.name, filename)
+        with open(path, "w") as f:
+            f.write(contents)
+        return path
+
+    def _read(self, path: str) -> str:
+        with open(path) as f:
+            return f.read()
+
+    def test_fixes(self) -> None:
+        path = self._write("a.md", "# Doc\n\nUse the repo.\n")
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            result = self._checker.check(path)
+        self.assertEqual(
+            result,
+            api.FileResult(path, "# Doc\n\nUse the repository.\n", True, []),
+        )
+        # Fixes are returned, not written or printed.
+        self.assertEqual(self._read(path), "# Doc\n\nUse the repo.\n")
+        self.assertEqual(stdout.getvalue(), "")
+
+    def test_contents(self) -> None:
+        path = self._write("a.md", "# Doc\n")
+        result = self._checker.check(path, "# Doc\n\n[x](#missing)\n")
+        self.assertEqual(
+            result.findings,
+            [
+                api.Finding(
+                    "check-links",
+                    3,
+                    "Link points at a non-existent anchor.",
+                    "[x](#missing)",
+                )
+            ],
+        )
+        self.assertFalse(result.changed)
+
+    def test_errors(self) -> None:
+        path = self._write(
+            "a.md",
+            "# Doc\n\n## Overview\n\n[x](#overveiw)\n\n"
+            "<!-- google-doc-style-ignore -->\n",
+        )
+        findings = self._checker.check(path).findings
+        self.assertEqual(
+            [(f.hook, f.line) for f in findings],
+            [("check-google-doc-style", 7), ("check-links", 5)],
+        )
+        self.assertEqual(findings[1].suggestions, ("#overview",))
+
+    def test_parse_errors(self) -> None:
+        contents = "# A\n\n### B\n"
+        toc_contents = "<!-- toc --><!-- tocstop -->\n" + contents
+        path = self._write("a.md", contents)
+        # Errors are reported by the first hook that needed the parse, if any.
+        for hooks, given, hook in (
+            (["check-links"], contents, "check-links"),
+            (["markdown-toc", "check-links"], contents, "check-links"),
+            (["markdown-toc", "check-links"], toc_contents, "markdown-toc"),
+        ):
+            findings = api.check(
+                path, given, hooks=hooks, repo_root=self._temp_dir.name
+            ).findings
+            self.assertEqual([f.hook for f in findings], [hook])
+        for hooks in (["markdown-toc"], ["check-google-doc-style"]):
+            findings = api.check(
+                path, hooks=hooks, repo_root=self._temp_dir.name
+            ).findings
+            self.assertEqual(findings, [])
+
+    def test_given_contents_not_kept(self) -> None:
+        target = self._write("b.md", "# B\n")
+        source = self._write("a.md", "# A\n\n[x](b.md#new)\n")
+        self._checker.check(target, "# B\n\n## New\n")
+        # Links to the file are checked against its file, not the contents
+        # last checked for it.
+        self.assertEqual(len(self._checker.check(source).findings), 1)
+        self._write("b.md", "# B\n\n## New\n")
+        self.assertEqual(self._checker.check(source).findings, [])
+
+    def test_copyright(self) -> None:
+        path = self._write("a.py", "print()\n")
+        result = api.check(path, hooks=["check-copyright"], copyright="test")
+        self.assertEqual(
+            result.findings,
+            [
+                api.Finding(
+                    "check-copyright",
+                    None,
+                    "Missing copyright",
+                    None,
+                    ('__copyright__ = """\ntest\n"""\n',),
+                )
+            ],
+        )
+
+    def test_check_paths(self) -> None:
+        paths = [self._write("a.md", "# A\n"), self._write("b.py", "")]
+        self.assertEqual(
+            [result.path for result in self._checker.check_paths(paths)],
+            paths[:1],
+        )
+
+    def test_invalid_options(self) -> None:
+        with self.assertRaisesRegex(ValueError, "Unknown hook"):
+            api.Checker(["check-everything"])
+        with self.assertRaisesRegex(ValueError, "--skip_pattern"):
+            api.Checker(skip_pattern="\\")
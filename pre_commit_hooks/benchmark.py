@@ -0,0 +1,584 @@
+"""Benchmarks hooks against a synthetic corpus, and compares results.
+
+`run` measures each hook in a fresh process, so that results include setup
+costs as a pre-commit run would and peak RSS is per hook, and writes results
+as JSON.
+`compare` reports changes between two results files, failing on regressions.
+`scaling` measures how hooks scale with --jobs for each worker backend.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pre_commit_hooks import corpus
+from pre_commit_hooks import daemon
+from pre_commit_hooks import executor
+from pre_commit_hooks import metrics
+from pre_commit_hooks import vfs
+
+# Hooks by ID, with the console script and arguments that run them.
+_HOOKS: Dict[str, Tuple[str, List[str]]] = {
+    "check-copyright": ("check-copyright", []),
+    "check-google-doc-style": ("check-google-doc-style", []),
+    "check-links": ("check-links", []),
+    "markdown-toc": ("markdown-toc", []),
+    "tool-hooks": ("pre-commit-tool-hooks", ["run"]),
+}
+
+# Hooks which are only given markdown files, as pre-commit configurations
+# typically filter them.
+_MARKDOWN_HOOKS = frozenset(
+    ("check-google-doc-style", "check-links", "markdown-toc")
+)
+
+# Metrics which improve as they increase; the rest improve as they decrease.
+_HIGHER_IS_BETTER = frozenset(("files_per_sec", "mb_per_sec"))
+_METRICS = ("files_per_sec", "mb_per_sec", "p50_ms", "p99_ms", "peak_rss_mb")
+
+_DEFAULT_THRESHOLD = 10.0
+
+
+def _parse_hooks(value: str) -> List[str]:
+    hooks = value.split(",")
+    for hook in hooks:
+        if hook not in _HOOKS:
+            raise argparse.ArgumentTypeError(
+                "Unknown hook %r; expected one of: %s"
+                % (hook, ", ".join(_HOOKS))
+            )
+    return hooks
+
+
+def _parse_counts(value: str) -> List[int]:
+    try:
+        counts = [int(count) for count in value.split(",")]
+    except ValueError:
+        counts = []
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError(
+            "Expected a comma-separated list of positive integers, got %r"
+            % value
+        )
+    return counts
+
+
+def _parse_backends(value: str) -> List[str]:
+    backends = value.split(",")
+    for backend in backends:
+        if backend not in ("process", "thread"):
+            raise argparse.ArgumentTypeError(
+                "Unknown backend %r; expected process or thread" % backend
+            )
+    return backends
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses command-line arguments and flags."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate_parser = subparsers.add_parser(
+        "generate",
+        description="Writes a synthetic corpus to a directory.",
+    )
+    generate_parser.add_argument(
+        "directory", metavar="DIR", help="The directory to write to."
+    )
+    corpus.add_arguments(generate_parser)
+    run_parser = subparsers.add_parser(
+        "run",
+        description="Measures each hook against a corpus.",
+    )
+    run_parser.add_argument(
+        "--corpus",
+        metavar="DIR",
+        help="The corpus to measure against, which is generated if it "
+        "doesn't exist. Defaults to a temporary corpus.",
+    )
+    run_parser.add_argument(
+        "--hooks",
+        metavar="HOOK[,HOOK...]",
+        type=_parse_hooks,
+        default=list(_HOOKS),
+        help="A comma-separated list of hooks to measure. Defaults to all "
+        "of: %s." % ", ".join(_HOOKS),
+    )
+    run_parser.add_argument(
+        "--repeat",
+        metavar="N",
+        type=int,
+        default=3,
+        help="Measures each hook N times, keeping the fastest. Defaults to "
+        "%(default)s.",
+    )
+    run_parser.add_argument(
+        "--output", metavar="FILE", help="Writes results as JSON to FILE."
+    )
+    corpus.add_arguments(run_parser)
+    measure_parser = subparsers.add_parser(
+        "measure",
+        description="Measures one hook in this process, printing JSON. Used "
+        "by `run`.",
+    )
+    measure_parser.add_argument("hook", choices=list(_HOOKS))
+    measure_parser.add_argument(
+        "paths_file", metavar="PATHS_FILE", help="Paths to check, one a line."
+    )
+    scaling_parser = subparsers.add_parser(
+        "scaling",
+        description="Measures each hook with each --jobs count and worker "
+        "backend, against a copy of a corpus.",
+    )
+    scaling_parser.add_argument(
+        "--corpus",
+        metavar="DIR",
+        help="The corpus to measure against, which is generated if it "
+        "doesn't exist. Defaults to a temporary corpus.",
+    )
+    scaling_parser.add_argument(
+        "--hooks",
+        metavar="HOOK[,HOOK...]",
+        type=_parse_hooks,
+        default=["tool-hooks"],
+        help="A comma-separated list of hooks to measure. Defaults to "
+        "`tool-hooks`.",
+    )
+    scaling_parser.add_argument(
+        "--jobs",
+        metavar="N[,N...]",
+        type=_parse_counts,
+        default=[1, 2, 4, 8],
+        help="A comma-separated list of --jobs counts. Defaults to 1,2,4,8.",
+    )
+    scaling_parser.add_argument(
+        "--backends",
+        metavar="BACKEND[,BACKEND...]",
+        type=_parse_backends,
+        default=["process", "thread"],
+        help="A comma-separated list of --backend values. Defaults to "
+        "process,thread.",
+    )
+    scaling_parser.add_argument(
+        "--repeat",
+        metavar="N",
+        type=int,
+        default=3,
+        help="Measures each configuration N times, keeping the fastest. "
+        "Defaults to %(default)s.",
+    )
+    scaling_parser.add_argument(
+        "--output", metavar="FILE", help="Writes results as JSON to FILE."
+    )
+    corpus.add_arguments(scaling_parser)
+    compare_parser = subparsers.add_parser(
+        "compare",
+        description="Compares two results files written by `run --output`, "
+        "exiting with an error on regressions.",
+    )
+    compare_parser.add_argument("old", metavar="OLD")
+    compare_parser.add_argument("new", metavar="NEW")
+    compare_parser.add_argument(
+        "--threshold",
+        metavar="PERCENT",
+        type=float,
+        default=_DEFAULT_THRESHOLD,
+        help="Changes for the worse beyond this are regressions. Defaults to "
+        "%(default)s.",
+    )
+    return parser.parse_args(args=argv)
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Returns a percentile of sorted values, by the nearest rank."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def measure(hook: str, paths_file: str) -> Dict[str, Any]:
+    """Runs a hook over the paths in a file, returning its metrics.
+
+    Fixes are kept in memory, so that the corpus is unchanged for later runs.
+    """
+    with open(paths_file) as f:
+        paths = f.read().splitlines()
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    script, args = _HOOKS[hook]
+    module = importlib.import_module(daemon._HOOK_MODULES[script])
+
+    latencies: List[float] = []
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(
+        devnull
+    ), contextlib.redirect_stderr(devnull), vfs.use(
+        vfs.MemoryFileSystem(base=vfs.DiskFileSystem())
+    ), executor.observe(
+        lambda path, has_errors, elapsed: latencies.append(elapsed)
+    ):
+        module.main([script] + args + ["--jobs=1", "--paths-from", paths_file])
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    peak_rss = metrics.peak_rss_bytes()
+    return {
+        "files": len(paths),
+        "bytes": total_bytes,
+        "seconds": seconds,
+        "files_per_sec": len(paths) / seconds,
+        "mb_per_sec": total_bytes / 1024 / 1024 / seconds,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "peak_rss_mb": peak_rss / 1024 / 1024 if peak_rss else None,
+    }
+
+
+def _list_files(directory: str) -> List[str]:
+    """Returns the corpus files under a directory, relative to it."""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d != ".git")
+        for name in sorted(files):
+            paths.append(os.path.relpath(os.path.join(root, name), directory))
+    return paths
+
+
+def _subprocess_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # The corpus is the working directory, so this package must be found
+    # through the path.
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [package_root, env.get("PYTHONPATH")])
+    )
+    return env
+
+
+def _measure_in_subprocess(
+    hook: str, corpus_dir: str, paths_file: str
+) -> Dict[str, Any]:
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-m",
+            "pre_commit_hooks.benchmark",
+            "measure",
+            hook,
+            paths_file,
+        ],
+        cwd=corpus_dir,
+        env=_subprocess_env(),
+    )
+    result: Dict[str, Any] = json.loads(output)
+    return result
+
+
+def _write_paths_file(
+    temp_dir: str, hook: str, paths: List[str], md_paths: List[str]
+) -> str:
+    """Writes the paths that a hook is given, returning the file's path."""
+    paths_file = os.path.join(temp_dir, hook + ".txt")
+    with open(paths_file, "w") as f:
+        for path in md_paths if hook in _MARKDOWN_HOOKS else paths:
+            f.write(path + "\n")
+    return paths_file
+
+
+def _time_hook(
+    hook: str, corpus_dir: str, paths_file: str, jobs: int, backend: str
+) -> float:
+    """Runs a hook's command, returning its wall time in seconds."""
+    script, args = _HOOKS[hook]
+    command = [sys.executable, "-m", daemon._HOOK_MODULES[script]]
+    command += args + [
+        f"--jobs={jobs}",
+        f"--backend={backend}",
+        "--paths-from",
+        paths_file,
+    ]
+    start = time.perf_counter()
+    subprocess.run(
+        command,
+        cwd=corpus_dir,
+        env=_subprocess_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def run(
+    corpus_dir: str,
+    hooks: List[str],
+    repeat: int,
+    config: Optional[corpus.CorpusConfig],
+) -> Dict[str, Any]:
+    """Measures hooks against a corpus, returning results for each.
+
+    Each hook keeps its fastest of repeat runs, which is the least affected by
+    other load on the machine.
+    """
+    paths = _list_files(corpus_dir)
+    md_paths = [path for path in paths if path.endswith(".md")]
+    results: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "corpus": config._asdict() if config else None,
+        "files": len(paths),
+        "bytes": sum(
+            os.path.getsize(os.path.join(corpus_dir, path)) for path in paths
+        ),
+        "hooks": {},
+    }
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for hook in hooks:
+            paths_file = _write_paths_file(temp_dir, hook, paths, md_paths)
+            best: Optional[Dict[str, Any]] = None
+            for _ in range(repeat):
+                result = _measure_in_subprocess(hook, corpus_dir, paths_file)
+                if best is None or result["seconds"] < best["seconds"]:
+                    best = result
+            results["hooks"][hook] = best
+    return results
+
+
+def scaling(
+    corpus_dir: str,
+    hooks: List[str],
+    jobs_counts: List[int],
+    backends: List[str],
+    repeat: int,
+) -> Dict[str, Any]:
+    """Measures hooks' wall time for each backend and --jobs count.
+
+    Hooks run on disk, unlike `run`, since worker processes can't share fixes
+    kept in memory. A copy of the corpus is used, and each hook runs once
+    before measuring, so that every measured run checks the same files.
+    """
+    paths = _list_files(corpus_dir)
+    md_paths = [path for path in paths if path.endswith(".md")]
+    results: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "gil_enabled": executor._gil_enabled(),
+        "files": len(paths),
+        "hooks": {},
+    }
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = os.path.join(temp_dir, "corpus")
+        shutil.copytree(corpus_dir, work_dir, symlinks=True)
+        for hook in hooks:
+            paths_file = _write_paths_file(temp_dir, hook, paths, md_paths)
+            _time_hook(hook, work_dir, paths_file, 1, "process")
+            results["hooks"][hook] = {
+                backend: {
+                    str(jobs): min(
+                        _time_hook(hook, work_dir, paths_file, jobs, backend)
+                        for _ in range(repeat)
+                    )
+                    for jobs in jobs_counts
+                }
+                for backend in backends
+            }
+    return results
+
+
+def _print_scaling(results: Dict[str, Any]) -> None:
+    """Prints each configuration's time and speedups.
+
+    Speedups are over the backend's first --jobs count, and over processes
+    with as many jobs.
+    """
+    print(
+        "%-24s %-8s %6s %10s %8s %11s"
+        % ("hook", "backend", "jobs", "seconds", "speedup", "vs process")
+    )
+    for hook, by_backend in results["hooks"].items():
+        process = by_backend.get("process", {})
+        for backend, by_jobs in by_backend.items():
+            first = next(iter(by_jobs.values()))
+            for jobs, seconds in by_jobs.items():
+                print(
+                    "%-24s %-8s %6s %10.3f %7.2fx %11s"
+                    % (
+                        hook,
+                        backend,
+                        jobs,
+                        seconds,
+                        first / seconds,
+                        (
+                            "%.2fx" % (process[jobs] / seconds)
+                            if jobs in process
+                            else "-"
+                        ),
+                    )
+                )
+
+
+def _format_value(value: Optional[float]) -> str:
+    return "-" if value is None else "%.1f" % value
+
+
+def _separate_seconds(results: Dict[str, Any]) -> Optional[float]:
+    """Returns the total time of the hooks that tool-hooks runs together.
+
+    Returns None unless tool-hooks and each of those hooks were measured.
+    """
+    hooks = results["hooks"]
+    separate = [hook for hook in _HOOKS if hook != "tool-hooks"]
+    if any(hook not in hooks for hook in separate + ["tool-hooks"]):
+        return None
+    return float(sum(hooks[hook]["seconds"] for hook in separate))
+
+
+def _print_results(results: Dict[str, Any]) -> None:
+    print(
+        "%-24s %8s %10s %8s %8s %8s %8s"
+        % ("hook", "files", "files/s", "MB/s", "p50 ms", "p99 ms", "RSS MB")
+    )
+    for hook, result in results["hooks"].items():
+        print(
+            "%-24s %8d %10s %8s %8s %8s %8s"
+            % (
+                hook,
+                result["files"],
+                _format_value(result["files_per_sec"]),
+                _format_value(result["mb_per_sec"]),
+                "%.3f" % result["p50_ms"],
+                "%.3f" % result["p99_ms"],
+                _format_value(result["peak_rss_mb"]),
+            )
+        )
+    separate = _separate_seconds(results)
+    if separate is not None:
+        print(
+            "\ntool-hooks took %.2fs, versus %.2fs for the separate hooks."
+            % (results["hooks"]["tool-hooks"]["seconds"], separate)
+        )
+
+
+def compare(
+    old: Dict[str, Any], new: Dict[str, Any], threshold: float
+) -> Tuple[List[str], bool]:
+    """Compares results, returning report lines and whether any regressed.
+
+    Only hooks and metrics in both results are compared.
+    """
+    lines = []
+    regressed = False
+    for hook, new_result in new["hooks"].items():
+        old_result = old["hooks"].get(hook)
+        if old_result is None:
+            continue
+        for metric in _METRICS:
+            old_value = old_result.get(metric)
+            new_value = new_result.get(metric)
+            if not old_value or new_value is None:
+                continue
+            change = (new_value - old_value) / old_value * 100
+            worse = -change if metric in _HIGHER_IS_BETTER else change
+            line = "%-24s %-14s %10.3f %10.3f %+7.1f%%" % (
+                hook,
+                metric,
+                old_value,
+                new_value,
+                change,
+            )
+            if worse > threshold:
+                line += "  REGRESSION"
+                regressed = True
+            lines.append(line)
+    return lines, regressed
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        results: Dict[str, Any] = json.load(f)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    if not argv:
+        argv = sys.argv
+    parsed_args = _parse_args(argv[1:])
+
+    if parsed_args.command == "generate":
+        os.makedirs(parsed_args.directory, exist_ok=True)
+        paths = corpus.generate(
+            parsed_args.directory, corpus.config_from_args(parsed_args)
+        )
+        print("Wrote %d files to %s" % (len(paths), parsed_args.directory))
+        return 0
+
+    if parsed_args.command == "measure":
+        print(json.dumps(measure(parsed_args.hook, parsed_args.paths_file)))
+        return 0
+
+    if parsed_args.command == "compare":
+        lines, regressed = compare(
+            _load(parsed_args.old),
+            _load(parsed_args.new),
+            parsed_args.threshold,
+        )
+        for line in lines:
+            print(line)
+        return 1 if regressed else 0
+
+    assert parsed_args.command in ("run", "scaling"), parsed_args.command
+    config: Optional[corpus.CorpusConfig] = None
+    with contextlib.ExitStack() as stack:
+        corpus_dir = parsed_args.corpus
+        if corpus_dir is None:
+            corpus_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        if not os.path.isdir(corpus_dir) or not os.listdir(corpus_dir):
+            config = corpus.config_from_args(parsed_args)
+            os.makedirs(corpus_dir, exist_ok=True)
+            corpus.generate(corpus_dir, config)
+        if parsed_args.command == "scaling":
+            results = scaling(
+                corpus_dir,
+                parsed_args.hooks,
+                parsed_args.jobs,
+                parsed_args.backends,
+                parsed_args.repeat,
+            )
+        else:
+            results = run(
+                corpus_dir, parsed_args.hooks, parsed_args.repeat, config
+            )
+    if parsed_args.command == "scaling":
+        _print_scaling(results)
+    else:
+        _print_results(results)
+    if parsed_args.output:
+        with open(parsed_args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
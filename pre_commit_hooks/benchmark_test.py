@@ -0,0 +1,166 @@
+"""Tests for benchmark.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict
+import unittest
+
+from pre_commit_hooks import benchmark
+
+
+def _results(**metrics: float) -> Dict[str, Any]:
+    return {"hooks": {"check-links": metrics}}
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_percentile(self) -> None:
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(benchmark._percentile(values, 50), 50.0)
+        self.assertEqual(benchmark._percentile(values, 99), 99.0)
+        self.assertEqual(benchmark._percentile([1.0], 99), 1.0)
+        self.assertEqual(benchmark._percentile([], 50), 0.0)
+
+    def test_compare(self) -> None:
+        old = _results(files_per_sec=100, p99_ms=10, peak_rss_mb=50)
+        lines, regressed = benchmark.compare(
+            old, _results(files_per_sec=95, p99_ms=10.5, peak_rss_mb=40), 10
+        )
+        self.assertFalse(regressed)
+        self.assertEqual(len(lines), 3)
+
+        # Fewer files per second and longer latencies are both worse.
+        for new, metric in (
+            (
+                _results(files_per_sec=80, p99_ms=10, peak_rss_mb=50),
+                "files_per_sec",
+            ),
+            (_results(files_per_sec=100, p99_ms=12, peak_rss_mb=50), "p99_ms"),
+        ):
+            lines, regressed = benchmark.compare(old, new, 10)
+            self.assertTrue(regressed)
+            self.assertEqual(
+                [line.split()[1] for line in lines if "REGRESSION" in line],
+                [metric],
+            )
+
+    def test_compare_missing(self) -> None:
+        # Hooks and metrics missing from either side are skipped.
+        lines, regressed = benchmark.compare(
+            _results(p50_ms=1),
+            {"hooks": {"check-links": {"p50_ms": 5, "peak_rss_mb": None}}},
+            10,
+        )
+        self.assertTrue(regressed)
+        self.assertEqual(len(lines), 1)
+        lines, regressed = benchmark.compare(
+            {"hooks": {}}, _results(p50_ms=1), 10
+        )
+        self.assertEqual((lines, regressed), ([], False))
+
+    def test_separate_seconds(self) -> None:
+        results: Dict[str, Any] = {
+            "hooks": {hook: {"seconds": 1.0} for hook in benchmark._HOOKS}
+        }
+        self.assertEqual(benchmark._separate_seconds(results), 4.0)
+        del results["hooks"]["markdown-toc"]
+        self.assertIsNone(benchmark._separate_seconds(results))
+
+    @unittest.skipUnless(shutil.which("git"), "Requires git")
+    def test_run(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            corpus_dir = os.path.join(temp_dir, "corpus")
+            output = os.path.join(temp_dir, "results.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                exit_code = benchmark.main(
+                    [
+                        "benchmark",
+                        "run",
+                        "--corpus",
+                        corpus_dir,
+                        "--hooks=check-copyright,check-links",
+                        "--repeat=1",
+                        "--files=10",
+                        "--output",
+                        output,
+                    ]
+                )
+            self.assertEqual(exit_code, 0)
+            with open(output) as f:
+                results = json.load(f)
+            self.assertEqual(results["files"], 10)
+            self.assertEqual(results["corpus"]["files"], 10)
+            self.assertEqual(
+                sorted(results["hooks"]), ["check-copyright", "check-links"]
+            )
+            self.assertEqual(results["hooks"]["check-copyright"]["files"], 10)
+            self.assertEqual(results["hooks"]["check-links"]["files"], 7)
+            self.assertGreater(
+                results["hooks"]["check-links"]["files_per_sec"], 0
+            )
+            # Results don't regress against themselves.
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(
+                    benchmark.main(["benchmark", "compare", output, output]), 0
+                )
+
+    @unittest.skipUnless(shutil.which("git"), "Requires git")
+    def _read_corpus(self, corpus_dir: str) -> Dict[str, str]:
+        contents = {}
+        for path in benchmark._list_files(corpus_dir):
+            with open(os.path.join(corpus_dir, path)) as f:
+                contents[path] = f.read()
+        return contents
+
+    @unittest.skipUnless(shutil.which("git"), "Requires git")
+    def test_scaling(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            corpus_dir = os.path.join(temp_dir, "corpus")
+            output = os.path.join(temp_dir, "results.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                benchmark.main(
+                    ["benchmark", "generate", corpus_dir, "--files=10"]
+                )
+                before = self._read_corpus(corpus_dir)
+                exit_code = benchmark.main(
+                    [
+                        "benchmark",
+                        "scaling",
+                        "--corpus",
+                        corpus_dir,
+                        "--hooks=check-google-doc-style",
+                        "--jobs=1,2",
+                        "--repeat=1",
+                        "--output",
+                        output,
+                    ]
+                )
+            self.assertEqual(exit_code, 0)
+            with open(output) as f:
+                results = json.load(f)
+            self.assertEqual(results["files"], 10)
+            timings = results["hooks"]["check-google-doc-style"]
+            self.assertEqual(sorted(timings), ["process", "thread"])
+            self.assertEqual(sorted(timings["thread"]), ["1", "2"])
+            self.assertGreater(timings["thread"]["2"], 0)
+            # Fixes are made to a copy, leaving the corpus unchanged.
+            self.assertEqual(self._read_corpus(corpus_dir), before)
@@ -0,0 +1,94 @@
+"""A BK-tree for finding strings within an edit distance."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Returns the Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, a_char in enumerate(a, 1):
+        current = [i]
+        for j, b_char in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (a_char != b_char),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+class _Node(object):
+    __slots__ = ("word", "children")
+
+    def __init__(self, word: str) -> None:
+        self.word = word
+        self.children: Dict[int, _Node] = {}
+
+
+class BKTree(object):
+    """Indexes words by edit distance.
+
+    Each child edge is labeled with its distance from the parent, so the
+    triangle inequality lets searches skip subtrees that can't contain a match.
+    """
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._root: Optional[_Node] = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        """Adds a word to the tree."""
+        if self._root is None:
+            self._root = _Node(word)
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(word, node.word)
+            if distance == 0:
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _Node(word)
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[int, str]]:
+        """Returns (distance, word) pairs within max_distance, closest first."""
+        matches: List[Tuple[int, str]] = []
+        if self._root is None:
+            return matches
+        pending = [self._root]
+        while pending:
+            node = pending.pop()
+            distance = edit_distance(word, node.word)
+            if distance <= max_distance:
+                matches.append((distance, node.word))
+            low = distance - max_distance
+            high = distance + max_distance
+            for child_distance, child in node.children.items():
+                if low <= child_distance <= high:
+                    pending.append(child)
+        matches.sort()
+        return matches
@@ -0,0 +1,56 @@
+"""Tests for bk_tree.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import itertools
+import unittest
+
+from pre_commit_hooks import bk_tree
+
+
+class TestEditDistance(unittest.TestCase):
+    def test_distances(self) -> None:
+        self.assertEqual(bk_tree.edit_distance("", ""), 0)
+        self.assertEqual(bk_tree.edit_distance("abc", ""), 3)
+        self.assertEqual(bk_tree.edit_distance("", "abc"), 3)
+        self.assertEqual(bk_tree.edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(bk_tree.edit_distance("setup", "set-up"), 1)
+
+
+class TestBKTree(unittest.TestCase):
+    def test_empty(self) -> None:
+        self.assertEqual(bk_tree.BKTree().search("foo", 2), [])
+
+    def test_search(self) -> None:
+        tree = bk_tree.BKTree(
+            ["installation", "install", "usage", "set-up", "setup"]
+        )
+        self.assertEqual(tree.search("setup", 0), [(0, "setup")])
+        self.assertEqual(tree.search("setpu", 2), [(2, "set-up"), (2, "setup")])
+        self.assertEqual(tree.search("instal", 1), [(1, "install")])
+
+    def test_matches_brute_force(self) -> None:
+        words = ["".join(p) for p in itertools.product("abc", repeat=3)]
+        tree = bk_tree.BKTree(words)
+        for query in ("aa", "abcd", "cab", "x"):
+            for max_distance in range(3):
+                expected = sorted(
+                    (bk_tree.edit_distance(query, word), word)
+                    for word in words
+                    if bk_tree.edit_distance(query, word) <= max_distance
+                )
+                self.assertEqual(tree.search(query, max_distance), expected)
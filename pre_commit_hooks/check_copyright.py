@@ -19,14 +19,19 @@ limitations under the License.
 """
 
 import argparse
-import datetime
-import os
+import functools
 import re
 import sys
-import textwrap
-from typing import List, Optional, Tuple
+import time
+from typing import Any, Dict, List, NoReturn, Optional, Tuple
 
-_DEFAULT_COPYRIGHT = """Copyright YYYY Google LLC
+from pre_commit_hooks import executor
+from pre_commit_hooks import findings
+from pre_commit_hooks import metrics
+from pre_commit_hooks import tracing
+from pre_commit_hooks import vfs
+
+DEFAULT_COPYRIGHT = """Copyright YYYY Google LLC
 
 Licensed under the Apache License, Version 2.0 (the "License");
 you may not use this file except in compliance with the License.
@@ -41,7 +46,7 @@ See the License for the specific language governing permissions and
 limitations under the License."""
 
 
-_DEFAULT_SKIP_PATTERN = r"(?:^LICENSE|\.(?:ico|json))$"
+DEFAULT_SKIP_PATTERN = r"(?:^LICENSE|\.(?:ico|json))$"
 _BUILTIN_FORMATS = (
     (r"\.(cpp|h)$", "", "// ", ""),
     (r"\.(html|md)$", "<!--", "", "-->"),
@@ -52,18 +57,17 @@ _BUILTIN_FORMATS = (
 )
 
 
-def _exit(error: str) -> None:
+def _exit(error: str) -> NoReturn:
     """A simple exit wrapper for testing."""
     sys.exit(error)
 
 
-def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
-    """Parses command-line arguments and flags."""
-    parser = argparse.ArgumentParser(description=__doc__)
+def add_options(parser: argparse.ArgumentParser) -> None:
+    """Adds flags for checking copyrights, shared with the combined runner."""
     parser.add_argument(
         "--copyright",
         metavar="COPYRIGHT",
-        default=_DEFAULT_COPYRIGHT,
+        default=DEFAULT_COPYRIGHT,
         help="The copyright to check for. Use `YYYY` to insert the current "
         "year. Defaults to a Google Apache 2.0 license.",
     )
@@ -81,34 +85,54 @@ def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument(
         "--skip_pattern",
         metavar="PATH_PATTERN",
-        default=_DEFAULT_SKIP_PATTERN,
+        default=DEFAULT_SKIP_PATTERN,
         help="A path pattern for paths to skip. Defaults to `%s`."
-        % _DEFAULT_SKIP_PATTERN,
+        % DEFAULT_SKIP_PATTERN,
     )
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses command-line arguments and flags."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_options(parser)
+    executor.add_arguments(parser)
     parser.add_argument(
         "paths",
         metavar="PATH",
-        nargs="+",
-        help="One or more paths of files to check.",
+        nargs="*",
+        help="Paths of files to check.",
     )
-    return parser.parse_args(args=argv)
+    parsed_args = parser.parse_args(args=argv)
+    executor.require_paths(parser, parsed_args)
+    return parsed_args
 
 
-class _CopyrightValidator(object):
+class CopyrightValidator(object):
+    """Checks files for copyrights, formatted for each file type."""
+
     def __init__(
         self,
         copyright: str,
         skip_pattern: str,
         custom_formats: Optional[List[List[str]]],
     ) -> None:
-        """Initializes the list of copyright formats and skipped paths."""
-        copyright = copyright.strip("\n")
+        """Initializes the list of copyright formats and skipped paths.
+
+        Patterns are validated here, raising ValueError if invalid, but
+        copyrights are only formatted for paths that need them.
+        """
+        self._copyright = copyright.strip("\n")
         try:
             self._skip = re.compile(skip_pattern)
         except re.error as e:
-            _exit("Invalid --skip_pattern `%s`: %s`" % (skip_pattern, e))
+            raise ValueError(
+                "Invalid --skip_pattern `%s`: %s`" % (skip_pattern, e)
+            )
 
-        self._formats: List[Tuple[re.Pattern, re.Pattern, str]] = []
+        # Path regexes, with the prefix, per_line_prefix, and suffix.
+        self._formats: List[Tuple[re.Pattern, str, str, str]] = []
+        # Copyright regexes and suggestions, by index in self._formats.
+        self._copyrights: Dict[int, Tuple[re.Pattern, str]] = {}
         if custom_formats:
             for custom_format in custom_formats:
                 for i, x in enumerate(custom_format):
@@ -116,34 +140,41 @@ class _CopyrightValidator(object):
                     # an escape.
                     if x.startswith(r"\-"):
                         custom_format[i] = x[1:]
-                self._add_format(copyright, *custom_format)
+                self._add_format(*custom_format)
         for builtin_format in _BUILTIN_FORMATS:
-            self._add_format(copyright, *builtin_format)
+            self._add_format(*builtin_format)
 
     def _add_format(
         self,
-        copyright: str,
         path_pattern: str,
         prefix: str,
         per_line_prefix: str,
         suffix: str,
     ) -> None:
-        """Adds a format, either from --custom_format or built-in.
-
-        This will reformat the standard copyright based on the prefix,
-        per_line_prefix, and suffix.
-
-        The output tuple contains a regex for paths, a regex for matching
-        copyrights, and the suggested copyright that will be printed.
-        """
+        """Adds a format, either from --custom_format or built-in."""
         try:
             path_re = re.compile(path_pattern)
         except re.error as e:
-            _exit(
+            raise ValueError(
                 "Invalid --custom_format pattern `%s`: %s`" % (path_pattern, e)
             )
+        self._formats.append((path_re, prefix, per_line_prefix, suffix))
+
+    def _format_copyright(
+        self, prefix: str, per_line_prefix: str, suffix: str
+    ) -> Tuple[re.Pattern, str]:
+        """Reformats the standard copyright for a format.
+
+        This will reformat the standard copyright based on the prefix,
+        per_line_prefix, and suffix.
+
+        The output tuple contains a regex for matching copyrights, and the
+        suggested copyright that will be printed.
+        """
+        # Only imported when formatting, to keep startup fast.
+        import textwrap
 
-        formatted = textwrap.indent(copyright, per_line_prefix)
+        formatted = textwrap.indent(self._copyright, per_line_prefix)
         formatted = formatted.replace(
             "\n\n", "\n%s\n" % per_line_prefix.rstrip(" ")
         )
@@ -154,70 +185,125 @@ class _CopyrightValidator(object):
         formatted += "\n"
 
         copyright_re = re.compile(re.escape(formatted).replace("YYYY", r"\d+"))
-        suggest = formatted.replace("YYYY", str(datetime.datetime.now().year))
-
-        self._formats.append((path_re, copyright_re, suggest))
+        suggest = formatted.replace("YYYY", str(time.localtime().tm_year))
+        return (copyright_re, suggest)
 
     def _get_copyright(self, path: str) -> Optional[Tuple[re.Pattern, str]]:
         """Returns the copyright for the given path, or None to skip."""
         if self._skip.search(path):
             return None
 
-        for path_re, copyright_re, suggest in self._formats:
+        for i, (path_re, prefix, per_line_prefix, suffix) in enumerate(
+            self._formats
+        ):
             if not path_re.search(path):
                 continue
-            return (copyright_re, suggest)
-            break
+            copyright = self._copyrights.get(i)
+            if copyright is None:
+                # Worker threads may format a copyright at the same time, so
+                # keep the first to be stored.
+                copyright = self._copyrights.setdefault(
+                    i,
+                    self._format_copyright(prefix, per_line_prefix, suffix),
+                )
+            return copyright
         raise ValueError(
             "Should have had at least a default match: `%s`" % path
         )
 
+    def applies(self, path: str) -> bool:
+        """Returns true if the path should be checked for a copyright."""
+        return (
+            not vfs.current().is_dir(path)
+            and self._get_copyright(path) is not None
+        )
+
     def validate(self, path: str) -> bool:
         """Checks the file for a copyright, returning False on error."""
-        if os.path.isdir(path):
+        if not self.applies(path):
+            metrics.count("files_skipped")
             return True
 
-        copyright = self._get_copyright(path)
-        if not copyright:
+        try:
+            contents = vfs.current().read(path)
+        except UnicodeDecodeError as e:
+            print("Skipping %s: %s\n" % (path, e))
             return True
-
-        with open(path) as f:
-            try:
-                contents = f.read()
-            except UnicodeDecodeError as e:
-                print("Skipping %s: %s\n" % (path, e))
-                return True
+        return self.validate_contents(path, contents)
+
+    def validate_contents(self, path: str, contents: str) -> bool:
+        """Checks already read contents, returning False on error."""
+        error = self.check_contents(path, contents)
+        if error:
+            print_finding(path, error)
+            return False
+        return True
+
+    @tracing.traced("match copyright")
+    def check_contents(
+        self, path: str, contents: str
+    ) -> Optional[findings.Finding]:
+        """Checks already read contents, returning an error if any."""
+        copyright = self._get_copyright(path)
+        assert copyright is not None, path
 
         # Skip empty files, such as __init__.py.
         if len(contents) <= 1:
-            return True
+            return None
 
         if copyright[0].search(contents):
-            return True
+            return None
 
-        print(
-            "Missing copyright in %s:\n%s" % (path, copyright[1]),
-            file=sys.stderr,
+        return findings.Finding(
+            "check-copyright", None, "Missing copyright", None, (copyright[1],)
         )
-        return False
+
+
+def print_finding(path: str, finding: findings.Finding) -> None:
+    """Prints a missing copyright, with the suggested copyright."""
+    print(
+        "Missing copyright in %s:\n%s" % (path, finding.suggestions[0]),
+        file=sys.stderr,
+    )
+
+
+def _setup(parsed_args: argparse.Namespace) -> CopyrightValidator:
+    """Builds the validator, once per process."""
+    try:
+        return CopyrightValidator(
+            parsed_args.copyright,
+            parsed_args.skip_pattern,
+            parsed_args.custom_formats,
+        )
+    except ValueError as e:
+        _exit(str(e))
+
+
+def _check(copyright_validator: CopyrightValidator, path: str) -> bool:
+    """Checks a path, returning true on errors."""
+    return not copyright_validator.validate(path)
+
+
+def cache_options() -> Dict[str, Any]:
+    """Returns inputs besides flags which affect results.
+
+    Suggested copyrights use the current year, so results from past years
+    can't be reused.
+    """
+    return {"year": time.localtime().tm_year}
 
 
 def main(argv: Optional[List[str]] = None) -> int:
     if not argv:
         argv = sys.argv
     parsed_args = _parse_args(argv[1:])
-    copyright_validator = _CopyrightValidator(
-        parsed_args.copyright,
-        parsed_args.skip_pattern,
-        parsed_args.custom_formats,
+    return executor.run(
+        "check-copyright",
+        parsed_args,
+        functools.partial(_setup, parsed_args),
+        _check,
+        extra_options=cache_options(),
     )
-    paths = parsed_args.paths
-
-    exit_code = 0
-    for path in paths:
-        if not copyright_validator.validate(path):
-            exit_code = 1
-    return exit_code
 
 
 if __name__ == "__main__":
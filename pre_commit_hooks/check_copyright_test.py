@@ -16,11 +16,16 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import contextlib
+import io
+import os
 import tempfile
+import time
 import unittest
 from unittest import mock
 
 from pre_commit_hooks import check_copyright
+from pre_commit_hooks import file_test_case
 
 
 class FakeExitError(Exception):
@@ -33,8 +38,8 @@ def _fake_exit(message: FakeExitError) -> None:
 
 class TestCheckCopyright(unittest.TestCase):
     def test_get_copyright(self) -> None:
-        validator = check_copyright._CopyrightValidator(
-            "test", check_copyright._DEFAULT_SKIP_PATTERN, None
+        validator = check_copyright.CopyrightValidator(
+            "test", check_copyright.DEFAULT_SKIP_PATTERN, None
         )
         copyright = validator._get_copyright("test.py")
         assert copyright is not None
@@ -74,6 +79,30 @@ class TestCheckCopyright(unittest.TestCase):
             f.flush()
             self.assertEqual(check_copyright.main(argv=argv), 0)
 
+    def test_cached_yyyy(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "test.py")
+            with open(path, "w") as f:
+                f.write("non-copyright content\n")
+            argv = [
+                "bin",
+                path,
+                "--copyright=test YYYY",
+                "--cache",
+                "--cache-dir=%s" % os.path.join(temp_dir, "cache"),
+            ]
+            # Suggestions from cached results have the current year.
+            for year in (2030, 2030, 2031):
+                stderr = io.StringIO()
+                with mock.patch(
+                    "time.localtime",
+                    return_value=time.struct_time(
+                        (year, 1, 1, 0, 0, 0, 0, 1, 0)
+                    ),
+                ), contextlib.redirect_stderr(stderr):
+                    self.assertEqual(check_copyright.main(argv=argv), 1)
+                self.assertIn("test %d" % year, stderr.getvalue())
+
     def test_empty_file(self) -> None:
         with tempfile.NamedTemporaryFile(
             suffix=".py", mode="w", delete=False
@@ -187,3 +216,17 @@ class TestCheckCopyright(unittest.TestCase):
             f.write("- test\n")
             f.flush()
             self.assertEqual(check_copyright.main(argv=argv), 0)
+
+
+class TestCheckCopyrightScaling(file_test_case.FileTestCase):
+    def test_custom_formats_scaling(self) -> None:
+        def validate(n: int) -> None:
+            validator = check_copyright.CopyrightValidator(
+                "test",
+                check_copyright.DEFAULT_SKIP_PATTERN,
+                [["\\.f%d$" % i, "", "# ", ""] for i in range(n)],
+            )
+            # The last format matches, so every format is tried.
+            validator.validate_contents("test.f%d" % (n - 1), "# test\n")
+
+        self.assert_growth(validate)
@@ -23,9 +23,26 @@ import re
 import sys
 from typing import Generator, List, Optional, Tuple
 
+from pre_commit_hooks import executor
+from pre_commit_hooks import findings
+from pre_commit_hooks import metrics
+from pre_commit_hooks import tracing
+from pre_commit_hooks import vfs
+
 _IGNORE_START = "<!-- google-doc-style-ignore -->"
 _IGNORE_STOP = "<!-- google-doc-style-resume -->"
 
+# Matches the opening of a fenced code block after its indent, capturing the
+# fence and its info string.
+_FENCE = re.compile(r"(`{3,}|~{3,})(.*)")
+
+# Matches the start of a list item after its indent, capturing its marker, the
+# spaces after it, which set the indent of the item's contents, and contents.
+_LIST_ITEM = re.compile(r"([-+*]|\d{1,9}[.)])(?:([ \t]+)(.*)|$)")
+
+# Matches an inline code span, delimited by equal runs of backticks.
+_CODE_SPAN = re.compile(r"(?<!`)(`+)(?!`).*?(?<!`)\1(?!`)")
+
 # These are from https://developers.google.com/style/word-list.
 _REPLACERS = (
     ("blacklist", "blocklist"),
@@ -54,10 +71,13 @@ def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument(
         "paths",
         metavar="PATH",
-        nargs="+",
-        help="One or more paths of files to check.",
+        nargs="*",
+        help="Paths of files to check.",
     )
-    return parser.parse_args(args=argv)
+    executor.add_arguments(parser)
+    parsed_args = parser.parse_args(args=argv)
+    executor.require_paths(parser, parsed_args)
+    return parsed_args
 
 
 def build_replacers() -> Generator[Tuple[str, str], None, None]:
@@ -77,70 +97,229 @@ def build_replacers() -> Generator[Tuple[str, str], None, None]:
             yield (r"%s(?<!\w)%s(?!\w)" % (flags, re.escape(before)), after)
 
 
-def _check_style(replacers: List[Tuple[str, str]], path: str) -> Optional[str]:
+def _check_style(
+    replacers: List[Tuple[str, str]], path: str
+) -> Optional[findings.Finding]:
     """Checks documentation style for the given path.
 
     Returns errors, if any.
     """
-    with open(path) as f:
-        contents = f.read()
+    fs = vfs.current()
+    contents = fs.read(path)
+    new_contents, error = fix_style(replacers, contents)
+    if error:
+        return error
+    if new_contents != contents:
+        fs.write(path, new_contents)
+    return None
+
+
+def _error(line: Optional[int], message: str) -> findings.Finding:
+    return findings.Finding("check-google-doc-style", line, message)
+
+
+def _indent(line: str) -> int:
+    """Returns the width of a line's indent, with tabs to multiples of 4."""
+    return len(line[: len(line) - len(line.lstrip(" \t"))].expandtabs(4))
 
+
+def _replace(replacers: List[Tuple[str, str]], text: str) -> str:
+    for before, after in replacers:
+        text = re.sub(before, after, text)
+    return text
+
+
+def _fix_prose(replacers: List[Tuple[str, str]], line: str) -> str:
+    """Applies replacers to a line, except inside inline code spans."""
+    if "`" not in line:
+        return _replace(replacers, line)
+    parts: List[str] = []
+    offset = 0
+    for match in _CODE_SPAN.finditer(line):
+        start = match.start()
+        if start > offset:
+            parts.append(_replace(replacers, line[offset:start]))
+        parts.append(match.group(0))
+        offset = match.end()
+    # Unmatched backticks are literal text.
+    parts.append(_replace(replacers, line[offset:]))
+    return "".join(parts)
+
+
+def _open_fence(text: str) -> str:
+    """Returns the fence that text opens a fenced code block with, if any."""
+    match = _FENCE.match(text)
+    if not match:
+        return ""
+    # Backtick fences can't have backticks after them, which would make them
+    # inline code instead.
+    if match.group(1)[0] == "`" and "`" in match.group(2):
+        return ""
+    return match.group(1)
+
+
+def _prose_lines(lines: List[str]) -> Generator[int, None, None]:
+    """Yields the indices of lines outside fenced and indented code blocks.
+
+    This is a lightweight classifier, not a full markdown parser: list items
+    are only tracked for the indent of their contents, which code blocks in
+    them are relative to.
+    """
+    fence = ""
+    # The indent of the contents holding the open fence.
+    fence_base = 0
+    # The indent of lines continuing the open indented code block, or 0.
+    code_indent = 0
+    # Whether the previous line was blank, or the start of the document, so
+    # that an indented line starts a code block instead of continuing a
+    # paragraph.
+    after_blank = True
+    # The indents of the contents of open list items, innermost last.
+    list_indents: List[int] = []
+    code_bytes = 0
+    for index, line in enumerate(lines):
+        blank = not line.strip()
+        indent = _indent(line)
+        stripped = line.lstrip(" \t")
+        if fence:
+            if blank or indent >= fence_base:
+                if (
+                    indent - fence_base <= 3
+                    and not stripped.rstrip().lstrip(fence[0])
+                    and len(stripped.rstrip()) >= len(fence)
+                ):
+                    fence = ""
+                    after_blank = True
+                code_bytes += len(line) + 1
+                continue
+            # Less indented lines close the list item holding the fence.
+            fence = ""
+        if code_indent:
+            if blank or indent >= code_indent:
+                code_bytes += len(line) + 1
+                continue
+            code_indent = 0
+        if blank:
+            after_blank = True
+            yield index
+            continue
+        item = _LIST_ITEM.match(stripped)
+        opened = _open_fence(stripped)
+        # Other lines may lazily continue a paragraph in a list item.
+        if after_blank or item or opened:
+            while list_indents and indent < list_indents[-1]:
+                list_indents.pop()
+        base = list_indents[-1] if list_indents else 0
+        if indent - base >= 4:
+            if after_blank:
+                code_indent = base + 4
+                code_bytes += len(line) + 1
+                continue
+        elif opened:
+            fence = opened
+            fence_base = base
+            code_bytes += len(line) + 1
+            continue
+        elif item:
+            marker, gap, contents = item.groups()
+            marker_end = indent + len(marker)
+            spaces = len((" " * marker_end + (gap or "")).expandtabs(4))
+            spaces -= marker_end
+            # Contents starting after 5 or more spaces are indented code,
+            # with the item's contents 1 space after its marker.
+            if not contents or spaces > 4:
+                list_indents.append(marker_end + 1)
+            else:
+                list_indents.append(marker_end + spaces)
+                opened = _open_fence(contents)
+                if opened:
+                    fence = opened
+                    fence_base = list_indents[-1]
+                    code_bytes += len(line) + 1
+                    continue
+        after_blank = False
+        yield index
+    metrics.count("style_code_bytes_skipped", code_bytes)
+
+
+@tracing.traced("fix style")
+def fix_style(
+    replacers: List[Tuple[str, str]], contents: str
+) -> Tuple[str, Optional[findings.Finding]]:
+    """Fixes documentation style in contents.
+
+    Returns the fixed contents, and errors if any. On errors, the original
+    contents are returned. Code blocks and inline code are left unchanged,
+    including ignore comments inside them.
+    """
     lines = contents.split("\n")
     ignoring = False
-    for index in range(len(lines)):
+    ignore_line = 0
+    for index in _prose_lines(lines):
         line = lines[index]
         if line == _IGNORE_START:
             if ignoring:
-                return "Found a repeated %r without a %r on line %d" % (
+                message = "Found a repeated %r without a %r on line %d" % (
                     _IGNORE_START,
                     _IGNORE_STOP,
                     index + 1,
                 )
+                return contents, _error(index + 1, message)
             ignoring = True
+            ignore_line = index + 1
         elif line == _IGNORE_STOP:
             if not ignoring:
-                return "Found a %r without a preceding %r on line %d" % (
+                message = "Found a %r without a preceding %r on line %d" % (
                     _IGNORE_STOP,
                     _IGNORE_START,
                     index + 1,
                 )
+                return contents, _error(index + 1, message)
             ignoring = False
         elif not ignoring:
-            new_line = line
-            for before, after in replacers:
-                new_line = re.sub(before, after, new_line)
-            lines[index] = new_line
+            lines[index] = _fix_prose(replacers, line)
     if ignoring:
-        return "Found a %r without a stopping %r" % (
+        message = "Found a %r without a stopping %r" % (
             _IGNORE_START,
             _IGNORE_STOP,
         )
-
+        return contents, _error(ignore_line, message)
     new_contents = "\n".join(lines)
-    if new_contents != contents:
-        with open(path, "w") as f:
-            f.write(new_contents)
-    return None
+    # The split lines are freed on return.
+    tracing.checkpoint()
+    return new_contents, None
+
+
+def _setup() -> List[Tuple[str, str]]:
+    """Builds the list of replacer regexes once, to re-use for all files."""
+    return list(build_replacers())
+
+
+def print_finding(path: str, finding: findings.Finding) -> None:
+    """Prints a style error."""
+    print("Errors in %r: %s" % (path, finding.message))
+
+
+def _check(replacers: List[Tuple[str, str]], path: str) -> bool:
+    """Checks a path, returning true on errors."""
+    error = _check_style(replacers, path)
+    if error:
+        print_finding(path, error)
+        return True
+    return False
 
 
 def main(argv: Optional[List[str]] = None) -> int:
     if not argv:
         argv = sys.argv
     parsed_args = _parse_args(argv[1:])
-    paths = parsed_args.paths
-
-    # Build the list of replacer regexes once, and re-use it for all files.
-    replacers = list(build_replacers())
-
-    exit_code = 0
-    for path in paths:
-        if not path.endswith(".md"):
-            continue
-        errors = _check_style(replacers, path)
-        if errors:
-            print("Errors in %r: %s" % (path, errors))
-            exit_code = 1
-    return exit_code
+    return executor.run(
+        "check-google-doc-style",
+        parsed_args,
+        _setup,
+        _check,
+        wants=lambda path: path.endswith(".md"),
+    )
 
 
 if __name__ == "__main__":
@@ -98,3 +98,144 @@ class TestCheckGoogleDocStyle(file_test_case.FileTestCase):
             "Cons"
         )
         self.assert_exit_code(contents, contents, exit_code=1)
+
+    def test_fenced_code(self) -> None:
+        before = (
+            "Cons\n"
+            "```sh\n"
+            "cons\n"
+            "<!-- google-doc-style-ignore -->\n"
+            "```\n"
+            "Cons\n"
+            "~~~~\n"
+            "```\n"
+            "cons\n"
+            "~~~~\n"
+            "Cons"
+        )
+        after = before.replace("Cons", "Disadvantages")
+        self.assert_exit_code(before, after)
+
+    def test_fenced_code_unclosed(self) -> None:
+        before = "Cons\n```\ncons\n"
+        after = "Disadvantages\n```\ncons\n"
+        self.assert_exit_code(before, after)
+
+    def test_indented_code(self) -> None:
+        before = (
+            "Cons\n"
+            "\n"
+            "    cons\n"
+            "\n"
+            "\tcons\n"
+            "Cons\n"
+            "    cons\n"
+            "\n"
+            "- Cons\n"
+            "\n"
+            "    cons"
+        )
+        # Indented lines continuing a paragraph or list aren't code.
+        after = (
+            "Disadvantages\n"
+            "\n"
+            "    cons\n"
+            "\n"
+            "\tcons\n"
+            "Disadvantages\n"
+            "    disadvantages\n"
+            "\n"
+            "- Disadvantages\n"
+            "\n"
+            "    disadvantages"
+        )
+        self.assert_exit_code(before, after)
+
+    def test_fenced_code_in_list(self) -> None:
+        before = (
+            "1.  Clone the repo:\n"
+            "\n"
+            "    ```shell\n"
+            "    git clone my-repo via ssh\n"
+            "    ```\n"
+            "\n"
+            "    -   Cons\n"
+            "        ~~~\n"
+            "        cons\n"
+            "        ~~~\n"
+            "-   ```\n"
+            "    cons\n"
+            "Cons\n"
+        )
+        # A less indented line ends the list item, and so the fence in it.
+        after = (
+            "1.  Clone the repository:\n"
+            "\n"
+            "    ```shell\n"
+            "    git clone my-repo via ssh\n"
+            "    ```\n"
+            "\n"
+            "    -   Disadvantages\n"
+            "        ~~~\n"
+            "        cons\n"
+            "        ~~~\n"
+            "-   ```\n"
+            "    cons\n"
+            "Disadvantages\n"
+        )
+        self.assert_exit_code(before, after)
+
+    def test_indented_code_in_list(self) -> None:
+        before = (
+            "-   Cons\n"
+            "\n"
+            "        cons\n"
+            "\n"
+            "    Cons\n"
+            "\n"
+            "    1. Cons\n"
+            "\n"
+            "           cons\n"
+            "\n"
+            "       Cons\n"
+            "\n"
+            "Cons\n"
+            "\n"
+            "    cons\n"
+        )
+        after = (
+            "-   Disadvantages\n"
+            "\n"
+            "        cons\n"
+            "\n"
+            "    Disadvantages\n"
+            "\n"
+            "    1. Disadvantages\n"
+            "\n"
+            "           cons\n"
+            "\n"
+            "       Disadvantages\n"
+            "\n"
+            "Disadvantages\n"
+            "\n"
+            "    cons\n"
+        )
+        self.assert_exit_code(before, after)
+
+    def test_inline_code(self) -> None:
+        before = "Cons `cons` ``a ` cons`` cons ` cons"
+        after = (
+            "Disadvantages `cons` ``a ` cons`` disadvantages ` disadvantages"
+        )
+        self.assert_exit_code(before, after)
+
+    def test_scaling(self) -> None:
+        self.assert_scales(lambda n: "Use the repo, e.g. this one.\n" * n)
+        # Each line is checked against each replacer, so fixing a line grows
+        # linearly with the number of replacers.
+        self.assert_growth(
+            lambda n: check_google_doc_style.fix_style(
+                [(r"(?<!\w)term%d(?!\w)" % i, "word") for i in range(n)],
+                "A line with term1 and term2.",
+            )
+        )
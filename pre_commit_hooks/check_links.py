@@ -17,13 +17,105 @@ limitations under the License.
 """
 
 import argparse
+import collections
+import functools
+import os
 from pathlib import Path
 import subprocess
 import sys
-from typing import Dict, List, Optional, Set, Tuple
+import threading
+from typing import (
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+)
 from urllib import parse
 
+from pre_commit_hooks import anchor_manifest
+from pre_commit_hooks import bk_tree
+from pre_commit_hooks import executor
+from pre_commit_hooks import findings
+from pre_commit_hooks import link_graph
 from pre_commit_hooks import markdown_links
+from pre_commit_hooks import metrics
+from pre_commit_hooks import tracing
+from pre_commit_hooks import verdict_cache
+from pre_commit_hooks import vfs
+
+DEFAULT_LINK_CACHE_SIZE = 4096
+
+# The maximum number of anchors suggested for a broken anchor link.
+_MAX_SUGGESTIONS = 3
+
+# The number of most linked anchors reported by --graph.
+_GRAPH_TOP_ANCHORS = 10
+
+
+def _parse_import(arg: str) -> Tuple[str, str]:
+    """Splits a --import-anchors argument into its prefix and file."""
+    prefix, sep, manifest_path = arg.partition("=")
+    prefix = prefix.strip("/")
+    # An empty prefix would match nothing, rather than the whole repository.
+    if not sep or not prefix or not manifest_path:
+        raise argparse.ArgumentTypeError("Expected PREFIX=FILE, got `%s`" % arg)
+    return (prefix, manifest_path)
+
+
+def _parse_cache_size(arg: str) -> int:
+    """Parses a --link-cache-size argument, which can't be negative."""
+    if not arg.isdigit():
+        raise argparse.ArgumentTypeError(
+            "Expected a non-negative integer, got `%s`" % arg
+        )
+    return int(arg)
+
+
+def add_options(parser: argparse.ArgumentParser) -> None:
+    """Adds flags for checking links, shared with the combined runner."""
+    parser.add_argument(
+        "--anchors-only",
+        action="store_true",
+        help="Set to only validate intra-document anchors, ignoring "
+        " cross-document links.",
+    )
+    parser.add_argument(
+        "--link-cache-size",
+        metavar="N",
+        type=_parse_cache_size,
+        default=DEFAULT_LINK_CACHE_SIZE,
+        help="The maximum number of parsed documents to keep in memory, or 0 "
+        "for no limit. Defaults to %d." % DEFAULT_LINK_CACHE_SIZE,
+    )
+    parser.add_argument(
+        "--export-anchors",
+        metavar="FILE",
+        help="Writes a manifest of the anchors in each checked file, for use "
+        "with --import-anchors in other repositories. FILE is replaced, so "
+        "all files must be passed to one process.",
+    )
+    parser.add_argument(
+        "--import-anchors",
+        metavar="PREFIX=FILE",
+        action="append",
+        type=_parse_import,
+        default=[],
+        help="Checks links under the repository-relative PREFIX against the "
+        "anchor manifest in FILE, instead of the file system. It may be "
+        "specified multiple times.",
+    )
+    parser.add_argument(
+        "--graph",
+        metavar="FILE",
+        help="Writes the link graph of checked files to FILE as JSON lines, "
+        "then reports orphaned documents and the most linked anchors. FILE is "
+        "replaced, so all files must be passed to one process.",
+    )
 
 
 def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
@@ -32,126 +124,563 @@ def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument(
         "paths",
         metavar="PATH",
-        nargs="+",
-        help="One or more paths of files to check.",
+        nargs="*",
+        help="Paths of files to check.",
     )
-    parser.add_argument(
-        "--anchors-only",
-        action="store_true",
-        help="Set to only validate intra-document anchors, ignoring "
-        " cross-document links.",
-    )
-    return parser.parse_args(args=argv)
+    add_options(parser)
+    executor.add_arguments(parser)
+    parsed_args = parser.parse_args(args=argv)
+    executor.require_paths(parser, parsed_args)
+    return parsed_args
 
 
-def _print_error(path: str, link: markdown_links.Link, message: str) -> None:
+def print_error(path: str, error: findings.Finding) -> None:
     """Prints a link error."""
-    print(
-        f"{path}:{link.line_number}: "
-        f"[{link.label}]({link.destination}): "
-        f"{message}"
+    if error.context is None:
+        # Errors about the whole file, such as from parsing it.
+        print(f"Error in {path}: {error.message}")
+    else:
+        print(f"{path}:{error.line}: {error.context}: {error.message}")
+
+
+def _file_error(message: str) -> findings.Finding:
+    """Returns a finding about a whole file, such as from parsing it."""
+    return findings.Finding("check-links", None, message)
+
+
+def _link_error(
+    link: markdown_links.Link, message: str, suggestions: Sequence[str] = ()
+) -> findings.Finding:
+    return findings.Finding(
+        "check-links",
+        link.line_number,
+        message,
+        f"[{link.label}]({link.destination})",
+        tuple(suggestions),
     )
 
 
+class LinkCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+
+
+class _CacheEntry(object):
+    """A parsed document. Links are dropped once they've been checked."""
+
+    __slots__ = ("anchors", "links", "index", "fingerprint", "generation")
+
+    def __init__(
+        self,
+        anchors: FrozenSet[str],
+        links: Optional[List[markdown_links.Link]],
+        fingerprint: Optional[List[int]],
+        generation: int,
+    ) -> None:
+        self.anchors = anchors
+        self.links = links
+        # Built on demand, because most documents never need suggestions.
+        self.index: Optional[bk_tree.BKTree] = None
+        # The file's fingerprint when parsed, and the generation in which that
+        # was last known to be current.
+        self.fingerprint = fingerprint
+        self.generation = generation
+
+
 class LinkCache(object):
-    """Caches links for a file so that checks don't repeatedly parse files."""
+    """Caches links for a file so that checks don't repeatedly parse files.
+
+    Anchors are kept as frozensets of interned strings, so that common anchors
+    such as `overview` are shared between documents. A file's links are only
+    needed while checking that file, so `release_links` drops them afterwards.
+    At most `max_entries` documents are kept, evicting the least recently
+    used; 0 means no limit. Entries are reused across runs after `refresh`,
+    reparsing files which have since changed. With an `anchor_store`, anchors
+    of link targets are persisted, so that other runs needn't parse them.
+
+    Caches may be shared by worker threads. Files are parsed outside the lock,
+    so that threads parse in parallel; a file may rarely be parsed by two
+    threads at once, and the last parse is kept.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 0,
+        anchor_store: Optional[verdict_cache.VerdictCache] = None,
+    ) -> None:
+        self._cache: "collections.OrderedDict[Path, _CacheEntry]" = (
+            collections.OrderedDict()
+        )
+        self._max_entries = max_entries
+        self._anchor_store = anchor_store
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._generation = 0
+        # Guards the entries and stats.
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> LinkCacheStats:
+        return LinkCacheStats(self._hits, self._misses, self._evictions)
+
+    def _lookup(self, path: Path, need_links: bool) -> _CacheEntry:
+        """Returns the entry for path, parsing it if needed."""
+        assert path.is_absolute(), path
+        with self._lock:
+            entry = self._cache.get(path)
+        if entry is not None and entry.generation != self._generation:
+            if entry.fingerprint != verdict_cache.fingerprint(os.fspath(path)):
+                entry = None
+            else:
+                entry.generation = self._generation
+        if entry is not None and (entry.links is not None or not need_links):
+            with self._lock:
+                self._hits += 1
+                if path in self._cache:
+                    self._cache.move_to_end(path)
+            metrics.count("link_cache_hits")
+            return entry
+
+        with self._lock:
+            self._misses += 1
+        metrics.count("link_cache_misses")
+        fingerprint = verdict_cache.fingerprint(os.fspath(path))
+        contents = vfs.current().read(os.fspath(path))
+        store_key: Optional[str] = None
+        if self._anchor_store:
+            store_key = self._anchor_store.key(contents.encode())
+            if not need_links:
+                stored = self._anchor_store.get_anchors(store_key)
+                if stored is not None:
+                    anchors = frozenset(sys.intern(anchor) for anchor in stored)
+                    entry = _CacheEntry(
+                        anchors, None, fingerprint, self._generation
+                    )
+                    self._store(path, entry)
+                    return entry
 
-    def __init__(self) -> None:
-        self._cache: Dict[Path, Tuple[Set[str], List[markdown_links.Link]]] = {}
+        headers, links = markdown_links.get_links(contents)
+        anchors = frozenset(sys.intern(header.anchor) for header in headers)
+        if self._anchor_store and store_key:
+            self._anchor_store.put_anchors(store_key, sorted(anchors))
+        entry = _CacheEntry(anchors, links, fingerprint, self._generation)
+        self._store(path, entry)
+        return entry
 
-    def get(self, path: Path) -> Tuple[Set[str], List[markdown_links.Link]]:
+    def _store(self, path: Path, entry: _CacheEntry) -> None:
+        """Adds an entry, evicting the least recently used as needed."""
+        with self._lock:
+            self._cache[path] = entry
+            self._cache.move_to_end(path)
+            if self._max_entries:
+                while len(self._cache) > self._max_entries:
+                    self._cache.popitem(last=False)
+                    self._evictions += 1
+
+    def get(
+        self, path: Path
+    ) -> Tuple[FrozenSet[str], List[markdown_links.Link]]:
+        """Returns the anchors and links for a file."""
+        entry = self._lookup(path, need_links=True)
+        assert entry.links is not None
+        return (entry.anchors, entry.links)
+
+    def put(
+        self,
+        path: Path,
+        headers: List[markdown_links.Header],
+        links: List[markdown_links.Link],
+    ) -> None:
+        """Caches already parsed results for a file."""
         assert path.is_absolute(), path
-        if path not in self._cache:
-            with open(path) as f:
-                contents = f.read()
-            headers, links = markdown_links.get_links(contents)
-            anchors = set([header.anchor for header in headers])
-            self._cache[path] = (anchors, links)
-        return self._cache[path]
+        anchors = frozenset(sys.intern(header.anchor) for header in headers)
+        fingerprint = verdict_cache.fingerprint(os.fspath(path))
+        self._store(
+            path, _CacheEntry(anchors, links, fingerprint, self._generation)
+        )
+
+    def get_anchors(self, path: Path) -> FrozenSet[str]:
+        """Returns the anchors for a file, as needed for link targets."""
+        return self._lookup(path, need_links=False).anchors
+
+    def suggest_anchors(self, path: Path, fragment: str) -> List[str]:
+        """Returns the anchors in a file closest to the given fragment."""
+        entry = self._lookup(path, need_links=False)
+        if entry.index is None:
+            entry.index = bk_tree.BKTree(sorted(entry.anchors))
+        max_distance = max(2, len(fragment) // 3)
+        matches = entry.index.search(fragment, max_distance)
+        return [anchor for _, anchor in matches[:_MAX_SUGGESTIONS]]
+
+    def refresh(self) -> None:
+        """Revalidates entries against their files when they're next used."""
+        self._generation += 1
+
+    def invalidate(self, path: Path) -> None:
+        with self._lock:
+            self._cache.pop(path, None)
+
+    def release_links(self, path: Path) -> None:
+        """Drops a file's links, keeping its anchors for incoming links."""
+        with self._lock:
+            entry = self._cache.get(path)
+        if entry is not None:
+            entry.links = None
+
+
+def _repo_path(repo_root: Path, path: Path) -> str:
+    """Returns the repository-relative path, using forward slashes."""
+    return Path(os.path.relpath(os.path.normpath(path), repo_root)).as_posix()
+
+
+def _find_import(
+    imports: Sequence[Tuple[str, anchor_manifest.AnchorManifest]],
+    repo_root: Path,
+    dest_path: Path,
+) -> Optional[Tuple[anchor_manifest.AnchorManifest, str]]:
+    """Returns the manifest and manifest-relative path for an imported link."""
+    if not imports:
+        return None
+    rel_path = _repo_path(repo_root, dest_path)
+    for prefix, manifest in imports:
+        if rel_path == prefix:
+            return (manifest, "")
+        if rel_path.startswith(prefix + "/"):
+            return (manifest, rel_path.split(prefix + "/", 1)[1])
+    return None
+
 
+def _check_imported_link(
+    manifest: anchor_manifest.AnchorManifest,
+    rel_path: str,
+    fragment: str,
+) -> Optional[str]:
+    """Validates a link against a manifest, returning an error if any."""
+    if manifest.is_dir(rel_path):
+        # As with local directories, only links with fragments are checked.
+        if not fragment:
+            return None
+        rel_path = "/".join(filter(None, (rel_path, "README.md")))
+    elif not rel_path.endswith(".md"):
+        # Only markdown files are listed in manifests.
+        return None
+    anchors = manifest.get(rel_path)
+    if anchors is None:
+        return "Link points at a non-existent file."
+    if fragment and fragment not in anchors:
+        return "Link points at a non-existent anchor."
+    return None
 
+
+def _anchor_error(
+    link_cache: LinkCache,
+    link: markdown_links.Link,
+    path: Path,
+    fragment: str,
+    prefix: str = "",
+) -> findings.Finding:
+    """Returns the error for a missing anchor, with any suggestions."""
+    message = "Link points at a non-existent anchor."
+    suggestions = [
+        f"{prefix}#{anchor}"
+        for anchor in link_cache.suggest_anchors(path, fragment)
+    ]
+    if suggestions:
+        message += " Did you mean %s?" % ", ".join(
+            f"`{suggestion}`" for suggestion in suggestions
+        )
+    return _link_error(link, message, suggestions)
+
+
+@tracing.traced("resolve links")
 def _check_links(
-    link_cache: LinkCache, repo_root: Path, path: str, anchors_only: bool
-) -> bool:
-    """Validates links in the given file, returning true on errors."""
+    link_cache: LinkCache,
+    repo_root: Path,
+    path: str,
+    anchors_only: bool,
+    imports: Sequence[Tuple[str, anchor_manifest.AnchorManifest]] = (),
+    graph: Optional[link_graph.LinkGraph] = None,
+    targets: Optional[Set[Path]] = None,
+) -> List[findings.Finding]:
+    """Validates links in the given file, returning any errors.
+
+    If targets is given, the files and directories linked to are added to it.
+    """
+    fs = vfs.current()
     absolute_path = Path(path).resolve()
     anchors, links = link_cache.get(absolute_path)
+    if graph:
+        source = _repo_path(repo_root, absolute_path)
+        graph.add_document(source)
 
-    has_errors = False
+    errors = []
     for link in links:
         dest_url = parse.urlsplit(link.destination)
         if dest_url.scheme:
             # If a scheme (such as https:) is specified, don't check further.
             continue
         elif dest_url.netloc:
-            _print_error(
-                path, link, "Link is missing a scheme, such as https://."
+            errors.append(
+                _link_error(link, "Link is missing a scheme, such as https://.")
             )
-            has_errors = True
         elif dest_url.path:
+            url_path = Path(dest_url.path)
+            if url_path.is_absolute():
+                # Absolute paths are actually relative to the repo root.
+                dest_path = repo_root.joinpath(dest_url.path.lstrip("/"))
+            else:
+                # Relative paths are relative to the current file's dir.
+                dest_path = absolute_path.parent.joinpath(url_path)
+            if targets is not None:
+                targets.add(dest_path.resolve())
+            if graph:
+                graph_path = dest_path
+                if fs.is_dir(os.fspath(graph_path)):
+                    graph_path = graph_path.joinpath("README.md")
+                graph.add_edge(
+                    source,
+                    _repo_path(repo_root, graph_path),
+                    dest_url.fragment,
+                    link.line_number,
+                )
             if not anchors_only:
-                url_path = Path(dest_url.path)
-                if url_path.is_absolute():
-                    # Absolute paths are actually relative to the repo root.
-                    dest_path = repo_root.joinpath(dest_url.path.lstrip("/"))
-                else:
-                    # Relative paths are relative to the current file's dir.
-                    dest_path = absolute_path.parent.joinpath(url_path)
-                if dest_path.is_dir():
+                verdict_cache.depend_on(dest_path)
+                imported = _find_import(imports, repo_root, dest_path)
+                if imported:
+                    message = _check_imported_link(*imported, dest_url.fragment)
+                    if message:
+                        errors.append(_link_error(link, message))
+                    continue
+                if fs.is_dir(os.fspath(dest_path)):
                     # If it's pointing at a directory, we only validate further
                     # if there's a fragment -- that implies it's actually
                     # linking a README.md.
                     if not dest_url.fragment:
                         continue
                     dest_path = dest_path.joinpath("README.md")
+                    verdict_cache.depend_on(dest_path)
                 # Verify the file exists.
-                if not dest_path.is_file():
-                    _print_error(
-                        path, link, "Link points at a non-existent file."
+                if not fs.is_file(os.fspath(dest_path)):
+                    errors.append(
+                        _link_error(link, "Link points at a non-existent file.")
                     )
-                    has_errors = True
                     continue
                 # Check anchors.
                 if (
                     dest_url.fragment
-                    and dest_url.fragment not in link_cache.get(dest_path)[0]
+                    and dest_url.fragment
+                    not in link_cache.get_anchors(dest_path)
                 ):
-                    _print_error(
-                        path, link, "Link points at a non-existent anchor."
+                    errors.append(
+                        _anchor_error(
+                            link_cache,
+                            link,
+                            dest_path,
+                            dest_url.fragment,
+                            prefix=dest_url.path,
+                        )
                     )
-                    has_errors = True
                     continue
         elif dest_url.fragment:
             # There's only a fragment, so it's an internal anchor.
+            if graph:
+                graph.add_edge(
+                    source, source, dest_url.fragment, link.line_number
+                )
             if dest_url.fragment not in anchors:
-                _print_error(
-                    path, link, "Link points at a non-existent anchor."
+                errors.append(
+                    _anchor_error(
+                        link_cache, link, absolute_path, dest_url.fragment
+                    )
                 )
-                has_errors = True
-    return has_errors
+    link_cache.release_links(absolute_path)
+    return errors
+
+
+def _print_graph_report(graph: link_graph.LinkGraph) -> None:
+    """Prints orphaned documents and the most linked anchors."""
+    orphans = graph.orphans()
+    print("Documents with no inbound links: %d" % len(orphans))
+    for orphan in orphans:
+        print(f"  {orphan}")
+    top_anchors = graph.top_anchors(_GRAPH_TOP_ANCHORS)
+    print("Most linked anchors:")
+    for count, anchor_path, anchor in top_anchors:
+        print(f"  {count:6d} {anchor_path}#{anchor}")
+
+
+class LinkChecker(object):
+    """Checks links across files, sharing state for the whole run."""
+
+    def __init__(
+        self,
+        parsed_args: argparse.Namespace,
+        repo_root: Optional[Path] = None,
+    ) -> None:
+        self._anchors_only: bool = parsed_args.anchors_only
+        self._export_anchors: Optional[str] = parsed_args.export_anchors
+        # Looked up on first use if not given, because runs may not check any
+        # links.
+        self._repo_root_path = repo_root
+
+        self._import_anchors: List[Tuple[str, str]] = parsed_args.import_anchors
+        self._manifest_paths: List[str] = [
+            manifest_path for _, manifest_path in self._import_anchors
+        ]
+        self._load_imports()
+
+        self._graph_file: Optional[TextIO] = None
+        self._graph: Optional[link_graph.LinkGraph] = None
+        if parsed_args.graph:
+            self._graph_file = open(parsed_args.graph, "w")
+            self._graph = link_graph.LinkGraph(self._graph_file)
+
+        # With --cache, link targets' anchors are shared with other runs, such
+        # as other shards of a CI run.
+        self._anchor_store: Optional[verdict_cache.VerdictCache] = None
+        if parsed_args.cache:
+            self._anchor_store = verdict_cache.VerdictCache(
+                parsed_args.cache_dir,
+                "check-links-anchors",
+                {},
+            )
+        self.link_cache = LinkCache(
+            parsed_args.link_cache_size, self._anchor_store
+        )
+        self._exported: Dict[str, FrozenSet[str]] = {}
+
+        # With --watch, the checked files linking to each target, so that they
+        # can be checked again when it changes.
+        self._linked_from: Optional[Dict[Path, Set[str]]] = None
+        self._links_to: Dict[str, Set[Path]] = {}
+        if parsed_args.watch is not None:
+            self._linked_from = collections.defaultdict(set)
+
+    @property
+    def _repo_root(self) -> Path:
+        if self._repo_root_path is None:
+            self._repo_root_path = Path(
+                subprocess.check_output(["git", "rev-parse", "--show-toplevel"])
+                .rstrip()
+                .decode("utf-8")
+            )
+        return self._repo_root_path
+
+    def _load_imports(self) -> None:
+        """Loads manifests for --import-anchors."""
+        self._manifest_fingerprints = [
+            verdict_cache.fingerprint(manifest_path)
+            for manifest_path in self._manifest_paths
+        ]
+        # Check longer prefixes first, so that nested imports take precedence.
+        self._imports = sorted(
+            (
+                (prefix, anchor_manifest.AnchorManifest.load(manifest_path))
+                for prefix, manifest_path in self._import_anchors
+            ),
+            key=lambda x: len(x[0]),
+            reverse=True,
+        )
+
+    def refresh(self) -> None:
+        """Prepares to check files again, reloading anything changed."""
+        if self._manifest_fingerprints != [
+            verdict_cache.fingerprint(manifest_path)
+            for manifest_path in self._manifest_paths
+        ]:
+            self._load_imports()
+        self.link_cache.refresh()
+
+    def check(self, path: str) -> List[findings.Finding]:
+        """Checks links in a file, returning any errors."""
+        for manifest_path in self._manifest_paths:
+            verdict_cache.depend_on(manifest_path)
+        targets: Optional[Set[Path]] = None
+        if self._linked_from is not None:
+            targets = set()
+        errors = _check_links(
+            self.link_cache,
+            self._repo_root,
+            path,
+            self._anchors_only,
+            self._imports,
+            self._graph,
+            targets,
+        )
+        if targets is not None:
+            self._track_links(path, targets)
+        if self._export_anchors:
+            absolute_path = Path(path).resolve()
+            self._exported[_repo_path(self._repo_root, absolute_path)] = (
+                self.link_cache.get_anchors(absolute_path)
+            )
+        return errors
+
+    def _track_links(self, path: str, targets: Set[Path]) -> None:
+        """Records the targets that a file links to, for dependents."""
+        assert self._linked_from is not None
+        for target in self._links_to.get(path, set()) - targets:
+            self._linked_from[target].discard(path)
+        for target in targets:
+            self._linked_from[target].add(path)
+        self._links_to[path] = targets
+
+    def dependents(self, path: str) -> List[str]:
+        """Returns checked files linking to a path, with --watch."""
+        if not self._linked_from:
+            return []
+        absolute_path = Path(path).resolve()
+        sources = set(self._linked_from.get(absolute_path, ()))
+        if absolute_path.name == "README.md":
+            # Links to a directory with an anchor are checked against its
+            # README.md.
+            sources.update(self._linked_from.get(absolute_path.parent, ()))
+        return sorted(sources)
+
+    def finish(self) -> None:
+        """Writes any outputs that cover the whole run."""
+        if self._graph_file and self._graph:
+            self._graph_file.close()
+            _print_graph_report(self._graph)
+        if self._export_anchors:
+            anchor_manifest.AnchorManifest(self._exported).dump(
+                self._export_anchors
+            )
+        if self._anchor_store:
+            self._anchor_store.close()
+
+
+def _check(checker: LinkChecker, path: str) -> bool:
+    """Checks a path, returning true on errors."""
+    errors = checker.check(path)
+    for error in errors:
+        print_error(path, error)
+    return bool(errors)
+
+
+def _dependents(checker: LinkChecker, path: str) -> List[str]:
+    """Returns checked files linking to a path."""
+    return checker.dependents(path)
 
 
 def main(argv: Optional[List[str]] = None) -> int:
     if not argv:
         argv = sys.argv
     parsed_args = _parse_args(argv[1:])
-    paths = parsed_args.paths
-
-    repo_root = Path(
-        subprocess.check_output(["git", "rev-parse", "--show-toplevel"])
-        .rstrip()
-        .decode("utf-8")
+    return executor.run(
+        "check-links",
+        parsed_args,
+        functools.partial(LinkChecker, parsed_args),
+        _check,
+        wants=lambda path: path.endswith(".md"),
+        finish=LinkChecker.finish,
+        # These cover every checked file.
+        needs_all_files=bool(parsed_args.graph or parsed_args.export_anchors),
+        dependents=_dependents,
     )
 
-    link_cache = LinkCache()
-    exit_code = 0
-    for path in paths:
-        if not path.endswith(".md"):
-            continue
-        if _check_links(link_cache, repo_root, path, parsed_args.anchors_only):
-            exit_code = 1
-    return exit_code
-
 
 if __name__ == "__main__":
     sys.exit(main())
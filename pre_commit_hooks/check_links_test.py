@@ -16,13 +16,21 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import concurrent.futures
+import contextlib
+import io
+import json
 from pathlib import Path
 import tempfile
-from typing import List
+from typing import Iterator, List, Set
+import unittest
 from unittest import mock
 
+from pre_commit_hooks import anchor_manifest
 from pre_commit_hooks import check_links
 from pre_commit_hooks import file_test_case
+from pre_commit_hooks import markdown_links
+from pre_commit_hooks import verdict_cache
 
 
 class TestMarkdownToc(file_test_case.FileTestCase):
@@ -41,7 +49,7 @@ class TestMarkdownToc(file_test_case.FileTestCase):
         )
 
         self._error_patcher = mock.patch(
-            "pre_commit_hooks.check_links._print_error"
+            "pre_commit_hooks.check_links.print_error"
         )
         self._print_error = self._error_patcher.start()
         self._subprocess_patcher = mock.patch(
@@ -51,7 +59,7 @@ class TestMarkdownToc(file_test_case.FileTestCase):
         self._check_output.return_value = self._root_temp_dir.name.encode()
 
     def tearDown(self) -> None:
-        self._print_error.stop()
+        self._error_patcher.stop()
         self._subprocess_patcher.stop()
 
     def _assert_success(self, contents: str) -> None:
@@ -61,7 +69,7 @@ class TestMarkdownToc(file_test_case.FileTestCase):
     def _assert_error(self, contents: str, error: str) -> None:
         self.assert_exit_code(contents, exit_code=1)
         self._print_error.assert_called_once()
-        self.assertEqual(self._print_error.call_args.args[2], error)
+        self.assertEqual(self._print_error.call_args.args[1].message, error)
 
     def _write(self, filename: str, contents: str) -> None:
         readme_path = Path(self._root_temp_dir.name).joinpath(filename)
@@ -161,3 +169,230 @@ class TestMarkdownToc(file_test_case.FileTestCase):
         self._assert_error(
             "[test](../test.md#foo)", "Link points at a non-existent anchor."
         )
+
+    def test_scaling(self) -> None:
+        self.assert_scales(
+            lambda n: "".join(
+                "## Section %d\n\n[next](#section-%d)\n\n" % (i, (i + 1) % n)
+                for i in range(n)
+            )
+        )
+
+    def test_bad_link_suggestion(self) -> None:
+        self._assert_error(
+            "# Getting started\n\n## Set up\n\n[test](#setup)",
+            "Link points at a non-existent anchor. Did you mean `#set-up`?",
+        )
+
+    def test_absolute_anchor_suggestion(self) -> None:
+        self._write("test.md", "# Installation\n\n## Install\n")
+        self._assert_error(
+            "[test](/test.md#instal)",
+            "Link points at a non-existent anchor. Did you mean "
+            "`/test.md#install`?",
+        )
+
+    def _write_manifest(self) -> str:
+        manifest_path = Path(self._root_temp_dir.name).joinpath("other.json")
+        anchor_manifest.AnchorManifest(
+            {"README.md": ["top"], "docs/a.md": ["foo"]}
+        ).dump(str(manifest_path))
+        return str(manifest_path)
+
+    def test_import_anchors(self) -> None:
+        self._flags = ["--import-anchors", f"other={self._write_manifest()}"]
+        self._assert_success("[test](/other/docs/a.md#foo)")
+
+    def test_import_anchors_relative(self) -> None:
+        self._flags = ["--import-anchors", f"/other/={self._write_manifest()}"]
+        self._assert_success("[test](../other/#top)")
+
+    def test_import_anchors_file_missing(self) -> None:
+        self._flags = ["--import-anchors", f"other={self._write_manifest()}"]
+        self._assert_error(
+            "[test](/other/docs/b.md)", "Link points at a non-existent file."
+        )
+
+    def test_import_anchors_anchor_missing(self) -> None:
+        self._flags = ["--import-anchors", f"other={self._write_manifest()}"]
+        self._assert_error(
+            "[test](/other/docs/a.md#bar)",
+            "Link points at a non-existent anchor.",
+        )
+
+    def test_import_anchors_invalid(self) -> None:
+        for arg in ("other", "=other.json", "/=other.json", "other="):
+            with mock.patch("sys.stderr"):
+                self.assertRaises(
+                    SystemExit,
+                    check_links._parse_args,
+                    ["--import-anchors", arg],
+                )
+
+    def test_link_cache_size_invalid(self) -> None:
+        for arg in ("-1", "x", ""):
+            with mock.patch("sys.stderr"):
+                self.assertRaises(
+                    SystemExit,
+                    check_links._parse_args,
+                    ["--link-cache-size", arg],
+                )
+        args = check_links._parse_args(["--link-cache-size", "0", "a.md"])
+        self.assertEqual(args.link_cache_size, 0)
+
+    def test_export_anchors(self) -> None:
+        manifest_path = Path(self._root_temp_dir.name).joinpath("out.json")
+        self._flags = ["--export-anchors", str(manifest_path)]
+        self._assert_success("# Foo\n\n## Bar\n")
+        manifest = anchor_manifest.AnchorManifest.load(str(manifest_path))
+        (rel_path,) = json.loads(manifest_path.read_text())["anchors"]
+        assert self.temp_dir is not None
+        self.assertEqual(
+            Path(self._root_temp_dir.name).joinpath(rel_path).parent,
+            Path(self.temp_dir.name),
+        )
+        self.assertEqual(manifest.get(rel_path), frozenset(["foo", "bar"]))
+
+    def test_graph(self) -> None:
+        self._write("README.md", "# Readme\n")
+        self._write("test.md", "# Test\n\n[readme](/#readme)\n")
+        graph_path = Path(self._root_temp_dir.name).joinpath("graph.jsonl")
+        self._flags = ["--graph", str(graph_path)]
+        with mock.patch("builtins.print") as mock_print:
+            self._assert_success("# Foo\n\n[test](../test.md)\n[foo](#foo)")
+        edges = [
+            json.loads(line) for line in graph_path.read_text().splitlines()
+        ]
+        self.assertEqual(
+            [(edge["target"], edge["anchor"]) for edge in edges],
+            [("test.md", ""), (edges[0]["source"], "foo")],
+        )
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        self.assertEqual(
+            printed,
+            [
+                "Documents with no inbound links: 1",
+                f"  {edges[0]['source']}",
+                "Most linked anchors:",
+                f"       1 {edges[0]['source']}#foo",
+            ],
+        )
+
+    def test_watch(self) -> None:
+        root = Path(self._root_temp_dir.name)
+        self._write("target.md", "# Old\n")
+        self._write("source.md", "[test](/target.md#newer)\n")
+
+        def changes() -> Iterator[Set[str]]:
+            self._write("target.md", "# Newer\n")
+            yield {str(root.joinpath("target.md"))}
+
+        with mock.patch(
+            "pre_commit_hooks.watch.Watcher"
+        ) as watcher, contextlib.redirect_stderr(io.StringIO()):
+            watcher.return_value.changes.side_effect = changes
+            exit_code = check_links.main(["bin", "--watch", str(root)])
+        # The source is checked again once its target changes.
+        self.assertEqual(exit_code, 0)
+        self._print_error.assert_called_once()
+        self.assertEqual(
+            self._print_error.call_args.args[1].message,
+            "Link points at a non-existent anchor.",
+        )
+
+
+class TestLinkCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._root = Path(self._temp_dir.name)
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def _write(self, filename: str, contents: str) -> Path:
+        path = self._root.joinpath(filename)
+        path.write_text(contents)
+        return path
+
+    def test_hits_and_misses(self) -> None:
+        path = self._write("a.md", "# Foo\n\n[bar](#bar)\n")
+        link_cache = check_links.LinkCache()
+        anchors, links = link_cache.get(path)
+        self.assertEqual(anchors, frozenset(["foo"]))
+        self.assertEqual(len(links), 1)
+        self.assertEqual(link_cache.get_anchors(path), frozenset(["foo"]))
+        self.assertEqual(link_cache.stats, check_links.LinkCacheStats(1, 1, 0))
+
+    def test_release_links(self) -> None:
+        path = self._write("a.md", "# Foo\n\n[bar](#bar)\n")
+        link_cache = check_links.LinkCache()
+        link_cache.get(path)
+        link_cache.release_links(path)
+        # Anchors remain cached, but links require a re-parse.
+        link_cache.get_anchors(path)
+        self.assertEqual(link_cache.stats, check_links.LinkCacheStats(1, 1, 0))
+        _, links = link_cache.get(path)
+        self.assertEqual(len(links), 1)
+        self.assertEqual(link_cache.stats, check_links.LinkCacheStats(1, 2, 0))
+
+    def test_eviction(self) -> None:
+        paths = [self._write(f"{i}.md", f"# Doc {i}\n") for i in range(3)]
+        link_cache = check_links.LinkCache(max_entries=2)
+        for path in paths:
+            link_cache.get_anchors(path)
+        # The first path was least recently used, so it was evicted.
+        self.assertEqual(link_cache.stats, check_links.LinkCacheStats(0, 3, 1))
+        link_cache.get_anchors(paths[2])
+        link_cache.get_anchors(paths[0])
+        self.assertEqual(link_cache.stats, check_links.LinkCacheStats(1, 4, 2))
+
+    def test_threads(self) -> None:
+        paths = [self._write(f"{i}.md", f"# Doc {i}\n") for i in range(8)]
+        link_cache = check_links.LinkCache(max_entries=4)
+        with concurrent.futures.ThreadPoolExecutor(4) as pool:
+            anchors = list(pool.map(link_cache.get_anchors, paths * 50))
+        self.assertEqual(
+            anchors, [frozenset([f"doc-{i % 8}"]) for i in range(400)]
+        )
+        # Every lookup is counted, though threads may parse a file at once.
+        stats = link_cache.stats
+        self.assertEqual(stats.hits + stats.misses, 400)
+
+    def test_interned_anchors(self) -> None:
+        first = self._write("a.md", "# Overview\n")
+        second = self._write("b.md", "# Overview\n")
+        link_cache = check_links.LinkCache()
+        (first_anchor,) = link_cache.get_anchors(first)
+        (second_anchor,) = link_cache.get_anchors(second)
+        self.assertIs(first_anchor, second_anchor)
+
+    def test_refresh(self) -> None:
+        path = self._write("a.md", "# Foo\n")
+        link_cache = check_links.LinkCache()
+        link_cache.get_anchors(path)
+        link_cache.refresh()
+        link_cache.get_anchors(path)
+        self.assertEqual(link_cache.stats, check_links.LinkCacheStats(1, 1, 0))
+        # Changed files are reparsed after a refresh.
+        self._write("a.md", "# Foo bar\n")
+        link_cache.refresh()
+        self.assertEqual(link_cache.get_anchors(path), frozenset(["foo-bar"]))
+        self.assertEqual(link_cache.stats, check_links.LinkCacheStats(1, 2, 0))
+
+    def test_anchor_store(self) -> None:
+        path = self._write("a.md", "# Foo\n\n[bar](#bar)\n")
+        store = verdict_cache.VerdictCache(self._temp_dir.name, "test", {})
+        self.addCleanup(store.close)
+        check_links.LinkCache(anchor_store=store).get(path)
+        # Other caches reuse stored anchors of link targets.
+        link_cache = check_links.LinkCache(anchor_store=store)
+        with mock.patch(
+            "pre_commit_hooks.markdown_links.get_links",
+            wraps=markdown_links.get_links,
+        ) as get_links:
+            self.assertEqual(link_cache.get_anchors(path), frozenset(["foo"]))
+            self.assertEqual(get_links.call_count, 0)
+            # Links still require a parse.
+            _, links = link_cache.get(path)
+            self.assertEqual(len(links), 1)
+            self.assertEqual(get_links.call_count, 1)
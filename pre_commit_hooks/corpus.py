@@ -0,0 +1,245 @@
+"""Generates synthetic repositories for benchmarking hooks.
+
+Corpora are deterministic for a given configuration, so that benchmark
+results from different revisions are comparable.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import math
+import os
+import random
+import subprocess
+from typing import List, NamedTuple
+
+# Text for paragraphs, including a few words that check-google-doc-style
+# replaces.
+_WORDS = (
+    "the a an of to and in is for on with that by this be are from as it or "
+    "can file files check checks link links header headers document page "
+    "repository directory configuration option value default run runs hook "
+    "hooks example table contents section index build test tests change "
+    "changes error errors update updates path paths anchor anchors guide "
+    "user users install setup release version format output input"
+).split()
+_STYLE_WORDS = ("repo", "e.g.", "via", "filesystem", "flag")
+_STYLE_WORD_RATIO = 0.002
+
+# Words for header labels.
+_HEADER_WORDS = (
+    "Overview Setup Usage Options Examples Configuration Troubleshooting "
+    "Reference Installation Background Design Testing Releases Limitations "
+    "Migration Performance Security Glossary Alternatives Appendix"
+).split()
+
+_COPYRIGHT = """Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License."""
+
+# Files per directory, so that directories have realistic sizes.
+_FILES_PER_DIR = 20
+
+# The spread of file sizes, as the sigma of a lognormal distribution.
+_SIZE_SIGMA = 0.75
+
+# The fraction of markdown files with a table of contents.
+_TOC_RATIO = 0.2
+
+
+class CorpusConfig(NamedTuple):
+    # The number of files, of which code_ratio are code and the rest markdown.
+    files: int = 1000
+    # The mean file size in bytes; sizes vary around it.
+    size: int = 4096
+    # Headers per KiB of markdown.
+    heading_density: float = 1.0
+    # Links to other documents per markdown file.
+    link_fanout: int = 8
+    # The fraction of links to an anchor that doesn't exist.
+    missing_anchor_ratio: float = 0.05
+    # The fraction of links to a file that doesn't exist.
+    broken_link_ratio: float = 0.02
+    code_ratio: float = 0.3
+    # The fraction of files without a copyright.
+    missing_copyright_ratio: float = 0.05
+    seed: int = 0
+
+
+class _Doc(NamedTuple):
+    path: str
+    size: int
+    headers: List[str]
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds flags for each CorpusConfig field."""
+    for name, default in CorpusConfig._field_defaults.items():
+        parser.add_argument(
+            "--" + name.replace("_", "-"),
+            type=type(default),
+            default=default,
+            help="Defaults to %(default)s.",
+        )
+
+
+def config_from_args(parsed_args: argparse.Namespace) -> CorpusConfig:
+    return CorpusConfig(
+        **{name: getattr(parsed_args, name) for name in CorpusConfig._fields}
+    )
+
+
+def _paragraph(rng: random.Random, size: int) -> str:
+    """Returns a paragraph of roughly size characters, wrapped at 80."""
+    lines: List[str] = []
+    line: List[str] = []
+    line_len = 0
+    total = 0
+    while total < size:
+        if rng.random() < _STYLE_WORD_RATIO:
+            word = rng.choice(_STYLE_WORDS)
+        else:
+            word = rng.choice(_WORDS)
+        if line_len + len(word) + 1 > 80:
+            lines.append(" ".join(line))
+            line = []
+            line_len = 0
+        line.append(word)
+        line_len += len(word) + 1
+        total += len(word) + 1
+    if line:
+        lines.append(" ".join(line))
+    return "\n".join(lines) + ".\n"
+
+
+def _anchor(label: str) -> str:
+    return label.lower().replace(" ", "-")
+
+
+def _plan(rng: random.Random, config: CorpusConfig) -> List[_Doc]:
+    """Chooses the path, size, and headers of each markdown file."""
+    doc_count = config.files - round(config.files * config.code_ratio)
+    # Scales lognormal sizes to have the configured mean.
+    scale = config.size / math.exp(_SIZE_SIGMA**2 / 2)
+    docs = []
+    for i in range(doc_count):
+        path = "docs/section%d/page%d.md" % (i // _FILES_PER_DIR, i)
+        size = max(200, int(scale * rng.lognormvariate(0, _SIZE_SIGMA)))
+        header_count = max(1, round(size / 1024 * config.heading_density))
+        headers = [
+            "%s %d" % (rng.choice(_HEADER_WORDS), j)
+            for j in range(header_count)
+        ]
+        docs.append(_Doc(path, size, headers))
+    return docs
+
+
+def _link(
+    rng: random.Random, config: CorpusConfig, doc: _Doc, docs: List[_Doc]
+) -> str:
+    """Returns a link from doc to another document."""
+    target = rng.choice(docs)
+    rel_path = os.path.relpath(target.path, os.path.dirname(doc.path))
+    anchor = _anchor(rng.choice(target.headers))
+    roll = rng.random()
+    if roll < config.broken_link_ratio:
+        rel_path = rel_path.replace(".md", "-missing.md")
+    elif roll < config.broken_link_ratio + config.missing_anchor_ratio:
+        anchor += "-missing"
+    return "[%s](%s#%s)" % (rng.choice(_WORDS), rel_path, anchor)
+
+
+def _markdown(
+    rng: random.Random, config: CorpusConfig, doc: _Doc, docs: List[_Doc]
+) -> str:
+    parts = []
+    if rng.random() >= config.missing_copyright_ratio:
+        parts.append("<!--\n%s\n-->\n" % _COPYRIGHT)
+    title = os.path.splitext(os.path.basename(doc.path))[0]
+    parts.append("# %s\n" % title)
+    if rng.random() < _TOC_RATIO:
+        parts.append("<!-- toc -->\n<!-- tocstop -->\n")
+    # Spread text and links evenly between headers.
+    sections = len(doc.headers)
+    section_size = doc.size // sections
+    for i, header in enumerate(doc.headers):
+        parts.append("## %s\n" % header)
+        parts.append(_paragraph(rng, section_size))
+        link_count = (
+            config.link_fanout * (i + 1) // sections
+            - config.link_fanout * i // sections
+        )
+        links = [_link(rng, config, doc, docs) for _ in range(link_count)]
+        if rng.random() < 0.5:
+            links.append("[%s](#%s)" % (header, _anchor(header)))
+        if links:
+            parts.append("See %s.\n" % ", ".join(links))
+    return "\n".join(parts)
+
+
+def _code(rng: random.Random, config: CorpusConfig) -> str:
+    scale = config.size / math.exp(_SIZE_SIGMA**2 / 2)
+    size = max(100, int(scale * rng.lognormvariate(0, _SIZE_SIGMA)))
+    lines = ['"""A generated module."""\n']
+    if rng.random() >= config.missing_copyright_ratio:
+        lines.append('__copyright__ = """\n%s\n"""\n' % _COPYRIGHT)
+    total = sum(len(line) for line in lines)
+    i = 0
+    while total < size:
+        line = "value_%d = %r\n" % (i, rng.choice(_WORDS))
+        lines.append(line)
+        total += len(line)
+        i += 1
+    return "".join(lines)
+
+
+def generate(root: str, config: CorpusConfig) -> List[str]:
+    """Writes a corpus under root, returning the relative paths written.
+
+    root is initialized as a git repository, because check-links looks up the
+    repository root.
+    """
+    rng = random.Random(config.seed)
+    docs = _plan(rng, config)
+    paths = []
+    for doc in docs:
+        paths.append(doc.path)
+        _write(root, doc.path, _markdown(rng, config, doc, docs))
+    for i in range(config.files - len(docs)):
+        path = "src/package%d/module%d.py" % (i // _FILES_PER_DIR, i)
+        paths.append(path)
+        _write(root, path, _code(rng, config))
+    if not os.path.exists(os.path.join(root, ".git")):
+        subprocess.check_call(["git", "init", "-q"], cwd=root)
+    return paths
+
+
+def _write(root: str, path: str, contents: str) -> None:
+    full_path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "w") as f:
+        f.write(contents)
@@ -0,0 +1,95 @@
+"""Tests for corpus.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import os
+import re
+import shutil
+import tempfile
+from typing import Dict, List
+import unittest
+
+from pre_commit_hooks import corpus
+
+
+def _read_all(root: str, paths: List[str]) -> Dict[str, str]:
+    contents = {}
+    for path in paths:
+        with open(os.path.join(root, path)) as f:
+            contents[path] = f.read()
+    return contents
+
+
+@unittest.skipUnless(shutil.which("git"), "Requires git")
+class TestCorpus(unittest.TestCase):
+    def _generate(self, config: corpus.CorpusConfig) -> Dict[str, str]:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        paths = corpus.generate(temp_dir.name, config)
+        self.assertTrue(os.path.isdir(os.path.join(temp_dir.name, ".git")))
+        return _read_all(temp_dir.name, paths)
+
+    def test_deterministic(self) -> None:
+        config = corpus.CorpusConfig(files=20)
+        self.assertEqual(self._generate(config), self._generate(config))
+        self.assertNotEqual(
+            self._generate(config),
+            self._generate(config._replace(seed=1)),
+        )
+
+    def test_config(self) -> None:
+        files = self._generate(
+            corpus.CorpusConfig(
+                files=200,
+                size=2048,
+                link_fanout=4,
+                code_ratio=0.25,
+                missing_anchor_ratio=0.2,
+                broken_link_ratio=0.1,
+                missing_copyright_ratio=0,
+            )
+        )
+        self.assertEqual(len(files), 200)
+        docs = [c for p, c in files.items() if p.endswith(".md")]
+        self.assertEqual(len(docs), 150)
+        self.assertTrue(all("Copyright" in c for c in files.values()))
+        mean_size = sum(len(c) for c in files.values()) / len(files)
+        self.assertGreater(mean_size, 1024)
+        self.assertLess(mean_size, 4096)
+
+        links = [
+            link
+            for contents in docs
+            for link in re.findall(r"\]\(([^#)]*\.md)#([^)]*)\)", contents)
+        ]
+        self.assertEqual(len(links), 150 * 4)
+        broken = sum(path.endswith("-missing.md") for path, _ in links)
+        missing_anchor = sum(anchor.endswith("-missing") for _, anchor in links)
+        self.assertAlmostEqual(broken / len(links), 0.1, delta=0.05)
+        self.assertAlmostEqual(missing_anchor / len(links), 0.2, delta=0.05)
+
+    def test_arguments(self) -> None:
+        parser = argparse.ArgumentParser()
+        corpus.add_arguments(parser)
+        config = corpus.config_from_args(
+            parser.parse_args(["--files=10", "--broken-link-ratio=0.5"])
+        )
+        self.assertEqual(
+            config,
+            corpus.CorpusConfig(files=10, broken_link_ratio=0.5),
+        )
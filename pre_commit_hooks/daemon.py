@@ -0,0 +1,450 @@
+"""Runs hooks in a long-lived process, avoiding startup costs for each batch.
+
+pre-commit splits files into many batches, each of which would otherwise pay
+for starting Python, importing dependencies, and compiling patterns. The
+daemon keeps that state, along with parsed files, in memory between batches.
+Console scripts forward to a running daemon for the repository, and run hooks
+in-process if there isn't one.
+
+This module is imported by every console script, so the client side only uses
+modules which are cheap to import; the server side imports hooks lazily.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Console scripts, with the modules whose main functions implement them.
+_HOOK_MODULES = {
+    "check-copyright": "pre_commit_hooks.check_copyright",
+    "check-google-doc-style": "pre_commit_hooks.check_google_doc_style",
+    "check-links": "pre_commit_hooks.check_links",
+    "markdown-toc": "pre_commit_hooks.markdown_toc",
+    "pre-commit-tool-hooks": "pre_commit_hooks.runner",
+}
+
+# Changes to this file discard kept state, since hook options may change.
+_CONFIG_FILE = ".pre-commit-config.yaml"
+
+DEFAULT_IDLE_TIMEOUT_SECS = 60 * 60
+
+# How long `start` waits for a new daemon to accept connections.
+_START_TIMEOUT_SECS = 10
+
+
+def find_repo_root(path: str) -> Optional[str]:
+    """Returns the repository containing path, or None if there isn't one."""
+    path = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def socket_path(repo_root: str) -> Optional[str]:
+    """Returns the daemon's socket for a repository, if sockets are supported.
+
+    Sockets are kept in a directory only accessible by the current user.
+    """
+    if not hasattr(socket, "AF_UNIX") or not hasattr(os, "getuid"):
+        return None
+    runtime_dir = (
+        os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    )
+    socket_dir = os.path.join(
+        runtime_dir, "pre-commit-tool-hooks-%d" % os.getuid()
+    )
+    digest = hashlib.sha256(repo_root.encode()).hexdigest()[:16]
+    return os.path.join(socket_dir, digest + ".sock")
+
+
+def _check_socket_dir(path: str) -> None:
+    """Raises OSError unless only the current user can use a socket directory.
+
+    Otherwise, another user who created the directory first could pose as the
+    daemon, or send it runs.
+    """
+    st = os.lstat(path)
+    if (
+        not stat.S_ISDIR(st.st_mode)
+        or st.st_uid != os.getuid()
+        or st.st_mode & 0o077
+    ):
+        raise OSError(
+            "%s must be a directory that only the current user can access"
+            % path
+        )
+
+
+def _send(conn: socket.socket, message: Dict[str, Any]) -> None:
+    conn.sendall(json.dumps(message).encode())
+    conn.shutdown(socket.SHUT_WR)
+
+
+def _receive(conn: socket.socket) -> Optional[Dict[str, Any]]:
+    """Reads a message, or returns None if the other side closed early."""
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    if not chunks:
+        return None
+    message: Dict[str, Any] = json.loads(b"".join(chunks))
+    return message
+
+
+def _request(
+    repo_root: str, message: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Sends a request to the daemon, returning None if it isn't running."""
+    path = socket_path(repo_root)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        _check_socket_dir(os.path.dirname(path))
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(path)
+            _send(conn, message)
+            return _receive(conn)
+    except OSError:
+        return None
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """Runs a hook in the daemon, returning None if it can't.
+
+    argv[0] must be the console script's name.
+    """
+    cwd = os.getcwd()
+    repo_root = find_repo_root(cwd)
+    if repo_root is None:
+        return None
+    response = _request(
+        repo_root,
+        {
+            "command": "run",
+            "argv": argv,
+            "cwd": cwd,
+            "code": _code_fingerprint(),
+        },
+    )
+    # Runs are refused while the daemon is busy with another run, or if it's
+    # from another installation.
+    if response is None or "exit_code" not in response:
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    exit_code: int = response["exit_code"]
+    return exit_code
+
+
+def _run_in_process(argv: List[str]) -> int:
+    """Runs a hook's main function in this process."""
+    module = importlib.import_module(_HOOK_MODULES[argv[0]])
+    exit_code: int = module.main(argv)
+    return exit_code
+
+
+def _reads_stdin(argv: List[str]) -> bool:
+    """Returns true if the hook reads paths from stdin."""
+    return "--paths-from=-" in argv or any(
+        arg == "--paths-from" and value == "-"
+        for arg, value in zip(argv, argv[1:])
+    )
+
+
+def _watches(argv: List[str]) -> bool:
+    """Returns true if the hook watches for changes, rather than exiting."""
+    return any(arg == "--watch" or arg.startswith("--watch=") for arg in argv)
+
+
+def _main(hook: str) -> int:
+    """Runs a console script, in the daemon if possible."""
+    argv = [hook] + sys.argv[1:]
+    # Only runs are forwarded, not daemon management. stdin isn't forwarded,
+    # so hooks reading paths from it run in-process, as do watches, which
+    # would otherwise hold the daemon indefinitely.
+    is_run = hook != "pre-commit-tool-hooks" or sys.argv[1:2] == ["run"]
+    if is_run and not _reads_stdin(argv) and not _watches(argv):
+        exit_code = forward(argv)
+        if exit_code is not None:
+            return exit_code
+    return _run_in_process(argv)
+
+
+def check_copyright() -> int:
+    return _main("check-copyright")
+
+
+def check_google_doc_style() -> int:
+    return _main("check-google-doc-style")
+
+
+def check_links() -> int:
+    return _main("check-links")
+
+
+def markdown_toc() -> int:
+    return _main("markdown-toc")
+
+
+def tool_hooks() -> int:
+    return _main("pre-commit-tool-hooks")
+
+
+def _code_fingerprint() -> List[Any]:
+    """Returns this installation's package directory and code fingerprints.
+
+    Clients send this with runs, because pre-commit installs each revision of
+    the hooks separately, and the daemon must only run its own code.
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    fingerprints: List[Any] = [package_dir]
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith(".py"):
+            st = os.stat(os.path.join(package_dir, name))
+            fingerprints.append([name, st.st_size, st.st_mtime_ns])
+    return fingerprints
+
+
+class Server(object):
+    """Serves hook runs for a repository, one at a time.
+
+    Runs capture the process's stdout and change its directory, so only one
+    runs at once, on its own thread; --jobs still parallelizes within a run.
+    Runs requested meanwhile are refused rather than queued, so that clients
+    run them in-process in parallel, as pre-commit intends.
+    """
+
+    def __init__(self, repo_root: str, idle_timeout: float) -> None:
+        self._repo_root = repo_root
+        self._idle_timeout = idle_timeout
+        path = socket_path(repo_root)
+        if path is None:
+            raise OSError("Unix domain sockets aren't supported")
+        self.socket_path = path
+        self._config_path = os.path.join(repo_root, _CONFIG_FILE)
+        self._config_fingerprint: Optional[List[int]] = None
+        self._code_fingerprint: List[Any] = []
+        self._stopping = False
+        # Held while a run is in progress.
+        self._run_lock = threading.Lock()
+
+    def serve(self) -> None:
+        """Handles requests until stopped, idle, or the code changes."""
+        from pre_commit_hooks import executor
+        from pre_commit_hooks import verdict_cache
+
+        executor.keep_states()
+        self._config_fingerprint = verdict_cache.fingerprint(self._config_path)
+        self._code_fingerprint = _code_fingerprint()
+        # Import hooks now, rather than in the first request.
+        for module in _HOOK_MODULES.values():
+            importlib.import_module(module)
+
+        os.makedirs(
+            os.path.dirname(self.socket_path), mode=0o700, exist_ok=True
+        )
+        _check_socket_dir(os.path.dirname(self.socket_path))
+        if os.path.exists(self.socket_path):
+            if _request(self._repo_root, {"command": "ping"}) is not None:
+                raise OSError("A daemon is already running")
+            # Left behind by a daemon that didn't exit cleanly.
+            os.unlink(self.socket_path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(self.socket_path)
+            listener.listen()
+            listener.settimeout(self._idle_timeout)
+            while not self._stopping:
+                try:
+                    conn, _ = listener.accept()
+                except socket.timeout:
+                    break
+                conn.settimeout(None)
+                self._handle(conn)
+        finally:
+            listener.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+            # Finishes any run in progress.
+            with self._run_lock:
+                pass
+
+    def _handle(self, conn: socket.socket) -> None:
+        """Handles a single request, closing conn once it's answered.
+
+        Runs are answered from another thread, so that requests made
+        meanwhile aren't blocked.
+        """
+        from pre_commit_hooks import executor
+        from pre_commit_hooks import verdict_cache
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(conn)
+            request = _receive(conn)
+            if request is None:
+                return
+            command = request.get("command")
+            if command == "ping":
+                _send(
+                    conn,
+                    {"pid": os.getpid(), "package": self._code_fingerprint[0]},
+                )
+            elif command == "stop":
+                self._stopping = True
+                _send(conn, {})
+            elif command == "run":
+                if _code_fingerprint() != self._code_fingerprint:
+                    # Stale code can't be reloaded reliably, so exit without
+                    # responding, and let the client run the hook itself.
+                    self._stopping = True
+                    return
+                if request.get("code") != self._code_fingerprint:
+                    _send(conn, {"error": "From another installation"})
+                    return
+                if not self._run_lock.acquire(blocking=False):
+                    _send(conn, {"error": "Busy"})
+                    return
+                config_fingerprint = verdict_cache.fingerprint(
+                    self._config_path
+                )
+                if config_fingerprint != self._config_fingerprint:
+                    executor.keep_states()
+                    self._config_fingerprint = config_fingerprint
+                threading.Thread(
+                    target=self._answer_run, args=(conn, request)
+                ).start()
+                stack.pop_all()
+
+    def _answer_run(self, conn: socket.socket, request: Dict[str, Any]) -> None:
+        """Runs a hook for a request, allowing the next run before answering.
+
+        Otherwise, a client's next run could be refused as busy.
+        """
+        with conn:
+            try:
+                response = self._run(request["argv"], request["cwd"])
+            finally:
+                self._run_lock.release()
+            # The client may have given up waiting.
+            with contextlib.suppress(OSError):
+                _send(conn, response)
+
+    def _run(self, argv: List[str], cwd: str) -> Dict[str, Any]:
+        """Runs a hook, capturing its output and exit code."""
+        import traceback
+
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        old_cwd = os.getcwd()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+            stderr
+        ):
+            try:
+                os.chdir(cwd)
+                exit_code = _run_in_process(argv)
+            except SystemExit as e:
+                # As for sys.exit, such as from argparse errors.
+                if e.code is None or isinstance(e.code, int):
+                    exit_code = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    exit_code = 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                os.chdir(old_cwd)
+        return {
+            "exit_code": exit_code,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+
+
+def control(action: str, idle_timeout: float) -> int:
+    """Starts, stops, or checks on the daemon for the current repository."""
+    repo_root = find_repo_root(os.getcwd())
+    if repo_root is None:
+        print("Not in a git repository", file=sys.stderr)
+        return 1
+
+    if action == "serve":
+        Server(repo_root, idle_timeout).serve()
+        return 0
+
+    response = _request(repo_root, {"command": "ping"})
+    if action == "status":
+        if response is None:
+            print("Not running")
+            return 1
+        print(
+            "Running as pid %d from %s" % (response["pid"], response["package"])
+        )
+        return 0
+    if action == "stop":
+        if response is not None:
+            _request(repo_root, {"command": "stop"})
+        return 0
+
+    assert action == "start", action
+    if response is not None:
+        print("Already running as pid %d" % response["pid"])
+        return 0
+    import subprocess
+
+    subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "pre_commit_hooks.runner",
+            "daemon",
+            "serve",
+            "--idle-timeout=%s" % idle_timeout,
+        ],
+        cwd=repo_root,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + _START_TIMEOUT_SECS
+    while time.monotonic() < deadline:
+        response = _request(repo_root, {"command": "ping"})
+        if response is not None:
+            print("Started as pid %d" % response["pid"])
+            return 0
+        time.sleep(0.05)
+    print("Timed out waiting for the daemon to start", file=sys.stderr)
+    return 1
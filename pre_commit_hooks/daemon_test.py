@@ -0,0 +1,196 @@
+"""Tests for daemon.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import threading
+from typing import List, Tuple
+import unittest
+from unittest import mock
+
+from pre_commit_hooks import daemon
+from pre_commit_hooks import executor
+
+
+@unittest.skipUnless(daemon.socket_path("/"), "Requires Unix sockets")
+class TestDaemon(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+        self._repo_root = os.path.realpath(self._temp_dir.name)
+        os.mkdir(os.path.join(self._repo_root, ".git"))
+
+        env_patcher = mock.patch.dict(
+            os.environ, {"XDG_RUNTIME_DIR": self._repo_root}
+        )
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self._repo_root)
+        self.addCleanup(setattr, executor, "_kept_states", None)
+
+    def _start(self) -> threading.Thread:
+        server = self._server = daemon.Server(self._repo_root, idle_timeout=10)
+        thread = threading.Thread(target=server.serve)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(daemon._request, self._repo_root, {"command": "stop"})
+        for _ in range(100):
+            if daemon._request(self._repo_root, {"command": "ping"}):
+                break
+            thread.join(0.01)
+        return thread
+
+    def _forward(self, argv: List[str]) -> Tuple[object, str, str]:
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+            stderr
+        ):
+            exit_code = daemon.forward(argv)
+        return (exit_code, stdout.getvalue(), stderr.getvalue())
+
+    def _write(self, filename: str, contents: str) -> str:
+        path = os.path.join(self._repo_root, filename)
+        with open(path, "w") as f:
+            f.write(contents)
+        return path
+
+    def test_socket_path(self) -> None:
+        path = daemon.socket_path(self._repo_root)
+        self.assertEqual(path, daemon.socket_path(self._repo_root))
+        self.assertNotEqual(path, daemon.socket_path("/other"))
+
+    def test_shared_socket_dir(self) -> None:
+        socket_dir = os.path.dirname(daemon.socket_path(self._repo_root) or "")
+        # As if created first by another user.
+        os.mkdir(socket_dir, 0o777)
+        os.chmod(socket_dir, 0o777)
+        server = daemon.Server(self._repo_root, idle_timeout=10)
+        self.assertRaisesRegex(OSError, "only the current user", server.serve)
+        with open(server.socket_path, "w"):
+            pass
+        # Sockets there aren't trusted.
+        with mock.patch("socket.socket") as mock_socket:
+            self.assertIsNone(
+                daemon._request(self._repo_root, {"command": "ping"})
+            )
+        mock_socket.assert_not_called()
+
+    def test_find_repo_root(self) -> None:
+        subdir = os.path.join(self._repo_root, "a", "b")
+        os.makedirs(subdir)
+        self.assertEqual(daemon.find_repo_root(subdir), self._repo_root)
+
+    def test_not_running(self) -> None:
+        self.assertIsNone(daemon.forward(["check-copyright", "a.py"]))
+
+    def test_run(self) -> None:
+        self._start()
+        path = self._write("a.py", "a = 1\n")
+        exit_code, stdout, stderr = self._forward(
+            ["check-copyright", "--copyright=test", path]
+        )
+        self.assertEqual(exit_code, 1)
+        self.assertIn("Missing copyright in %s" % path, stderr)
+
+        self._write("a.py", '__copyright__ = """\ntest\n"""\n')
+        self.assertEqual(
+            self._forward(["check-copyright", "--copyright=test", path]),
+            (0, "", ""),
+        )
+
+    def test_exit(self) -> None:
+        self._start()
+        exit_code, _, stderr = self._forward(["check-copyright"])
+        self.assertEqual(exit_code, 2)
+        self.assertIn("the following arguments are required", stderr)
+
+    def test_kept_states(self) -> None:
+        self._start()
+        path = self._write("a.md", "# Doc\n")
+        self._forward(["markdown-toc", path])
+        kept_states = executor._kept_states
+        self.assertTrue(kept_states)
+        self._forward(["markdown-toc", path])
+        self.assertIs(executor._kept_states, kept_states)
+        # Config changes discard kept states.
+        self._write(".pre-commit-config.yaml", "repos: []\n")
+        self._forward(["markdown-toc", path])
+        self.assertIsNot(executor._kept_states, kept_states)
+
+    def test_code_change(self) -> None:
+        thread = self._start()
+        with mock.patch(
+            "pre_commit_hooks.daemon._code_fingerprint", return_value=[]
+        ):
+            self.assertIsNone(daemon.forward(["check-copyright", "a.py"]))
+            thread.join()
+
+    def test_other_installation(self) -> None:
+        self._start()
+        request = {
+            "command": "run",
+            "argv": ["check-copyright", "a.py"],
+            "cwd": self._repo_root,
+            "code": ["/other/pre_commit_hooks"],
+        }
+        response = daemon._request(self._repo_root, request)
+        self.assertEqual(response, {"error": "From another installation"})
+        # The daemon keeps serving its own installation.
+        self.assertEqual(self._forward(["check-copyright"])[0], 2)
+
+    def test_busy(self) -> None:
+        self._start()
+        with self._server._run_lock:
+            # Clients run in-process instead of waiting.
+            self.assertIsNone(daemon.forward(["check-copyright", "a.py"]))
+            self.assertTrue(
+                daemon._request(self._repo_root, {"command": "ping"})
+            )
+        self.assertEqual(self._forward(["check-copyright"])[0], 2)
+
+    def test_control(self) -> None:
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            self.assertEqual(daemon.control("status", 10), 1)
+            thread = self._start()
+            self.assertEqual(daemon.control("status", 10), 0)
+            self.assertEqual(daemon.control("stop", 10), 0)
+            thread.join()
+        self.assertEqual(
+            stdout.getvalue(),
+            "Not running\nRunning as pid %d from %s\n"
+            % (os.getpid(), os.path.dirname(os.path.abspath(daemon.__file__))),
+        )
+
+    def test_reads_stdin(self) -> None:
+        self.assertTrue(daemon._reads_stdin(["check-links", "--paths-from=-"]))
+        self.assertTrue(
+            daemon._reads_stdin(["check-links", "--paths-from", "-"])
+        )
+        self.assertFalse(
+            daemon._reads_stdin(["check-links", "--paths-from", "paths"])
+        )
+
+    def test_watches(self) -> None:
+        self.assertTrue(daemon._watches(["check-links", "--watch=docs"]))
+        self.assertTrue(daemon._watches(["check-links", "--watch", "docs"]))
+        self.assertFalse(daemon._watches(["check-links", "watch.md"]))
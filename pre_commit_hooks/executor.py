@@ -0,0 +1,1022 @@
+"""Runs per-file hook checks, optionally across worker processes."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import contextlib
+import functools
+import heapq
+import io
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from pre_commit_hooks import failure_history
+from pre_commit_hooks import metrics
+from pre_commit_hooks import tracing
+from pre_commit_hooks import verdict_cache
+from pre_commit_hooks import vfs
+
+State = TypeVar("State")
+
+# Parallelism isn't worth starting processes for fewer paths per job.
+_MIN_PATHS_PER_JOB = 8
+
+# Prefetching isn't worth starting threads for fewer paths.
+_MIN_READ_AHEAD_PATHS = 16
+
+# Paths are split into about this many chunks per job, so that workers which
+# finish early can pick up remaining work.
+_CHUNKS_PER_JOB = 4
+
+# The state for checks in a worker process, from the setup function.
+_worker_state: Any = None
+
+# Paths are read and checked in windows of this many, so that memory use is
+# bounded for long --paths-from lists.
+_WINDOW_SIZE = 4096
+
+# The size of reads from --paths-from.
+_READ_SIZE = 64 * 1024
+
+# The fixed cost of checking a file for --shard, in bytes of equivalent
+# contents, for work such as opening the file.
+_PER_FILE_COST = 4096
+
+# Flags added by add_arguments, which don't affect hook results.
+_RUN_OPTIONS = frozenset(
+    (
+        "paths",
+        "paths_from",
+        "shard",
+        "jobs",
+        "backend",
+        "cache",
+        "cache_dir",
+        "read_ahead",
+        "watch",
+        "trace",
+        "metrics_out",
+        "profile_memory",
+        "fail_fast",
+        "order",
+    )
+)
+
+# Callbacks for each check in this process, given the path, whether it had
+# errors, and how long it took in seconds.
+_observers: List[Callable[[str, bool, float], None]] = []
+
+# States kept between runs by a long-lived process, keyed by hook and options,
+# or None when each run sets up its own state.
+_kept_states: Optional[Dict[Tuple[str, str], Any]] = None
+
+
+def _default_jobs() -> int:
+    """Returns the number of CPUs available to this process."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _parse_jobs(arg: str) -> int:
+    """Parses a --jobs argument, where 0 means the number of CPUs."""
+    if not arg.isdigit():
+        raise argparse.ArgumentTypeError(
+            "Expected a non-negative integer, got `%s`" % arg
+        )
+    return int(arg) or _default_jobs()
+
+
+def _parse_shard(arg: str) -> Tuple[int, int]:
+    """Splits a --shard argument into its index and count."""
+    index, sep, count = arg.partition("/")
+    if not (sep and index.isdigit() and count.isdigit()) or not (
+        1 <= int(index) <= int(count)
+    ):
+        raise argparse.ArgumentTypeError(
+            "Expected INDEX/COUNT with 1 <= INDEX <= COUNT, got `%s`" % arg
+        )
+    return (int(index), int(count))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds flags for running checks."""
+    parser.add_argument(
+        "--paths-from",
+        metavar="FILE",
+        help="Reads paths to check from FILE, or stdin for `-`, in addition to "
+        "any given as arguments. Paths may be NUL-delimited, as from `git "
+        "ls-files -z`, or newline-delimited. Paths are checked as they're "
+        "read.",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="INDEX/COUNT",
+        type=_parse_shard,
+        help="Only checks the INDEX-th of COUNT shards of the paths, such as "
+        "`1/4` through `4/4`. Shards are balanced by file size, and are the "
+        "same on every machine given the same paths and files.",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stops checking files after the first file with errors.",
+    )
+    parser.add_argument(
+        "--order",
+        choices=("given", "recent", "failures"),
+        default="given",
+        help="The order to check files in: `given` checks them as given, "
+        "`recent` checks the most recently modified first, and `failures` "
+        "checks files that failed their last check first, then as for "
+        "`recent`. With `failures`, results are recorded in --cache-dir. "
+        "Defaults to `%(default)s`.",
+    )
+    parser.add_argument(
+        "--jobs",
+        metavar="N",
+        type=_parse_jobs,
+        default=1,
+        help="The number of workers to check files with, or 0 for the number "
+        "of CPUs. Defaults to 1, because pre-commit already runs hooks in "
+        "parallel unless they set `require_serial: true`.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("auto", "process", "thread"),
+        default="auto",
+        help="How --jobs workers run: `process` uses worker processes, and "
+        "`thread` uses threads sharing this process's state, which only check "
+        "files in parallel on free-threaded Python builds. `auto` uses "
+        "threads when the GIL is disabled, and processes otherwise. Defaults "
+        "to `%(default)s`.",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Caches per-file results, skipping files which are unchanged "
+        "since a previous run.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        default=verdict_cache.default_dir(),
+        help="The directory for --cache. Defaults to `%s`."
+        % verdict_cache.default_dir(),
+    )
+    parser.add_argument(
+        "--read-ahead",
+        action="store_true",
+        help="Prefetches upcoming files on background threads while checking, "
+        "for network filesystems or cold caches.",
+    )
+    parser.add_argument(
+        "--watch",
+        metavar="DIR",
+        help="After checking, watches DIR for changes and checks affected "
+        "files again, until interrupted. Without paths, checks every file "
+        "under DIR first. Requires Linux.",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Writes spans for each file and phase of checking to FILE, as "
+        "Chrome trace-event JSON for chrome://tracing or Perfetto.",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        metavar="FILE",
+        help="Writes counters and time per phase to FILE, as Prometheus text "
+        "for a `.prom` FILE, or as JSON otherwise.",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Reports peak memory allocated for each file, flagging files "
+        "far above the median for their size, and memory still held by "
+        "each phase. Checks files in a single process. Requires Python 3.9 "
+        "or later.",
+    )
+
+
+def require_paths(
+    parser: argparse.ArgumentParser, parsed_args: argparse.Namespace
+) -> None:
+    """Exits with a usage error if no paths, --paths-from, or --watch.
+
+    Also exits for flags that this Python doesn't support.
+    """
+    if (
+        not parsed_args.paths
+        and parsed_args.paths_from is None
+        and parsed_args.watch is None
+    ):
+        parser.error(
+            "the following arguments are required: PATH (or --paths-from)"
+        )
+    if parsed_args.profile_memory and sys.version_info < (3, 9):
+        # Measuring peaks for each file needs tracemalloc.reset_peak().
+        parser.error("--profile-memory requires Python 3.9 or later")
+
+
+def _gil_enabled() -> bool:
+    """Returns false on free-threaded Python builds with the GIL disabled."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is None or bool(is_gil_enabled())
+
+
+def _use_threads(backend: str) -> bool:
+    """Returns true if workers should be threads for a --backend."""
+    if backend == "auto":
+        return not _gil_enabled()
+    return backend == "thread"
+
+
+class _ThreadOutput(object):
+    """A stream which writes to the current thread's capture, if any.
+
+    contextlib.redirect_stdout replaces sys.stdout for every thread, so worker
+    threads capture output by setting their own buffer here instead.
+    """
+
+    def __init__(self, stream: Any) -> None:
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer: Optional[io.StringIO]) -> Optional[io.StringIO]:
+        """Sets this thread's buffer, returning the previous buffer."""
+        previous: Optional[io.StringIO] = getattr(self._local, "buffer", None)
+        self._local.buffer = buffer
+        return previous
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        written: int = (self._stream if buffer is None else buffer).write(text)
+        return written
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+@contextlib.contextmanager
+def _thread_output() -> Iterator[None]:
+    """Routes stdout and stderr through _ThreadOutput, for worker threads."""
+    stdout = sys.stdout
+    stderr = sys.stderr
+    sys.stdout = _ThreadOutput(stdout)
+    sys.stderr = _ThreadOutput(stderr)
+    try:
+        yield
+    finally:
+        sys.stdout = stdout
+        sys.stderr = stderr
+
+
+@contextlib.contextmanager
+def _capture_output(stdout: io.StringIO, stderr: io.StringIO) -> Iterator[None]:
+    """Captures this thread's stdout and stderr into buffers."""
+    out = sys.stdout
+    err = sys.stderr
+    if not (isinstance(out, _ThreadOutput) and isinstance(err, _ThreadOutput)):
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+            stderr
+        ):
+            yield
+        return
+    previous_stdout = out.capture(stdout)
+    previous_stderr = err.capture(stderr)
+    try:
+        yield
+    finally:
+        out.capture(previous_stdout)
+        err.capture(previous_stderr)
+
+
+def _read_paths(f: BinaryIO) -> Iterator[str]:
+    """Yields paths from NUL- or newline-delimited input, as it's read.
+
+    Input is NUL-delimited if a NUL appears before the first newline.
+    """
+    delimiter: Optional[bytes] = None
+    pending = b""
+    while True:
+        block = f.read1(_READ_SIZE)  # type: ignore[attr-defined]
+        if not block:
+            break
+        pending += block
+        if delimiter is None:
+            nul = pending.find(b"\0")
+            newline = pending.find(b"\n")
+            if nul != -1 and (newline == -1 or nul < newline):
+                delimiter = b"\0"
+            elif newline != -1:
+                delimiter = b"\n"
+            else:
+                continue
+        *entries, pending = pending.split(delimiter)
+        for entry in entries:
+            if entry:
+                yield os.fsdecode(entry)
+    if pending:
+        yield os.fsdecode(pending)
+
+
+def _iter_paths(parsed_args: argparse.Namespace) -> Iterator[str]:
+    """Yields paths from arguments, then from --paths-from.
+
+    With only --watch, yields every file in the watched directory.
+    """
+    yield from parsed_args.paths
+    paths_from: Optional[str] = parsed_args.paths_from
+    if paths_from == "-":
+        yield from _read_paths(sys.stdin.buffer)
+    elif paths_from is not None:
+        with open(paths_from, "rb") as f:
+            yield from _read_paths(f)
+    elif parsed_args.watch is not None and not parsed_args.paths:
+        from pre_commit_hooks import watch
+
+        yield from watch.walk_files(parsed_args.watch)
+
+
+def keep_states() -> None:
+    """Keeps hook states between runs in this process, as for the daemon.
+
+    Calling this again discards any kept states. Kept states which have a
+    `refresh` method have it called before each reuse, to revalidate anything
+    cached from files.
+    """
+    global _kept_states
+    _kept_states = {}
+
+
+@contextlib.contextmanager
+def observe(callback: Callable[[str, bool, float], None]) -> Iterator[None]:
+    """Calls callback after each check in this process, as for benchmarks.
+
+    Checks in worker processes aren't observed, so callers should use
+    `--jobs=1`.
+    """
+    _observers.append(callback)
+    try:
+        yield
+    finally:
+        _observers.remove(callback)
+
+
+def _observed_check(
+    check: Callable[[Any, str], bool], state: Any, path: str
+) -> bool:
+    """Runs check, timing it for observers."""
+    start = time.perf_counter()
+    has_errors = check(state, path)
+    elapsed = time.perf_counter() - start
+    for callback in _observers:
+        callback(path, has_errors, elapsed)
+    return has_errors
+
+
+def _counted(
+    paths: Iterable[str], wants: Optional[Callable[[str], bool]]
+) -> Iterator[str]:
+    """Yields wanted paths, counting paths seen and skipped."""
+    for path in paths:
+        metrics.count("files_seen")
+        if wants and not wants(path):
+            metrics.count("files_skipped")
+            continue
+        yield path
+
+
+def _traced_check(
+    check: Callable[[Any, str], bool], state: Any, path: str
+) -> bool:
+    """Runs check in a span for the path."""
+    with tracing.span("check", path):
+        return check(state, path)
+
+
+def _options(
+    parsed_args: argparse.Namespace, extra_options: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Returns the options which affect hook results."""
+    options = {
+        name: value
+        for name, value in vars(parsed_args).items()
+        if name not in _RUN_OPTIONS
+    }
+    if extra_options:
+        options.update(extra_options)
+    return options
+
+
+def _setup_state(
+    hook: str,
+    parsed_args: argparse.Namespace,
+    extra_options: Optional[Dict[str, Any]],
+    setup: Callable[[], State],
+) -> State:
+    """Returns a kept state for the hook and options, or sets one up."""
+    if _kept_states is None:
+        return setup()
+    options = _options(parsed_args, extra_options)
+    key = (hook, json.dumps(options, sort_keys=True, default=str))
+    state = _kept_states.get(key)
+    if state is None:
+        state = _kept_states[key] = setup()
+    elif hasattr(state, "refresh"):
+        state.refresh()
+    return state
+
+
+def _file_size(path: str) -> int:
+    """Returns the size of a file, or 0 if it can't be read."""
+    st = vfs.current().stat(path)
+    return st.size if st else 0
+
+
+def _shard(paths: Sequence[str], index: int, count: int) -> List[str]:
+    """Returns the paths in the given 1-based shard, keeping their order.
+
+    Paths are assigned largest first to the shard with the least work so far,
+    breaking ties by path and shard index, so that every machine computes the
+    same shards.
+    """
+    work = sorted(
+        ((_file_size(path) + _PER_FILE_COST, path) for path in set(paths)),
+        key=lambda x: (-x[0], x[1]),
+    )
+    # The total work and index of each shard.
+    loads = [(0, shard) for shard in range(count)]
+    selected = set()
+    for size, path in work:
+        load, shard = heapq.heappop(loads)
+        if shard == index - 1:
+            selected.add(path)
+        heapq.heappush(loads, (load + size, shard))
+    return [path for path in paths if path in selected]
+
+
+def _order(
+    paths: Sequence[str],
+    order: str,
+    history: Optional[failure_history.FailureHistory],
+) -> List[str]:
+    """Sorts paths for --order, keeping the given order between ties."""
+    fs = vfs.current()
+
+    def mtime(path: str) -> int:
+        st = fs.stat(path)
+        return st.mtime_ns if st else 0
+
+    if order == "recent":
+        return sorted(paths, key=lambda path: -mtime(path))
+    assert order == "failures" and history, order
+    return sorted(
+        paths,
+        key=lambda path: (-(history.last_failed(path) or 0), -mtime(path)),
+    )
+
+
+def _make_chunks(
+    paths: Sequence[str],
+    jobs: int,
+    ordered: bool = False,
+    fail_fast: bool = False,
+) -> List[List[Tuple[int, str]]]:
+    """Splits paths into chunks of similar total size, largest files first.
+
+    Each path is paired with its index in paths, so that output can be
+    reordered. With ordered, chunks keep the order of paths instead, so that
+    earlier paths are checked first. With fail_fast, each path is a chunk,
+    so that errors are reported as soon as they're found.
+    """
+    if fail_fast:
+        return [[(index, path)] for index, path in enumerate(paths)]
+    sized = [
+        (_file_size(path), index, path) for index, path in enumerate(paths)
+    ]
+    if not ordered:
+        sized.sort(key=lambda x: (-x[0], x[1]))
+    total_size = sum(size for size, _, _ in sized)
+    max_chunk_size = max(1, total_size // (jobs * _CHUNKS_PER_JOB))
+    max_chunk_len = max(1, len(paths) // (jobs * _CHUNKS_PER_JOB))
+
+    chunks: List[List[Tuple[int, str]]] = []
+    chunk: List[Tuple[int, str]] = []
+    chunk_size = 0
+    for size, index, path in sized:
+        chunk.append((index, path))
+        chunk_size += size
+        if chunk_size >= max_chunk_size or len(chunk) >= max_chunk_len:
+            chunks.append(chunk)
+            chunk = []
+            chunk_size = 0
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _init_worker(
+    setup: Callable[[], Any], recording: Tuple[bool, bool], counting: bool
+) -> None:
+    """Sets up state once per worker process."""
+    global _worker_state
+    # Recording restarts, so that only this worker's records are sent back to
+    # the main process.
+    if any(recording):
+        import multiprocessing
+
+        tracing.start(multiprocessing.current_process().name, *recording)
+    if counting:
+        metrics.start()
+    # Forked workers inherit state from the parent.
+    if _worker_state is None:
+        _worker_state = setup()
+
+
+def _prefetched(paths: Iterable[str], count: int) -> Iterable[str]:
+    """Prefetches paths while checking, if there are enough to be worth it.
+
+    count is the number of paths known so far.
+    """
+    if count < _MIN_READ_AHEAD_PATHS:
+        return paths
+    # Only imported when needed, to keep startup fast for small batches.
+    from pre_commit_hooks import read_ahead
+
+    return read_ahead.read_ahead(paths)
+
+
+def _run_chunk(
+    check: Callable[[Any, str], bool],
+    prefetch: bool,
+    threads: bool,
+    chunk: List[Tuple[int, str]],
+) -> Tuple[List[Tuple[int, bool, str, str]], tracing.Recorded, Dict[str, int]]:
+    """Checks a chunk of paths, capturing output for each.
+
+    Returns results for each path, and any spans and counters recorded by a
+    worker process. Worker threads record directly into this process's.
+    """
+    results = []
+    indices = [index for index, _ in chunk]
+    paths: Iterable[str] = [path for _, path in chunk]
+    if prefetch:
+        paths = _prefetched(paths, len(chunk))
+    for path, index in zip(paths, indices):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with _capture_output(stdout, stderr):
+            has_errors = check(_worker_state, path)
+        results.append(
+            (index, has_errors, stdout.getvalue(), stderr.getvalue())
+        )
+    if threads:
+        return results, tracing.Recorded([], {}), {}
+    return results, tracing.take(), metrics.take()
+
+
+def _cached_check(
+    cache: verdict_cache.VerdictCache,
+    check: Callable[[Any, str], bool],
+    state: Any,
+    path: str,
+) -> bool:
+    """Runs check, reusing a cached verdict when possible."""
+    fs = vfs.current()
+    before = fs.stat(path)
+    try:
+        key = cache.key(fs.read_bytes(path), path)
+    except OSError:
+        # Directories and unreadable paths are left to the check.
+        return check(state, path)
+
+    verdict = cache.get(key)
+    if verdict is None:
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        verdict_cache.start_recording()
+        try:
+            with _capture_output(stdout, stderr):
+                has_errors = check(state, path)
+        finally:
+            dependencies = verdict_cache.stop_recording()
+        verdict = verdict_cache.Verdict(
+            has_errors, stdout.getvalue(), stderr.getvalue()
+        )
+        # Rewritten files will be checked again, so only cache the verdict
+        # for files that the check left unchanged.
+        if fs.stat(path) == before:
+            cache.put(key, verdict, dependencies)
+    sys.stdout.write(verdict.stdout)
+    sys.stderr.write(verdict.stderr)
+    return verdict.has_errors
+
+
+def _run_window(
+    pool: Any,
+    check: Callable[[Any, str], bool],
+    paths: Sequence[str],
+    jobs: int,
+    prefetch: bool,
+    ordered: bool = False,
+    fail_fast: bool = False,
+    history: Optional[failure_history.FailureHistory] = None,
+    threads: bool = False,
+) -> bool:
+    """Checks paths in a worker pool, returning true on errors.
+
+    With fail_fast, returns once any path has errors, without waiting for
+    other paths.
+    """
+    has_any_errors = False
+    results: Dict[int, Tuple[bool, str, str]] = {}
+    next_index = 0
+    for chunk_results, recorded, counters in pool.imap_unordered(
+        functools.partial(_run_chunk, check, prefetch, threads),
+        _make_chunks(paths, jobs, ordered, fail_fast),
+    ):
+        tracing.add(recorded)
+        metrics.add(counters)
+        for index, has_errors, stdout, stderr in chunk_results:
+            results[index] = (has_errors, stdout, stderr)
+            if history:
+                history.record(paths[index], has_errors)
+            if has_errors:
+                has_any_errors = True
+        if fail_fast and has_any_errors:
+            # Print output for every path checked so far, in order.
+            for index in sorted(results):
+                _, stdout, stderr = results[index]
+                sys.stdout.write(stdout)
+                sys.stderr.write(stderr)
+            break
+        # Print output for paths in order, as it's available.
+        while next_index in results:
+            _, stdout, stderr = results.pop(next_index)
+            sys.stdout.write(stdout)
+            sys.stderr.write(stderr)
+            next_index += 1
+    return has_any_errors
+
+
+def _run_serially(
+    state: Any,
+    check: Callable[[Any, str], bool],
+    paths: Iterable[str],
+    fail_fast: bool,
+    history: Optional[failure_history.FailureHistory],
+) -> bool:
+    """Checks paths in this process, returning true on errors.
+
+    With fail_fast, returns once any path has errors.
+    """
+    has_any_errors = False
+    for path in paths:
+        has_errors = check(state, path)
+        if history:
+            history.record(path, has_errors)
+        if has_errors:
+            has_any_errors = True
+            if fail_fast:
+                break
+    return has_any_errors
+
+
+def _watch(
+    directory: str,
+    state: State,
+    check: Callable[[State, str], bool],
+    wants: Optional[Callable[[str], bool]],
+    dependents: Optional[Callable[[State, str], Iterable[str]]],
+) -> int:
+    """Checks files affected by each change in directory, until interrupted.
+
+    Returns the exit code for the most recent change.
+    """
+    # Only imported when needed, because ctypes is slow to import.
+    from pre_commit_hooks import watch
+
+    watcher = watch.Watcher(directory)
+    print(
+        f"Watching {directory} for changes; press Ctrl-C to stop.",
+        file=sys.stderr,
+    )
+    exit_code = 0
+    try:
+        for changed in watcher.changes():
+            if hasattr(state, "refresh"):
+                state.refresh()
+            paths = {
+                path
+                for path in changed
+                if os.path.isfile(path) and (not wants or wants(path))
+            }
+            if dependents:
+                for path in changed:
+                    paths.update(dependents(state, path))
+            exit_code = 0
+            for path in sorted(paths):
+                # Dependents may have been deleted since they were checked.
+                if os.path.isfile(path) and check(state, path):
+                    exit_code = 1
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return exit_code
+
+
+def run(
+    hook: str,
+    parsed_args: argparse.Namespace,
+    setup: Callable[[], State],
+    check: Callable[[State, str], bool],
+    wants: Optional[Callable[[str], bool]] = None,
+    finish: Optional[Callable[[State], None]] = None,
+    needs_all_files: bool = False,
+    dependents: Optional[Callable[[State, str], Iterable[str]]] = None,
+    extra_options: Optional[Dict[str, Any]] = None,
+) -> int:
+    """Runs check on each path, returning the exit code.
+
+    setup builds state that's shared by checks, such as compiled patterns; it
+    runs once in this process, unless a kept state is reused, and once in each
+    worker that doesn't inherit it. check returns true on errors. wants
+    filters paths before any work is done for them. finish runs once after all
+    checks, with this process's state. needs_all_files indicates that finish
+    relies on state from every check, so checks can't be split across
+    processes or skipped by the cache. extra_options are inputs other than
+    flags which affect results, such as the current year in suggestions; like
+    options, they key cached verdicts and kept states.
+
+    check and setup must be picklable, such as module-level functions or
+    functools.partial wrappers of them. With worker threads, checks share
+    this process's state, which must be thread-safe. Output from checks is
+    printed in the order of paths, regardless of which worker checked them.
+
+    Paths come from parsed_args.paths and --paths-from, and are read and
+    checked in windows, so that checks start before all paths are read. With
+    --shard, only this shard's paths are checked. With --read-ahead,
+    upcoming files are prefetched while each is checked.
+
+    With --watch, checks then run again in this process as files change, on
+    the changed files and on any paths returned by dependents for a changed
+    path, such as files linking to it.
+
+    With --fail-fast, no more paths are checked once any has errors, unless
+    needs_all_files. With --order, paths are sorted before checking.
+
+    With --trace and --metrics-out, spans and counters are recorded in this
+    process and workers, and written once checks finish.
+    """
+    trace = parsed_args.trace is not None
+    metrics_out = parsed_args.metrics_out
+    if not trace and metrics_out is None:
+        return _run(
+            hook,
+            parsed_args,
+            setup,
+            check,
+            wants,
+            finish,
+            needs_all_files,
+            dependents,
+            extra_options,
+        )
+
+    tracing.start(events=trace, phases=metrics_out is not None)
+    if metrics_out is not None:
+        metrics.start()
+    start_wall = time.monotonic()
+    start_times = os.times()
+    try:
+        return _run(
+            hook,
+            parsed_args,
+            setup,
+            check,
+            wants,
+            finish,
+            needs_all_files,
+            dependents,
+            extra_options,
+        )
+    finally:
+        recorded = tracing.stop()
+        counters = metrics.stop()
+        if trace:
+            tracing.write(parsed_args.trace, recorded.events)
+        if metrics_out is not None:
+            end_times = os.times()
+            metrics.write(
+                metrics_out,
+                metrics.report(
+                    hook,
+                    counters,
+                    recorded.phases,
+                    time.monotonic() - start_wall,
+                    # User and system time, including waited-for workers.
+                    sum(end_times[:4]) - sum(start_times[:4]),
+                ),
+            )
+
+
+def _run(
+    hook: str,
+    parsed_args: argparse.Namespace,
+    setup: Callable[[], State],
+    check: Callable[[State, str], bool],
+    wants: Optional[Callable[[str], bool]],
+    finish: Optional[Callable[[State], None]],
+    needs_all_files: bool,
+    dependents: Optional[Callable[[State, str], Iterable[str]]],
+    extra_options: Optional[Dict[str, Any]],
+) -> int:
+    global _worker_state
+    paths: Iterable[str] = _iter_paths(parsed_args)
+    if metrics.enabled():
+        paths = _counted(paths, wants)
+    elif wants:
+        paths = filter(wants, paths)
+    if parsed_args.shard:
+        # Balancing shards needs every path, so this can't stream.
+        paths = _shard(list(paths), *parsed_args.shard)
+    history: Optional[failure_history.FailureHistory] = None
+    if parsed_args.order == "failures":
+        history = failure_history.FailureHistory(parsed_args.cache_dir, hook)
+    ordered = parsed_args.order != "given"
+    if ordered:
+        # Sorting needs every path, so this can't stream either.
+        paths = _order(list(paths), parsed_args.order, history)
+    paths = iter(paths)
+    window = list(itertools.islice(paths, _WINDOW_SIZE))
+    if not window and not needs_all_files and parsed_args.watch is None:
+        # Skip setup, which may be slow, when there's nothing to check.
+        return 0
+    with tracing.span("setup"):
+        if needs_all_files:
+            # Whole-run outputs need fresh state, so it can't be kept.
+            state = setup()
+        else:
+            state = _setup_state(hook, parsed_args, extra_options, setup)
+    # Watching reuses state from the initial checks, workers wouldn't share
+    # writes to files that aren't on disk, and memory is only profiled in
+    # this process, so checks can't be split across processes.
+    if (
+        needs_all_files
+        or parsed_args.watch is not None
+        or parsed_args.profile_memory
+        or not isinstance(vfs.current(), vfs.DiskFileSystem)
+    ):
+        jobs = 1
+    else:
+        jobs = parsed_args.jobs
+    if len(window) < _WINDOW_SIZE:
+        # All paths have been read, and may not be worth starting workers.
+        jobs = min(jobs, len(window) // _MIN_PATHS_PER_JOB)
+
+    cache: Optional[verdict_cache.VerdictCache] = None
+    if parsed_args.cache and not needs_all_files:
+        # Only imported when needed, because it's slow to import.
+        from pre_commit_hooks import daemon
+
+        cache = verdict_cache.VerdictCache(
+            parsed_args.cache_dir,
+            hook,
+            _options(parsed_args, extra_options),
+            repo_root=daemon.find_repo_root(os.curdir),
+        )
+        check = functools.partial(_cached_check, cache, check)
+
+    if _observers:
+        check = functools.partial(_observed_check, check)
+
+    profiler = None
+    if parsed_args.profile_memory:
+        # Only imported when needed, because it's slow to import.
+        from pre_commit_hooks import memory_profile
+
+        profiler = memory_profile.MemoryProfiler()
+        check = functools.partial(profiler.check, check)
+
+    stack = contextlib.ExitStack()
+    if tracing.enabled():
+        check = functools.partial(_traced_check, check)
+        # Forked workers inherit this, so their file access is traced too.
+        stack.enter_context(vfs.use(tracing.TracedFileSystem(vfs.current())))
+
+    # Whole-run outputs would be incomplete if checks stopped early.
+    fail_fast = parsed_args.fail_fast and not needs_all_files
+    exit_code = 0
+    with stack:
+        if jobs <= 1:
+            all_paths: Iterable[str] = itertools.chain(window, paths)
+            if parsed_args.read_ahead:
+                all_paths = _prefetched(all_paths, len(window))
+            if _run_serially(state, check, all_paths, fail_fast, history):
+                exit_code = 1
+        else:
+            threads = _use_threads(parsed_args.backend)
+            _worker_state = state
+            try:
+                pool: Any
+                output: ContextManager[None]
+                if threads:
+                    # Only imported when needed, because it's slow to import.
+                    from multiprocessing.pool import ThreadPool
+
+                    # Threads share this process's state, so need no setup.
+                    pool = ThreadPool(jobs)
+                    output = _thread_output()
+                else:
+                    # Only imported when needed, because it's slow to import.
+                    import multiprocessing
+
+                    pool = multiprocessing.Pool(
+                        jobs,
+                        initializer=_init_worker,
+                        initargs=(
+                            setup,
+                            tracing.recording(),
+                            metrics.enabled(),
+                        ),
+                    )
+                    output = contextlib.nullcontext()
+                with pool, output:
+                    while window:
+                        if _run_window(
+                            pool,
+                            check,
+                            window,
+                            jobs,
+                            parsed_args.read_ahead,
+                            ordered,
+                            fail_fast,
+                            history,
+                            threads,
+                        ):
+                            exit_code = 1
+                            if fail_fast:
+                                # Leaving the pool stops workers' other checks.
+                                break
+                        window = list(itertools.islice(paths, _WINDOW_SIZE))
+            finally:
+                _worker_state = None
+        if history:
+            history.save()
+        if fail_fast and exit_code:
+            sys.stdout.flush()
+            print("Stopped after the first file with errors.", file=sys.stderr)
+
+        if parsed_args.watch is not None:
+            sys.stdout.flush()
+            exit_code = _watch(
+                parsed_args.watch, state, check, wants, dependents
+            )
+
+        if cache:
+            cache.prune()
+            cache.close()
+        if finish:
+            with tracing.span("finish"):
+                finish(state)
+    if profiler:
+        sys.stdout.flush()
+        profiler.report(sys.stderr)
+        profiler.close()
+    return exit_code
@@ -0,0 +1,508 @@
+"""Tests for executor.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Iterator, List, Sequence, Set, Tuple
+import unittest
+from unittest import mock
+
+from pre_commit_hooks import executor
+from pre_commit_hooks import metrics
+from pre_commit_hooks import tracing
+
+
+def _setup() -> str:
+    return "state"
+
+
+def _check(state: str, path: str) -> bool:
+    """Prints the path, failing for paths containing `bad`."""
+    assert state == "state"
+    print(os.path.basename(path))
+    if "bad" in path:
+        print(f"error: {os.path.basename(path)}", file=sys.stderr)
+        return True
+    return False
+
+
+class TestExecutor(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+
+    def _parse_args(
+        self, paths: List[str], flags: List[str]
+    ) -> argparse.Namespace:
+        parser = argparse.ArgumentParser()
+        parser.add_argument("paths", nargs="*")
+        executor.add_arguments(parser)
+        return parser.parse_args(paths + flags)
+
+    def _write(self, filename: str, size: int) -> str:
+        path = os.path.join(self._temp_dir.name, filename)
+        with open(path, "w") as f:
+            f.write("x" * size)
+        return path
+
+    def _run(
+        self, paths: List[str], jobs: int, flags: Sequence[str] = ()
+    ) -> List[str]:
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+            stderr
+        ):
+            exit_code = executor.run(
+                "test",
+                self._parse_args(paths, [f"--jobs={jobs}", *flags]),
+                _setup,
+                _check,
+            )
+        return [str(exit_code), stdout.getvalue(), stderr.getvalue()]
+
+    def test_make_chunks(self) -> None:
+        paths = [self._write(f"{i}.md", i * 100) for i in range(16)]
+        chunks = executor._make_chunks(paths, 2)
+        # Every path is in exactly one chunk, largest files first.
+        indices = [index for chunk in chunks for index, _ in chunk]
+        self.assertEqual(indices, list(reversed(range(16))))
+        self.assertEqual([paths[i] for i, _ in chunks[0]], [paths[15]])
+        self.assertGreater(len(chunks), 2)
+
+    def test_serial_and_parallel_match(self) -> None:
+        paths = [self._write(f"{i:02d}.md", i * 10) for i in range(40)]
+        paths.append(self._write("bad.md", 1))
+        serial = self._run(paths, 1)
+        self.assertEqual(
+            serial,
+            [
+                "1",
+                "".join(f"{os.path.basename(p)}\n" for p in paths),
+                "error: bad.md\n",
+            ],
+        )
+        self.assertEqual(self._run(paths, 4), serial)
+
+    def test_threads(self) -> None:
+        paths = [self._write(f"{i:02d}.md", i * 10) for i in range(40)]
+        paths.append(self._write("bad.md", 1))
+        serial = self._run(paths, 1)
+        self.assertEqual(self._run(paths, 4, ["--backend=thread"]), serial)
+        # Cached verdicts capture output within each thread's capture.
+        flags = [
+            "--backend=thread",
+            "--cache",
+            f"--cache-dir={os.path.join(self._temp_dir.name, 'cache')}",
+        ]
+        for _ in range(2):
+            self.assertEqual(self._run(paths, 4, flags), serial)
+        self.assertNotIsInstance(sys.stdout, executor._ThreadOutput)
+
+    def test_use_threads(self) -> None:
+        for gil_enabled in (False, True):
+            with mock.patch.object(
+                sys, "_is_gil_enabled", return_value=gil_enabled, create=True
+            ):
+                self.assertEqual(executor._use_threads("auto"), not gil_enabled)
+                self.assertTrue(executor._use_threads("thread"))
+                self.assertFalse(executor._use_threads("process"))
+
+    def test_windows(self) -> None:
+        paths = [self._write(f"{i:02d}.md", i * 10) for i in range(40)]
+        paths.append(self._write("bad.md", 1))
+        serial = self._run(paths, 1)
+        # Output is in order across windows.
+        with mock.patch("pre_commit_hooks.executor._WINDOW_SIZE", 16):
+            self.assertEqual(self._run(paths, 4), serial)
+
+    def test_read_ahead(self) -> None:
+        paths = [self._write(f"{i:02d}.md", i * 10) for i in range(40)]
+        paths.append(self._write("bad.md", 1))
+        serial = self._run(paths, 1)
+        for jobs in (1, 4):
+            self.assertEqual(self._run(paths, jobs, ["--read-ahead"]), serial)
+
+    def test_fail_fast(self) -> None:
+        paths = [self._write(f"{i:02d}.md", 10) for i in range(40)]
+        paths[5] = self._write("05-bad.md", 10)
+        paths[30] = self._write("30-bad.md", 10)
+        self.assertEqual(
+            self._run(paths, 1, ["--fail-fast"]),
+            [
+                "1",
+                "".join(f"{os.path.basename(p)}\n" for p in paths[:6]),
+                "error: 05-bad.md\n"
+                "Stopped after the first file with errors.\n",
+            ],
+        )
+        exit_code, stdout, stderr = self._run(paths, 4, ["--fail-fast"])
+        self.assertEqual(exit_code, "1")
+        # Either failure may be found first, and output for whichever files
+        # were checked is still in order.
+        checked = stdout.splitlines()
+        self.assertEqual(checked, sorted(checked))
+        errors = stderr.splitlines()
+        self.assertEqual(
+            errors[-1], "Stopped after the first file with errors."
+        )
+        self.assertIn(errors[0], ("error: 05-bad.md", "error: 30-bad.md"))
+
+    def test_order(self) -> None:
+        paths = [self._write(f"{i:02d}.md", 10) for i in range(40)]
+        paths.append(self._write("bad.md", 10))
+        # Files are modified in reverse order, with the failure oldest.
+        for i, path in enumerate(reversed(paths)):
+            os.utime(path, (1000 + i, 1000 + i))
+        recent = [os.path.basename(path) for path in paths]
+        cache_dir = os.path.join(self._temp_dir.name, "cache")
+        for jobs in (1, 4):
+            self.assertEqual(
+                self._run(paths, jobs, ["--order=recent"])[1].split(),
+                recent,
+            )
+            flags = ["--order=failures", f"--cache-dir={cache_dir}"]
+            self.assertEqual(self._run(paths, jobs, flags)[1].split(), recent)
+            # Files that failed are then checked first.
+            self.assertEqual(
+                self._run(paths, jobs, flags)[1].split(),
+                ["bad.md"] + recent[:-1],
+            )
+            shutil.rmtree(cache_dir)
+
+    def test_read_paths(self) -> None:
+        for data, paths in (
+            (b"a.md\0b c.md\0", ["a.md", "b c.md"]),
+            (b"a.md\nb\nc.md\n", ["a.md", "b", "c.md"]),
+            (b"a.md\0b\nc.md", ["a.md", "b\nc.md"]),
+            # A NUL after the first newline is part of a path.
+            (b"a.md\nb\0c.md\n", ["a.md", "b\0c.md"]),
+            (b"a.md", ["a.md"]),
+            (b"", []),
+        ):
+            self.assertEqual(
+                list(executor._read_paths(io.BytesIO(data))), paths, data
+            )
+
+    def test_read_paths_streaming(self) -> None:
+        # Reads may split paths, and arrive before input ends.
+        reader = io.BufferedReader(io.BytesIO(b"a.md\0bb.md\0"), 3)
+        with mock.patch("pre_commit_hooks.executor._READ_SIZE", 3):
+            paths = executor._read_paths(reader)
+            self.assertEqual(next(paths), "a.md")
+            self.assertLess(reader.tell(), 12)
+            self.assertEqual(list(paths), ["bb.md"])
+
+    def test_paths_from(self) -> None:
+        paths = [self._write("a.md", 1), self._write("bad.md", 1)]
+        paths_file = os.path.join(self._temp_dir.name, "paths")
+        with open(paths_file, "wb") as f:
+            f.write(b"\0".join(os.fsencode(path) for path in paths[1:]))
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+            io.StringIO()
+        ):
+            exit_code = executor.run(
+                "test",
+                self._parse_args(paths[:1], [f"--paths-from={paths_file}"]),
+                _setup,
+                _check,
+            )
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(stdout.getvalue(), "a.md\nbad.md\n")
+
+    def test_paths_from_stdin(self) -> None:
+        path = self._write("a.md", 1)
+        stdin = io.TextIOWrapper(io.BytesIO(os.fsencode(path) + b"\n"))
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), mock.patch("sys.stdin", stdin):
+            executor.run(
+                "test", self._parse_args([], ["--paths-from=-"]), _setup, _check
+            )
+        self.assertEqual(stdout.getvalue(), "a.md\n")
+
+    def test_require_paths(self) -> None:
+        parser = argparse.ArgumentParser()
+        with mock.patch.object(parser, "error", side_effect=ValueError):
+            executor.require_paths(parser, self._parse_args(["a"], []))
+            executor.require_paths(
+                parser, self._parse_args([], ["--paths-from=-"])
+            )
+            executor.require_paths(
+                parser, self._parse_args([], [f"--watch={self._temp_dir.name}"])
+            )
+            with self.assertRaises(ValueError):
+                executor.require_paths(parser, self._parse_args([], []))
+
+    def test_shard(self) -> None:
+        paths = [self._write(f"{i:02d}.md", i * 1000) for i in range(20)]
+        shards = [executor._shard(paths, index, 3) for index in (1, 2, 3)]
+        # Shards partition the paths, keeping their order.
+        self.assertEqual(sorted(sum(shards, [])), paths)
+        for shard in shards:
+            self.assertEqual(shard, sorted(shard))
+        # Shards don't depend on the order of paths.
+        self.assertEqual(
+            [executor._shard(paths[::-1], index, 3) for index in (1, 2, 3)],
+            [shard[::-1] for shard in shards],
+        )
+        # Work is balanced to within the largest file.
+        loads = [
+            sum(os.path.getsize(path) for path in shard) for shard in shards
+        ]
+        self.assertLessEqual(max(loads) - min(loads), 19 * 1000)
+
+    def test_parse_jobs(self) -> None:
+        self.assertEqual(executor._parse_jobs("3"), 3)
+        with mock.patch.object(executor, "_default_jobs", return_value=8):
+            self.assertEqual(executor._parse_jobs("0"), 8)
+        for arg in ("-1", "x", ""):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                executor._parse_jobs(arg)
+
+    def test_parse_shard(self) -> None:
+        self.assertEqual(executor._parse_shard("2/4"), (2, 4))
+        for arg in ("0/4", "5/4", "1", "a/b", "-1/4"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                executor._parse_shard(arg)
+
+    def test_run_shard(self) -> None:
+        paths = [self._write(f"{i}.md", i) for i in range(4)]
+        outputs = []
+        for index in (1, 2):
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                executor.run(
+                    "test",
+                    self._parse_args(paths, [f"--shard={index}/2"]),
+                    _setup,
+                    _check,
+                )
+            outputs.append(stdout.getvalue())
+        self.assertEqual(
+            sorted("".join(outputs).splitlines()),
+            ["0.md", "1.md", "2.md", "3.md"],
+        )
+        self.assertTrue(all(outputs))
+
+    def test_wants(self) -> None:
+        paths = [self._write("a.md", 1), self._write("bad.py", 1)]
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            exit_code = executor.run(
+                "test",
+                self._parse_args(paths, ["--jobs=1"]),
+                _setup,
+                _check,
+                wants=lambda path: path.endswith(".md"),
+            )
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(stdout.getvalue(), "a.md\n")
+
+    def test_finish(self) -> None:
+        finished: List[str] = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            executor.run(
+                "test",
+                self._parse_args([self._write("a.md", 1)], []),
+                _setup,
+                _check,
+                finish=finished.append,
+            )
+        self.assertEqual(finished, ["state"])
+
+    def test_observe(self) -> None:
+        paths = [self._write("a.md", 1), self._write("bad.md", 1)]
+        observed: List[Tuple[str, bool]] = []
+        with executor.observe(
+            lambda path, has_errors, elapsed: observed.append(
+                (os.path.basename(path), has_errors)
+            )
+        ):
+            self._run(paths, 1)
+        self.assertEqual(observed, [("a.md", False), ("bad.md", True)])
+        # Observers are removed on exit.
+        self._run(paths, 1)
+        self.assertEqual(len(observed), 2)
+
+    def test_trace(self) -> None:
+        paths = [self._write(f"{i:02d}.md", i * 10) for i in range(40)]
+        trace_path = os.path.join(self._temp_dir.name, "trace.json")
+        for jobs in (1, 4):
+            self._run(paths, jobs, ["--trace", trace_path])
+            with open(trace_path) as f:
+                events = json.load(f)["traceEvents"]
+            checked = [
+                e["args"]["path"] for e in events if e["name"] == "check"
+            ]
+            self.assertEqual(sorted(checked), paths)
+            # Workers name their processes.
+            names = [e["args"]["name"] for e in events if e["ph"] == "M"]
+            self.assertEqual(names[0], "main")
+            self.assertEqual(len(names) > 1, jobs > 1)
+        self.assertFalse(tracing.enabled())
+
+    def test_metrics_out(self) -> None:
+        paths = [self._write(f"{i:02d}.md", 10) for i in range(40)]
+        paths.append(self._write("skipped.py", 10))
+        metrics_path = os.path.join(self._temp_dir.name, "metrics.json")
+        for jobs in (1, 4):
+            with contextlib.redirect_stdout(io.StringIO()):
+                executor.run(
+                    "test",
+                    self._parse_args(
+                        paths, [f"--jobs={jobs}", "--metrics-out", metrics_path]
+                    ),
+                    _setup,
+                    _check,
+                    wants=lambda path: path.endswith(".md"),
+                )
+            with open(metrics_path) as f:
+                report = json.load(f)
+            self.assertEqual(report["hook"], "test")
+            self.assertEqual(report["counters"]["files_seen"], 41)
+            self.assertEqual(report["counters"]["files_skipped"], 1)
+            # Checks in workers are counted too.
+            self.assertEqual(report["phases"]["check"]["count"], 40)
+        self.assertFalse(metrics.enabled())
+        self.assertFalse(tracing.enabled())
+
+    @unittest.skipIf(
+        sys.version_info < (3, 9), "needs tracemalloc.reset_peak()"
+    )
+    def test_profile_memory(self) -> None:
+        paths = [self._write(f"{i:02d}.md", 10) for i in range(4)]
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(
+            io.StringIO()
+        ), contextlib.redirect_stderr(stderr):
+            executor.run(
+                "test",
+                self._parse_args(paths, ["--jobs=4", "--profile-memory"]),
+                _setup,
+                _check,
+            )
+        # Files are profiled in this process, despite --jobs.
+        self.assertIn("Memory profile of 4 files", stderr.getvalue())
+
+    def test_cache(self) -> None:
+        cache_dir = os.path.join(self._temp_dir.name, "cache")
+        path = self._write("bad.md", 1)
+        parsed_args = self._parse_args(
+            [path], ["--cache", f"--cache-dir={cache_dir}"]
+        )
+        check = mock.Mock(wraps=_check)
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+            io.StringIO()
+        ):
+            self.assertEqual(
+                executor.run("test", parsed_args, _setup, check), 1
+            )
+            self.assertEqual(
+                executor.run("test", parsed_args, _setup, check), 1
+            )
+            # Different options don't share results.
+            parsed_args.option = True
+            self.assertEqual(
+                executor.run("test", parsed_args, _setup, check), 1
+            )
+        self.assertEqual(check.call_count, 2)
+        # Cached output is replayed.
+        self.assertEqual(stdout.getvalue(), "bad.md\n" * 3)
+
+    def test_cache_by_path(self) -> None:
+        cache_dir = os.path.join(self._temp_dir.name, "cache")
+        paths = [self._write("bad.md", 1), self._write("good.md", 1)]
+        check = mock.Mock(wraps=_check)
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+            io.StringIO()
+        ):
+            for path, exit_code in zip(paths, (1, 0)):
+                parsed_args = self._parse_args(
+                    [path], ["--cache", f"--cache-dir={cache_dir}"]
+                )
+                self.assertEqual(
+                    executor.run("test", parsed_args, _setup, check),
+                    exit_code,
+                )
+        # Files with the same contents don't share results or output.
+        self.assertEqual(check.call_count, 2)
+        self.assertEqual(stdout.getvalue(), "bad.md\ngood.md\n")
+
+    def test_keep_states(self) -> None:
+        path = self._write("a.md", 1)
+        state = mock.Mock()
+        setup = mock.Mock(return_value=state)
+        check = mock.Mock(return_value=False)
+        self.addCleanup(setattr, executor, "_kept_states", None)
+        executor.keep_states()
+        for _ in range(2):
+            executor.run("test", self._parse_args([path], []), setup, check)
+        self.assertEqual(setup.call_count, 1)
+        self.assertEqual(state.refresh.call_count, 1)
+        # Different options get their own state.
+        parsed_args = self._parse_args([path], [])
+        parsed_args.option = True
+        executor.run("test", parsed_args, setup, check)
+        self.assertEqual(setup.call_count, 2)
+        # States for whole-run outputs aren't kept.
+        executor.run("test", parsed_args, setup, check, needs_all_files=True)
+        self.assertEqual(setup.call_count, 3)
+
+    def test_watch(self) -> None:
+        a_path = self._write("a.md", 1)
+        b_path = self._write("b.md", 1)
+        deleted_path = os.path.join(self._temp_dir.name, "deleted.md")
+
+        def changes() -> Iterator[Set[str]]:
+            yield {a_path, self._write("c.txt", 1)}
+            yield {deleted_path}
+
+        def dependents(state: str, path: str) -> List[str]:
+            return [b_path] if path == deleted_path else []
+
+        stdout = io.StringIO()
+        with mock.patch(
+            "pre_commit_hooks.watch.Watcher"
+        ) as watcher, contextlib.redirect_stdout(
+            stdout
+        ), contextlib.redirect_stderr(
+            io.StringIO()
+        ):
+            watcher.return_value.changes.side_effect = changes
+            exit_code = executor.run(
+                "test",
+                self._parse_args([], [f"--watch={self._temp_dir.name}"]),
+                _setup,
+                _check,
+                wants=lambda path: path.endswith(".md"),
+                dependents=dependents,
+            )
+        self.assertEqual(exit_code, 0)
+        watcher.assert_called_once_with(self._temp_dir.name)
+        # All files are checked first, then each change's affected files.
+        self.assertEqual(stdout.getvalue(), "a.md\nb.md\na.md\nb.md\n")
+        watcher.return_value.close.assert_called_once()
@@ -0,0 +1,85 @@
+"""Records which files failed recent checks, so that they can be checked first.
+
+Each hook keeps a small JSON file of the paths that failed, with when they
+last failed. Runs only update the paths they check, so that concurrent runs
+on other paths, such as pre-commit batches, don't undo each other's updates.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional
+
+# The most failures kept, dropping the oldest, so that the file stays small.
+_MAX_ENTRIES = 1000
+
+
+class FailureHistory(object):
+    """Failures of a hook's checks, keyed by absolute path."""
+
+    def __init__(self, cache_dir: str, hook: str) -> None:
+        self._path = os.path.join(cache_dir, "failures", hook + ".json")
+        self._failures = self._load()
+        # Results recorded by this run, as failure times or None for passes.
+        self._updates: Dict[str, Optional[float]] = {}
+
+    def _load(self) -> Dict[str, float]:
+        """Reads failures, treating a missing or corrupt file as empty."""
+        try:
+            with open(self._path) as f:
+                failures = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(failures, dict):
+            return {}
+        return failures
+
+    def last_failed(self, path: str) -> Optional[float]:
+        """Returns when a path last failed, if it failed its last check."""
+        return self._failures.get(os.path.abspath(path))
+
+    def record(self, path: str, has_errors: bool) -> None:
+        self._updates[os.path.abspath(path)] = (
+            time.time() if has_errors else None
+        )
+
+    def save(self) -> None:
+        """Writes recorded results, merged with any written since loading.
+
+        The file is replaced atomically, so that concurrent runs never read a
+        partial file.
+        """
+        if not self._updates:
+            return
+        failures = self._load()
+        for path, failed in self._updates.items():
+            if failed is None:
+                failures.pop(path, None)
+            else:
+                failures[path] = failed
+        if len(failures) > _MAX_ENTRIES:
+            newest = sorted(failures.items(), key=lambda x: -x[1])
+            failures = dict(newest[:_MAX_ENTRIES])
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        temp_path = "%s.%d.tmp" % (self._path, os.getpid())
+        with open(temp_path, "w") as f:
+            json.dump(failures, f)
+        os.replace(temp_path, self._path)
+        self._failures = failures
+        self._updates = {}
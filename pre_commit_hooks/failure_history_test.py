@@ -0,0 +1,85 @@
+"""Tests for failure_history.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pre_commit_hooks import failure_history
+
+
+class TestFailureHistory(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+
+    def _history(self) -> failure_history.FailureHistory:
+        return failure_history.FailureHistory(self._temp_dir.name, "test")
+
+    def test_record(self) -> None:
+        history = self._history()
+        self.assertIsNone(history.last_failed("a.md"))
+        history.record("a.md", True)
+        history.record("b.md", True)
+        history.save()
+        self.assertIsNotNone(history.last_failed("a.md"))
+
+        history = self._history()
+        self.assertIsNotNone(history.last_failed(os.path.abspath("a.md")))
+        history.record("a.md", False)
+        history.save()
+        self.assertIsNone(self._history().last_failed("a.md"))
+        self.assertIsNotNone(self._history().last_failed("b.md"))
+
+    def test_concurrent_runs(self) -> None:
+        first = self._history()
+        second = self._history()
+        first.record("a.md", True)
+        first.save()
+        second.record("b.md", True)
+        second.save()
+        # Runs only update the paths they checked.
+        history = self._history()
+        self.assertIsNotNone(history.last_failed("a.md"))
+        self.assertIsNotNone(history.last_failed("b.md"))
+
+    def test_max_entries(self) -> None:
+        history = self._history()
+        with mock.patch(
+            "pre_commit_hooks.failure_history._MAX_ENTRIES", 2
+        ), mock.patch("time.time", side_effect=[1, 3, 2]):
+            for path in ("a.md", "b.md", "c.md"):
+                history.record(path, True)
+            history.save()
+        history = self._history()
+        # The oldest failure is dropped.
+        self.assertEqual(history.last_failed("b.md"), 3)
+        self.assertEqual(history.last_failed("c.md"), 2)
+        self.assertIsNone(history.last_failed("a.md"))
+
+    def test_corrupt_file(self) -> None:
+        path = os.path.join(self._temp_dir.name, "failures", "test.json")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write("{")
+        history = self._history()
+        self.assertIsNone(history.last_failed("a.md"))
+        history.record("a.md", True)
+        history.save()
+        self.assertIsNotNone(self._history().last_failed("a.md"))
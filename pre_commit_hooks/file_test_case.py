@@ -16,10 +16,66 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import contextlib
+import io
+import math
 import os
+import re
+import sys
 import tempfile
+import time
+import types
 import unittest
-from typing import Callable, Optional
+from typing import Any, Callable, Optional, Sequence
+
+from pre_commit_hooks import markdown_links
+from pre_commit_hooks import vfs
+
+# Input sizes for scaling assertions. Sizes double, so that each step's
+# growth exponent is the log2 of its cost ratio.
+SCALING_SIZES = (100, 200, 400, 800)
+
+# How far a measured growth exponent may exceed its bound, allowing for
+# logarithmic factors and noise. Operation counts are deterministic, so only
+# need room for O(n log n) work to pass a linear bound.
+_OPERATIONS_TOLERANCE = 0.25
+_TIME_TOLERANCE = 0.5
+
+# Timings keep the fastest of several runs, which is the least affected by
+# other load on the machine.
+_TIME_REPEATS = 5
+
+
+def count_operations(call: Callable[[], Any]) -> int:
+    """Returns the number of Python lines executed by call.
+
+    Unlike timings, counts are the same on every run and machine, so scaling
+    assertions based on them don't flake.
+    """
+    count = 0
+
+    def trace(frame: types.FrameType, event: str, arg: Any) -> Any:
+        nonlocal count
+        if event == "line":
+            count += 1
+        return trace
+
+    previous = sys.gettrace()
+    sys.settrace(trace)
+    try:
+        call()
+    finally:
+        sys.settrace(previous)
+    return count
+
+
+def _time(call: Callable[[], Any]) -> float:
+    best = math.inf
+    for _ in range(_TIME_REPEATS):
+        start = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - start)
+    return best
 
 
 class FileTestCase(unittest.TestCase):
@@ -38,18 +94,90 @@ class FileTestCase(unittest.TestCase):
         if expected is None:
             expected = orig
 
-        dir_name = None
+        filename = self._checked_filename(ext)
+        fs = vfs.MemoryFileSystem({filename: orig}, base=vfs.DiskFileSystem())
+        with vfs.use(fs):
+            self.assertEqual(self._test_call(filename), exit_code)
+        self.assertEqual(fs.read(filename), expected)
+
+    def _checked_filename(self, ext: str) -> str:
+        dir_name = tempfile.gettempdir()
         if self.temp_dir:
             dir_name = self.temp_dir.name
-        with tempfile.NamedTemporaryFile(
-            suffix=ext, mode="w", delete=False, dir=dir_name
-        ) as f:
-            filename = f.name
-            f.write(orig)
-            f.flush()
-
-        self.assertEqual(self._test_call(filename), exit_code)
-        with open(filename) as updated_file:
-            self.assertEqual(updated_file.read(), expected)
-
-        os.unlink(filename)
+        # The checked file is only held in memory, layered over the disk so
+        # that other files written by tests are visible to hooks.
+        return os.path.join(os.path.realpath(dir_name), "checked" + ext)
+
+    def assert_growth(
+        self,
+        run: Callable[[int], Any],
+        max_exponent: float = 1.0,
+        sizes: Sequence[int] = SCALING_SIZES,
+        timed: bool = False,
+    ) -> None:
+        """Asserts that run(n) costs no more than O(n ** max_exponent).
+
+        Costs are operation counts, or with timed, the fastest of several
+        timings, for code whose work is mostly outside Python. Each step
+        between sizes is checked, so fixed costs can't hide growth at the
+        larger sizes.
+        """
+        # Warms up lazy initialization, so that it isn't counted for the
+        # smallest size.
+        run(sizes[0])
+        costs = []
+        for size in sizes:
+            # Compiled regexes and parsed markdown blocks are cached by
+            # contents, so would otherwise be cheaper for contents seen at
+            # earlier sizes.
+            re.purge()
+            markdown_links.clear_cache()
+            if timed:
+                costs.append(_time(lambda: run(size)))
+            else:
+                costs.append(float(count_operations(lambda: run(size))))
+        tolerance = _TIME_TOLERANCE if timed else _OPERATIONS_TOLERANCE
+        for i in range(1, len(sizes)):
+            exponent = math.log(costs[i] / costs[i - 1]) / math.log(
+                sizes[i] / sizes[i - 1]
+            )
+            self.assertLessEqual(
+                exponent,
+                max_exponent + tolerance,
+                "Cost grew as n**%.2f from n=%d to n=%d, exceeding n**%s; "
+                "costs were %s for sizes %s"
+                % (
+                    exponent,
+                    sizes[i - 1],
+                    sizes[i],
+                    max_exponent,
+                    costs,
+                    list(sizes),
+                ),
+            )
+
+    def assert_scales(
+        self,
+        make_contents: Callable[[int], str],
+        max_exponent: float = 1.0,
+        ext: str = ".md",
+        sizes: Sequence[int] = SCALING_SIZES,
+        timed: bool = False,
+    ) -> None:
+        """Asserts that the hook scales with the size of a checked file.
+
+        make_contents(n) returns contents with n of something, such as
+        headers, links, or lines. Output is discarded.
+        """
+        filename = self._checked_filename(ext)
+        # Contents are made up front, so that only the hook is measured.
+        contents = {size: make_contents(size) for size in sizes}
+
+        def run(size: int) -> None:
+            fs = vfs.MemoryFileSystem(
+                {filename: contents[size]}, base=vfs.DiskFileSystem()
+            )
+            with vfs.use(fs), contextlib.redirect_stdout(io.StringIO()):
+                self._test_call(filename)
+
+        self.assert_growth(run, max_exponent, sizes, timed)
@@ -0,0 +1,31 @@
+"""Problems found by hooks, returned by checks instead of printed."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import NamedTuple, Optional, Tuple
+
+
+class Finding(NamedTuple):
+    # The ID of the hook that found the problem, such as `check-links`.
+    hook: str
+    # The 1-based line of the problem, or None for the whole file.
+    line: Optional[int]
+    message: str
+    # The markdown that the problem is in, such as a link, if any.
+    context: Optional[str] = None
+    # Suggested replacements, such as a missing copyright or likely anchors.
+    suggestions: Tuple[str, ...] = ()
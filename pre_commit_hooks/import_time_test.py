@@ -0,0 +1,114 @@
+"""Tests that hooks start quickly, using `python -X importtime`."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+import unittest
+
+# Modules that are slow to import, and only needed for some files or flags.
+_LAZY_MODULES = (
+    "commonmark",
+    "datetime",
+    "multiprocessing",
+    "sqlite3",
+    "textwrap",
+)
+
+# The budget for imports by an entry point, beyond those made by Python's own
+# startup, as a multiple of the cost of startup imports so that it scales with
+# machine speed. The combined runner is typically around 10.
+_BUDGET_STARTUP_MULTIPLE = 15
+
+# Matches lines of `-X importtime` output, such as:
+#   import time:       531 |       1230 |   _frozen_importlib_external
+_IMPORT_TIME_RE = re.compile(
+    r"^import time:\s+(?P<self>\d+) \|\s+\d+ \| +(?P<module>\S+)$",
+    flags=re.MULTILINE,
+)
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import_times(code: str, cwd: str) -> Dict[str, int]:
+    """Runs code, returning the time to import each module in microseconds."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, (_PACKAGE_DIR, env.get("PYTHONPATH")))
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    return {
+        match.group("module"): int(match.group("self"))
+        for match in _IMPORT_TIME_RE.finditer(result.stderr)
+    }
+
+
+class TestImportTime(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+        # Files which every hook filters out, by extension or skip pattern.
+        for filename in ("LICENSE", "skipped.json"):
+            with open(os.path.join(self._temp_dir.name, filename), "w") as f:
+                f.write("skipped\n")
+        self._startup = _import_times("pass", self._temp_dir.name)
+
+    def _check_entry_point(self, entry_point: str, args: List[str]) -> None:
+        code = (
+            "import sys\n"
+            "from pre_commit_hooks import daemon\n"
+            f"sys.argv = {[entry_point] + args!r}\n"
+            f"sys.exit(daemon.{entry_point}())\n"
+        )
+        import_times = _import_times(code, self._temp_dir.name)
+        self.assertIn("pre_commit_hooks.daemon", import_times)
+        for module in _LAZY_MODULES:
+            self.assertNotIn(module, import_times)
+
+        total_usecs = sum(
+            usecs
+            for module, usecs in import_times.items()
+            if module not in self._startup
+        )
+        budget_usecs = sum(self._startup.values()) * _BUDGET_STARTUP_MULTIPLE
+        self.assertLess(total_usecs, budget_usecs)
+
+    def test_check_copyright(self) -> None:
+        self._check_entry_point("check_copyright", ["LICENSE", "skipped.json"])
+
+    def test_check_google_doc_style(self) -> None:
+        self._check_entry_point("check_google_doc_style", ["LICENSE"])
+
+    def test_check_links(self) -> None:
+        self._check_entry_point("check_links", ["LICENSE"])
+
+    def test_markdown_toc(self) -> None:
+        self._check_entry_point("markdown_toc", ["LICENSE"])
+
+    def test_tool_hooks(self) -> None:
+        self._check_entry_point("tool_hooks", ["run", "LICENSE"])
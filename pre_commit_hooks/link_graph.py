@@ -0,0 +1,77 @@
+"""Library for building a link graph between markdown documents."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import collections
+import heapq
+import json
+import sys
+from typing import Counter, List, Set, TextIO, Tuple
+
+
+class LinkGraph(object):
+    """Streams link edges to a file while tracking inbound link counts.
+
+    Edges are written as they're added, so memory grows with the number of
+    documents and anchors rather than the number of links.
+    """
+
+    def __init__(self, out: TextIO) -> None:
+        self._out = out
+        self._documents: Set[str] = set()
+        # Documents with at least one inbound link from another document.
+        self._linked: Set[str] = set()
+        self._anchor_links: Counter[Tuple[str, str]] = collections.Counter()
+
+    def add_document(self, path: str) -> None:
+        """Records a document as a node, so that it may be an orphan."""
+        self._documents.add(sys.intern(path))
+
+    def add_edge(
+        self, source: str, target: str, anchor: str, line: int
+    ) -> None:
+        """Records a link from source to target, with an optional anchor."""
+        self._out.write(
+            json.dumps(
+                {
+                    "source": source,
+                    "target": target,
+                    "anchor": anchor,
+                    "line": line,
+                },
+                separators=(",", ":"),
+            )
+        )
+        self._out.write("\n")
+        if source != target:
+            self._linked.add(sys.intern(target))
+        if anchor:
+            self._anchor_links[(sys.intern(target), sys.intern(anchor))] += 1
+
+    def orphans(self) -> List[str]:
+        """Returns documents that no other document links to."""
+        return sorted(self._documents - self._linked)
+
+    def top_anchors(self, count: int) -> List[Tuple[int, str, str]]:
+        """Returns (links, path, anchor) for the most linked anchors."""
+        # Break ties by path and anchor so that output is deterministic.
+        top = heapq.nsmallest(
+            count,
+            self._anchor_links.items(),
+            key=lambda x: (-x[1], x[0]),
+        )
+        return [(links, path, anchor) for (path, anchor), links in top]
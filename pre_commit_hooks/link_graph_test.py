@@ -0,0 +1,64 @@
+"""Tests for link_graph.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import io
+import json
+import unittest
+
+from pre_commit_hooks import link_graph
+
+
+class TestLinkGraph(unittest.TestCase):
+    def test_edges(self) -> None:
+        out = io.StringIO()
+        graph = link_graph.LinkGraph(out)
+        graph.add_edge("a.md", "b.md", "foo", 3)
+        graph.add_edge("a.md", "a.md", "", 5)
+        self.assertEqual(
+            [json.loads(line) for line in out.getvalue().splitlines()],
+            [
+                {
+                    "source": "a.md",
+                    "target": "b.md",
+                    "anchor": "foo",
+                    "line": 3,
+                },
+                {"source": "a.md", "target": "a.md", "anchor": "", "line": 5},
+            ],
+        )
+
+    def test_orphans(self) -> None:
+        graph = link_graph.LinkGraph(io.StringIO())
+        for path in ("a.md", "b.md", "c.md"):
+            graph.add_document(path)
+        graph.add_edge("a.md", "b.md", "", 1)
+        # Links within a document don't keep it from being an orphan.
+        graph.add_edge("c.md", "c.md", "foo", 1)
+        self.assertEqual(graph.orphans(), ["a.md", "c.md"])
+
+    def test_top_anchors(self) -> None:
+        graph = link_graph.LinkGraph(io.StringIO())
+        graph.add_edge("a.md", "b.md", "foo", 1)
+        graph.add_edge("c.md", "b.md", "foo", 1)
+        graph.add_edge("a.md", "b.md", "bar", 2)
+        graph.add_edge("a.md", "a.md", "baz", 3)
+        graph.add_edge("a.md", "b.md", "", 4)
+        self.assertEqual(
+            graph.top_anchors(2),
+            [(2, "b.md", "foo"), (1, "a.md", "baz")],
+        )
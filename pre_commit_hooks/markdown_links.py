@@ -1,4 +1,9 @@
-"""Library for loading links from a markdown file."""
+"""Library for loading links from a markdown file.
+
+Documents are split into blocks at top-level headings, and each block's parse
+is cached by its contents, so that editing one section of a large document,
+such as while watching it, only reparses that section.
+"""
 
 __copyright__ = """
 Copyright 2021 Google LLC
@@ -16,10 +21,39 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import collections
 import re
-from typing import Any, Dict, List, NamedTuple, Tuple
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+from pre_commit_hooks import metrics
+from pre_commit_hooks import tracing
+
+# Cached blocks are evicted, least recently used first, beyond this many
+# characters of blocks.
+_MAX_CACHED_CHARS = 8 * 1024 * 1024
 
-import commonmark
+# Matches an ATX heading at the start of a line, which can start a block.
+_HEADING_RE = re.compile(r"#{1,6}(?:[ \t]|$)")
+
+# Matches the opening of a fenced code block, capturing its indent, fence,
+# and info string.
+_FENCE_RE = re.compile(r"( {0,3})(`{3,}|~{3,})(.*)")
+
+# Matches a link reference definition, which applies to the whole document.
+_LINK_REFERENCE_RE = re.compile(r"^ {0,3}\[(?:[^\\\]]|\\.)+\]:", re.MULTILINE)
+
+# The starts and ends of HTML blocks which may contain blank lines.
+_RAW_HTML_BLOCKS = (
+    (
+        re.compile(r" {0,3}<(?:pre|script|style|textarea)(?:[ \t>]|$)", re.I),
+        re.compile(r"</(?:pre|script|style|textarea)>", re.I),
+    ),
+    (re.compile(r" {0,3}<!--"), re.compile(r"-->")),
+    (re.compile(r" {0,3}<\?"), re.compile(r"\?>")),
+    (re.compile(r" {0,3}<![A-Za-z]"), re.compile(r">")),
+    (re.compile(r" {0,3}<!\[CDATA\["), re.compile(r"\]\]>")),
+)
 
 
 class Header(NamedTuple):
@@ -49,8 +83,8 @@ def _make_label(node: Any) -> str:
     return "".join(label)
 
 
-def _make_anchor(node: Any, used_anchors: Dict[str, int]) -> str:
-    """Chooses the appropriate anchor name for a header label."""
+def _make_anchor(node: Any) -> str:
+    """Makes the anchor for a header, before numbering reused anchors."""
     # Pick out the text fragments that the anchor will be based off.
     label_parts: List[str] = []
     for child, _ in node.walker():
@@ -64,33 +98,118 @@ def _make_anchor(node: Any, used_anchors: Dict[str, int]) -> str:
     # anywhere, so this based on experimentation and what others have done to
     # successfully replicate the GitHub anchor mapping.
     anchor = anchor.replace(" ", "-")
-    anchor = re.sub("[!\"#$%&'()*+,./:;<=>?@[\\\\\\]^`{|}~]", "", anchor)
+    return re.sub("[!\"#$%&'()*+,./:;<=>?@[\\\\\\]^`{|}~]", "", anchor)
+
 
-    # Enumerate anchors when reused.
+def _number_anchor(anchor: str, used_anchors: Dict[str, int]) -> str:
+    """Enumerates anchors when reused."""
     if anchor in used_anchors:
         used_anchors[anchor] += 1
-        anchor = "%s-%d" % (anchor, used_anchors[anchor])
-    else:
-        used_anchors[anchor] = 0
-
+        return "%s-%d" % (anchor, used_anchors[anchor])
+    used_anchors[anchor] = 0
     return anchor
 
 
-def get_links(contents: str) -> Tuple[List[Header], List[Link]]:
-    # Maps anchor tags to titles.
+def _raw_html(line: str) -> Tuple[bool, Optional[Pattern[str]]]:
+    """Checks for an HTML block which may contain blank lines.
+
+    Returns whether line starts one, and its end if it doesn't end on line.
+    """
+    for start, end in _RAW_HTML_BLOCKS:
+        match = start.match(line)
+        if match:
+            if end.search(line, match.end()):
+                return True, None
+            return True, end
+    return False, None
+
+
+def _split_blocks(contents: str) -> List[Tuple[int, str]]:
+    """Splits contents into blocks which parse alone as they do in contents.
+
+    Returns each block with the number of lines before it. Blocks start at
+    top-level ATX headings after blank lines, outside fenced code and HTML
+    blocks, since those headings close any other open block. Where that's
+    unclear, such as for a fence which may be in a list item, the rest of the
+    document is left as one block.
+    """
+    # Lone carriage returns would miscount lines, and link reference
+    # definitions apply to the whole document.
+    if "\r" in contents or _LINK_REFERENCE_RE.search(contents):
+        return [(0, contents)]
+    blocks: List[Tuple[int, str]] = []
+    block_line = 0
+    block_offset = 0
+    offset = 0
+    fence = ""
+    fence_indent = 0
+    # The end of an open HTML block which may contain blank lines.
+    html_end: Optional[Pattern[str]] = None
+    # Whether in another HTML block, or a paragraph which starts like one,
+    # either of which ends at a blank line.
+    in_html = False
+    after_blank = False
+    for index, line in enumerate(contents.split("\n")):
+        blank = not line.strip()
+        stripped = line.lstrip(" ")
+        indent = len(line) - len(stripped)
+        if fence:
+            if not blank and indent < fence_indent:
+                # This may be in the fence, or end a list item holding it.
+                break
+            stripped = stripped.rstrip()
+            if (
+                indent - fence_indent <= 3
+                and len(stripped) >= len(fence)
+                and not stripped.lstrip(fence[0])
+            ):
+                fence = ""
+        elif html_end:
+            if html_end.search(line):
+                html_end = None
+        elif in_html:
+            if blank:
+                in_html = False
+            elif _FENCE_RE.match(line) or _raw_html(line)[1]:
+                # These can interrupt a paragraph, but not an HTML block.
+                break
+        else:
+            if after_blank and _HEADING_RE.match(line):
+                blocks.append((block_line, contents[block_offset:offset]))
+                block_line = index
+                block_offset = offset
+            match = _FENCE_RE.match(line)
+            if match and not (
+                match.group(2)[0] == "`" and "`" in match.group(3)
+            ):
+                fence = match.group(2)
+                fence_indent = len(match.group(1))
+            elif indent <= 3 and stripped.startswith("<"):
+                is_raw, html_end = _raw_html(line)
+                in_html = not is_raw
+        after_blank = blank
+        offset += len(line) + 1
+    blocks.append((block_line, contents[block_offset:]))
+    return blocks
+
+
+# The headers and links of a block, with unnumbered anchors and line numbers
+# relative to the block.
+_Parsed = Tuple[List[Header], List[Link]]
+
+
+def _parse_block(contents: str) -> _Parsed:
+    """Parses headers and links, leaving anchors unnumbered and unchecked."""
     headers: List[Header] = []
     links: List[Link] = []
 
-    # Tracks the number of times a given anchor tag is used.
-    used_anchors: Dict[str, int] = {}
-
-    # Passive correctness checking on files.
-    prev_level = 1
-    prev_header = "(first header)"
+    # The actual parser. It's slow to import, so this waits until a file
+    # actually needs parsing.
+    import commonmark
 
-    # The actual parser.
     md_parser = commonmark.Parser()
     root = md_parser.parse(contents)
+    metrics.count("blocks_parsed")
 
     # Links don't have sourcepos set, so use the closest known location.
     last_line = -1
@@ -102,27 +221,103 @@ def get_links(contents: str) -> Tuple[List[Header], List[Link]]:
             continue
 
         if child.t == "heading":
-            label = _make_label(child)
+            assert child.level is not None
+            headers.append(
+                Header(_make_label(child), _make_anchor(child), child.level)
+            )
+        elif child.t == "link":
+            assert child.destination is not None
+            links.append(
+                Link(_make_label(child), str(child.destination), last_line)
+            )
+    # The node tree is freed on return.
+    tracing.checkpoint()
+    return (headers, links)
+
+
+class _BlockCache(object):
+    """Caches parses of blocks by their contents.
+
+    Shared by worker threads, so parses are made outside the lock.
+    """
+
+    def __init__(self, max_chars: int) -> None:
+        self._blocks: "collections.OrderedDict[str, _Parsed]" = (
+            collections.OrderedDict()
+        )
+        self._max_chars = max_chars
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def parse(self, block: str) -> _Parsed:
+        """Returns the headers and links of a block, parsing it if needed.
+
+        The returned lists are shared, and mustn't be changed.
+        """
+        with self._lock:
+            parsed = self._blocks.get(block)
+            if parsed is not None:
+                self._blocks.move_to_end(block)
+                return parsed
+        parsed = _parse_block(block)
+        with self._lock:
+            if block not in self._blocks:
+                self._blocks[block] = parsed
+                self._chars += len(block)
+                while self._chars > self._max_chars:
+                    evicted, _ = self._blocks.popitem(last=False)
+                    self._chars -= len(evicted)
+        return parsed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+            self._chars = 0
 
-            if child.level - 1 > prev_level:
+
+_block_cache = _BlockCache(_MAX_CACHED_CHARS)
+
+
+def clear_cache() -> None:
+    """Forgets cached parses, such as to time parsing from scratch."""
+    _block_cache.clear()
+
+
+@tracing.traced("parse")
+def get_links(contents: str) -> Tuple[List[Header], List[Link]]:
+    # Maps anchor tags to titles.
+    headers: List[Header] = []
+    links: List[Link] = []
+
+    # Tracks the number of times a given anchor tag is used.
+    used_anchors: Dict[str, int] = {}
+
+    # Passive correctness checking on files.
+    prev_level = 1
+    prev_header = "(first header)"
+
+    metrics.count("parses")
+    # Anchors and header levels depend on earlier blocks, so they're
+    # numbered and checked here rather than cached.
+    for line_offset, block in _split_blocks(contents):
+        block_headers, block_links = _block_cache.parse(block)
+        for label, anchor, level in block_headers:
+            if level - 1 > prev_level:
                 raise ValueError(
                     "Header %r has level %d, which is too deep versus previous "
                     "header %r with level %d."
-                    % (label, child.level, prev_header, prev_level)
+                    % (label, level, prev_header, prev_level)
                 )
-            prev_level = child.level
+            prev_level = level
             prev_header = label
-
             headers.append(
-                Header(
-                    label,
-                    _make_anchor(child, used_anchors),
-                    child.level,
-                )
+                Header(label, _number_anchor(anchor, used_anchors), level)
             )
-        elif child.t == "link":
-            assert child.destination is not None
-            links.append(
-                Link(_make_label(child), str(child.destination), last_line)
+        if line_offset:
+            links.extend(
+                link._replace(line_number=link.line_number + line_offset)
+                for link in block_links
             )
+        else:
+            links.extend(block_links)
     return (headers, links)
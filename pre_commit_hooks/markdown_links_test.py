@@ -17,8 +17,10 @@ limitations under the License.
 """
 
 import unittest
+from typing import List
 
 from pre_commit_hooks import markdown_links
+from pre_commit_hooks import metrics
 
 
 class TestMarkdownLinks(unittest.TestCase):
@@ -117,3 +119,78 @@ class TestMarkdownLinks(unittest.TestCase):
             ],
             links,
         )
+
+
+class TestBlocks(unittest.TestCase):
+    def setUp(self) -> None:
+        markdown_links.clear_cache()
+        metrics.start()
+        self.addCleanup(metrics.stop)
+
+    def _blocks(self, contents: str) -> List[str]:
+        return [block for _, block in markdown_links._split_blocks(contents)]
+
+    def test_split(self) -> None:
+        self.assertEqual(
+            self._blocks("# A\n\ntext\n\n## B\n# C\n"),
+            ["# A\n\ntext\n\n", "## B\n# C\n"],
+        )
+
+    def test_no_split_in_code_or_html(self) -> None:
+        contents = (
+            "# A\n\n```\n\n# Not a header\n```\n\n"
+            "<!--\n\n# Not a header\n-->\n\n"
+            "    # Not a header\n\n"
+            "# B\n"
+        )
+        self.assertEqual(self._blocks(contents), [contents[:-4], "# B\n"])
+
+    def test_whole_document(self) -> None:
+        # Link reference definitions apply to the whole document.
+        contents = "# A\n\n[x][ref]\n\n# B\n\n[ref]: /a\n"
+        self.assertEqual(self._blocks(contents), [contents])
+        # A fence may be in a list item, which a header would close.
+        contents = "- a\n\n  ```\n\n# B\n  ```\n\n# C\n"
+        self.assertEqual(self._blocks(contents), [contents])
+
+    def test_across_blocks(self) -> None:
+        contents = (
+            "# A\n\n<!--\n\n# Not a header\n\n-->\n\n"
+            "## A\n\n~~~~\n# Not a header\n~~~~~\n\n"
+            "## C\n\ntext\n[c](#c)\n"
+        )
+        self.assertGreater(len(markdown_links._split_blocks(contents)), 2)
+        headers, links = markdown_links.get_links(contents)
+        self.assertListEqual(
+            [
+                markdown_links.Header("A", "a", 1),
+                markdown_links.Header("A", "a-1", 2),
+                markdown_links.Header("C", "c", 2),
+            ],
+            headers,
+        )
+        self.assertListEqual([markdown_links.Link("c", "#c", 17)], links)
+        self.assertRaisesRegex(
+            ValueError,
+            "'D' has level 4.*'C' with level 2",
+            markdown_links.get_links,
+            contents + "\n#### D\n",
+        )
+
+    def test_reparse_changed(self) -> None:
+        contents = "".join(
+            "## Section %d\n\n[link](#section-%d)\n\n" % (i, i)
+            for i in range(10)
+        )
+        markdown_links.get_links(contents)
+        self.assertEqual(metrics.take(), {"parses": 1, "blocks_parsed": 10})
+        headers, links = markdown_links.get_links(
+            contents.replace("[link](#section-5)", "[edited](#section-1)")
+        )
+        self.assertEqual(metrics.take(), {"parses": 1, "blocks_parsed": 1})
+        self.assertEqual(
+            headers[5], markdown_links.Header("Section 5", "section-5", 2)
+        )
+        self.assertEqual(
+            links[5], markdown_links.Link("edited", "#section-1", 23)
+        )
@@ -19,11 +19,27 @@ limitations under the License.
 """
 
 import argparse
+import os
 import re
 import sys
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
+from pre_commit_hooks import executor
+from pre_commit_hooks import findings
 from pre_commit_hooks import markdown_links
+from pre_commit_hooks import tracing
+from pre_commit_hooks import verdict_cache
+from pre_commit_hooks import vfs
+
+# Matches a multi-document table of contents, such as:
+#   <!-- toc src="chapter*.md" depth=2 -->
+# Markers must start a line, so that mentions in inline code are left alone.
+_SRC_TOC_RE = re.compile(
+    r'^<!-- toc src="(?P<src>[^"]+)"(?: depth=(?P<depth>\d+))? -->'
+    r".*?<!-- tocstop -->",
+    flags=re.DOTALL | re.MULTILINE,
+)
+_DEFAULT_SRC_DEPTH = 2
 
 
 def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
@@ -32,25 +48,135 @@ def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument(
         "paths",
         metavar="PATH",
-        nargs="+",
-        help="One or more paths of files to check.",
+        nargs="*",
+        help="Paths of files to check.",
     )
-    return parser.parse_args(args=argv)
+    executor.add_arguments(parser)
+    parsed_args = parser.parse_args(args=argv)
+    executor.require_paths(parser, parsed_args)
+    return parsed_args
 
 
-def _update_toc(path: str) -> Optional[str]:
-    """Updates the table of contents for a file."""
-    with open(path) as f:
-        contents = f.read()
-    if "<!-- toc -->" not in contents:
-        return None
-    if "<!-- tocstop -->" not in contents:
-        return "Missing tocstop"
+def _fenced_spans(contents: str) -> List[Tuple[int, int]]:
+    """Returns (start, end) offsets of fenced code blocks in contents."""
+    spans: List[Tuple[int, int]] = []
+    fence = ""
+    start = 0
+    offset = 0
+    for line in contents.splitlines(keepends=True):
+        stripped = line.lstrip(" ")
+        indented = len(line) - len(stripped) > 3
+        if not fence:
+            if not indented and stripped.startswith(("```", "~~~")):
+                fence = stripped[: len(stripped) - len(stripped.lstrip("`~"))]
+                start = offset
+        elif not indented and stripped.rstrip().lstrip(fence[0]) == "":
+            if len(stripped.rstrip()) >= len(fence):
+                spans.append((start, offset + len(line)))
+                fence = ""
+        offset += len(line)
+    if fence:
+        # Unclosed fences run to the end of the document.
+        spans.append((start, offset))
+    return spans
 
-    try:
+
+class HeaderCache(object):
+    """Caches headers for files, so that each is parsed at most once.
+
+    A single cache is shared by all files in a run, so that chapters listed by
+    multiple index pages are only parsed once. After `refresh`, entries are
+    reused across runs unless their files have changed.
+    """
+
+    def __init__(self) -> None:
+        # Headers for each file, with the file's fingerprint when parsed.
+        self._cache: Dict[
+            str, Tuple[Optional[List[int]], List[markdown_links.Header]]
+        ] = {}
+        # Files checked against their fingerprints since the last refresh, or
+        # None if there hasn't been one.
+        self._validated: Optional[Set[str]] = None
+
+    def get(self, path: str) -> List[markdown_links.Header]:
+        key = os.path.abspath(path)
+        cached = self._cache.get(key)
+        if (
+            cached is not None
+            and self._validated is not None
+            and key not in self._validated
+            and cached[0] != verdict_cache.fingerprint(key)
+        ):
+            cached = None
+        if cached is None:
+            fingerprint = verdict_cache.fingerprint(key)
+            contents = vfs.current().read(key)
+            headers, _ = markdown_links.get_links(contents)
+            cached = self._cache[key] = (fingerprint, headers)
+        if self._validated is not None:
+            self._validated.add(key)
+        return cached[1]
+
+    def invalidate(self, path: str) -> None:
+        self._cache.pop(os.path.abspath(path), None)
+
+    def refresh(self) -> None:
+        """Revalidates entries against their files when they're next used."""
+        self._validated = set()
+
+
+def _make_src_toc(
+    header_cache: HeaderCache, path: str, match: "re.Match[str]"
+) -> str:
+    """Generates a table of contents listing the headers of other files."""
+    fs = vfs.current()
+    index_dir = os.path.dirname(os.path.abspath(path))
+    depth = int(match.group("depth") or _DEFAULT_SRC_DEPTH)
+    src_paths = sorted(
+        src_path
+        for src_path in fs.glob(os.path.join(index_dir, match.group("src")))
+        if fs.is_file(src_path)
+        and os.path.realpath(src_path) != os.path.realpath(path)
+    )
+
+    # Results change when sources are edited, added, or removed.
+    verdict_cache.depend_on(index_dir)
+    toc = [match.group(0).split("-->", 1)[0] + "-->\n"]
+    for src_path in src_paths:
+        verdict_cache.depend_on(src_path)
+        verdict_cache.depend_on(os.path.dirname(src_path))
+        link = os.path.relpath(src_path, index_dir).replace(os.sep, "/")
+        try:
+            headers = header_cache.get(src_path)
+        except ValueError as e:
+            raise ValueError(f"{link}: {e}")
+        titles = [header for header in headers if header.level == 1]
+        title = titles[0].label if titles else link
+        toc.append(f"-   [{title}]({link})")
+        for header in headers:
+            if header.level == 1 or header.level > depth:
+                continue
+            if header.label.lower() == "table of contents":
+                continue
+            indent = " " * 4 * (header.level - 1)
+            toc.append(f"{indent}-   [{header.label}]({link}#{header.anchor})")
+
+    # Add a blank line after entries, if any.
+    if len(toc) > 1:
+        toc.append("")
+    toc.append("<!-- tocstop -->")
+    return "\n".join(toc)
+
+
+def _make_toc(
+    contents: str, headers: Optional[List[markdown_links.Header]] = None
+) -> str:
+    """Returns contents with an updated table of its own headers.
+
+    headers may be passed when contents have already been parsed.
+    """
+    if headers is None:
         headers, _ = markdown_links.get_links(contents)
-    except ValueError as e:
-        return str(e)
     toc = ["<!-- toc -->\n\n## Table of contents\n"]
     for header in headers:
         if header.label.lower() == "table of contents":
@@ -67,34 +193,107 @@ def _update_toc(path: str) -> Optional[str]:
         toc.append("")
     toc.append("<!-- tocstop -->")
 
-    new_contents = re.sub(
+    return re.sub(
         "<!-- toc -->.*?<!-- tocstop -->",
         "\n".join(toc),
         contents,
         count=1,
         flags=re.DOTALL,
     )
+
+
+def _error(message: str) -> findings.Finding:
+    """Returns a finding for a table of contents or markdown error."""
+    return findings.Finding("markdown-toc", None, message)
+
+
+def _has_toc(contents: str) -> bool:
+    """Returns true if contents have any table of contents markers."""
+    return "<!-- toc -->" in contents or "<!-- toc src=" in contents
+
+
+@tracing.traced("update toc")
+def fix_toc(
+    path: str,
+    contents: str,
+    header_cache: HeaderCache,
+    headers: Optional[List[markdown_links.Header]] = None,
+) -> Tuple[str, Optional[findings.Finding]]:
+    """Updates tables of contents in the contents of path.
+
+    headers may be passed when contents have already been parsed. Returns the
+    updated contents, and errors if any. On errors, the original contents are
+    returned.
+    """
+    if not _has_toc(contents):
+        return contents, None
+    if "<!-- tocstop -->" not in contents:
+        return contents, _error("Missing tocstop")
+
+    new_contents = contents
+    try:
+        if "<!-- toc src=" in contents:
+            # Leave examples in code blocks alone.
+            fenced = _fenced_spans(contents)
+
+            def replace(match: "re.Match[str]") -> str:
+                for start, end in fenced:
+                    if start <= match.start() < end:
+                        return match.group(0)
+                return _make_src_toc(header_cache, path, match)
+
+            new_contents = _SRC_TOC_RE.sub(replace, new_contents)
+        if "<!-- toc -->" in contents:
+            # Multi-document tables only contain links, so headers still
+            # match the new contents.
+            new_contents = _make_toc(new_contents, headers)
+    except ValueError as e:
+        return contents, _error(str(e))
+    return new_contents, None
+
+
+def _update_toc(
+    path: str, header_cache: HeaderCache
+) -> Optional[findings.Finding]:
+    """Updates the table of contents for a file."""
+    fs = vfs.current()
+    contents = fs.read(path)
+    new_contents, toc_error = fix_toc(path, contents, header_cache)
+    if toc_error:
+        return toc_error
+
     if new_contents != contents:
-        with open(path, "w") as f:
-            f.write(new_contents)
+        fs.write(path, new_contents)
+        # Other index pages in the run may list this file.
+        header_cache.invalidate(path)
     return None
 
 
+def print_finding(path: str, finding: findings.Finding) -> None:
+    """Prints a table of contents error."""
+    print(f"Error in {path}: {finding.message}")
+
+
+def _check(header_cache: HeaderCache, path: str) -> bool:
+    """Checks a path, returning true on errors."""
+    toc_error = _update_toc(path, header_cache)
+    if toc_error:
+        print_finding(path, toc_error)
+        return True
+    return False
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     if not argv:
         argv = sys.argv
     parsed_args = _parse_args(argv[1:])
-    paths = parsed_args.paths
-
-    exit_code = 0
-    for path in paths:
-        if not path.endswith(".md"):
-            continue
-        msg = _update_toc(path)
-        if msg:
-            print(f"Error in {path}: {msg}")
-            exit_code = 1
-    return exit_code
+    return executor.run(
+        "markdown-toc",
+        parsed_args,
+        HeaderCache,
+        _check,
+        wants=lambda path: path.endswith(".md"),
+    )
 
 
 if __name__ == "__main__":
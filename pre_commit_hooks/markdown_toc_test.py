@@ -16,6 +16,11 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import os
+import tempfile
+from unittest import mock
+
+from pre_commit_hooks import markdown_links
 from pre_commit_hooks import markdown_toc
 from pre_commit_hooks import file_test_case
 
@@ -127,3 +132,142 @@ class TestMarkdownToc(file_test_case.FileTestCase):
         after = header + toc + body
         self.assert_exit_code(before, after)
         self.assert_exit_code(after, after)
+
+    def test_scaling(self) -> None:
+        # Repeated headers are numbered without rescanning earlier anchors.
+        self.assert_scales(
+            lambda n: "<!-- toc -->\n<!-- tocstop -->\n\n" + "## Setup\n\n" * n
+        )
+
+
+class TestMarkdownSrcToc(file_test_case.FileTestCase):
+    def setUp(self) -> None:
+        self.setup_helper(
+            lambda filename: markdown_toc.main(argv=["bin", filename])
+        )
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        assert self.temp_dir is not None
+        self.temp_dir.cleanup()
+
+    def _write(self, filename: str, contents: str) -> str:
+        assert self.temp_dir is not None
+        path = os.path.join(self.temp_dir.name, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(contents)
+        return path
+
+    def test_src_toc(self) -> None:
+        self._write(
+            "chapter1.md",
+            "# Getting started\n\n## Install\n\n### Linux\n\n## Usage\n",
+        )
+        self._write("chapter2.md", "# Advanced\n\n## Tuning\n")
+        self._write("other.md", "# Other\n")
+        before = '# Book\n\n<!-- toc src="chapter*.md" --><!-- tocstop -->\n'
+        after = (
+            "# Book\n\n"
+            '<!-- toc src="chapter*.md" -->\n\n'
+            "-   [Getting started](chapter1.md)\n"
+            "    -   [Install](chapter1.md#install)\n"
+            "    -   [Usage](chapter1.md#usage)\n"
+            "-   [Advanced](chapter2.md)\n"
+            "    -   [Tuning](chapter2.md#tuning)\n"
+            "\n"
+            "<!-- tocstop -->\n"
+        )
+        self.assert_exit_code(before, after)
+        self.assert_exit_code(after, after)
+
+    def test_src_toc_depth(self) -> None:
+        self._write("chapter1.md", "# Getting started\n\n## Install\n")
+        self._write("sub/chapter2.md", "Untitled\n\n## Tuning\n\n### More\n")
+        before = '<!-- toc src="*/chapter*.md" depth=3 --><!-- tocstop -->\n'
+        after = (
+            '<!-- toc src="*/chapter*.md" depth=3 -->\n\n'
+            "-   [sub/chapter2.md](sub/chapter2.md)\n"
+            "    -   [Tuning](sub/chapter2.md#tuning)\n"
+            "        -   [More](sub/chapter2.md#more)\n"
+            "\n"
+            "<!-- tocstop -->\n"
+        )
+        self.assert_exit_code(before, after)
+
+    def test_src_toc_empty(self) -> None:
+        before = '<!-- toc src="missing*.md" --><!-- tocstop -->\n'
+        after = '<!-- toc src="missing*.md" -->\n\n<!-- tocstop -->\n'
+        self.assert_exit_code(before, after)
+
+    def test_src_toc_bad_header_level(self) -> None:
+        self._write("chapter1.md", "### Too deep\n")
+        contents = '<!-- toc src="chapter*.md" --><!-- tocstop -->\n'
+        self.assert_exit_code(contents, contents, exit_code=1)
+
+    def test_src_toc_with_toc(self) -> None:
+        self._write("chapter1.md", "# Getting started\n")
+        before = (
+            "# Book\n\n<!-- toc --><!-- tocstop -->\n\n"
+            "## Chapters\n\n"
+            '<!-- toc src="chapter*.md" --><!-- tocstop -->\n'
+        )
+        after = (
+            "# Book\n\n<!-- toc -->\n\n## Table of contents\n\n"
+            "-   [Chapters](#chapters)\n\n<!-- tocstop -->\n\n"
+            "## Chapters\n\n"
+            '<!-- toc src="chapter*.md" -->\n\n'
+            "-   [Getting started](chapter1.md)\n\n"
+            "<!-- tocstop -->\n"
+        )
+        self.assert_exit_code(before, after)
+
+    def test_shared_header_cache(self) -> None:
+        self._write("chapter1.md", "# Getting started\n")
+        first = self._write(
+            "a.md", '<!-- toc src="chapter*.md" --><!-- tocstop -->\n'
+        )
+        second = self._write(
+            "b.md", '<!-- toc src="chapter*.md" --><!-- tocstop -->\n'
+        )
+        with mock.patch(
+            "pre_commit_hooks.markdown_links.get_links",
+            wraps=markdown_links.get_links,
+        ) as get_links:
+            self.assertEqual(markdown_toc.main(["bin", first, second]), 0)
+        # The chapter is parsed once, although both index pages list it.
+        self.assertEqual(get_links.call_count, 1)
+        with open(second) as f:
+            self.assertIn("[Getting started](chapter1.md)", f.read())
+
+    def test_header_cache_refresh(self) -> None:
+        path = self._write("chapter.md", "# Chapter\n")
+        header_cache = markdown_toc.HeaderCache()
+        self.assertEqual(header_cache.get(path)[0].label, "Chapter")
+        self._write("chapter.md", "# Renamed chapter\n")
+        # Headers are cached until a refresh.
+        self.assertEqual(header_cache.get(path)[0].label, "Chapter")
+        header_cache.refresh()
+        self.assertEqual(header_cache.get(path)[0].label, "Renamed chapter")
+
+    def test_src_toc_in_code_block(self) -> None:
+        self._write("chapter1.md", "# Getting started\n")
+        contents = (
+            "# Book\n\n"
+            "````md\n"
+            '<!-- toc src="chapter*.md" -->\n'
+            "```\n"
+            "<!-- tocstop -->\n"
+            "````\n"
+        )
+        self.assert_exit_code(contents, contents)
+
+    def test_src_toc_in_inline_code(self) -> None:
+        self._write("chapter1.md", "# Getting started\n")
+        contents = (
+            "# Book\n\n"
+            'Use `<!-- toc src="chapter*.md" -->` to list chapters.\n\n'
+            "## Details\n\n"
+            "End with `<!-- tocstop -->`.\n"
+        )
+        self.assert_exit_code(contents, contents)
@@ -0,0 +1,320 @@
+"""Profiles memory allocated while checking files, for --profile-memory.
+
+Each file's peak allocation is measured with tracemalloc, and files whose
+peak is far above the median for their size are flagged. Allocations are
+grouped by the hook phase that made them, found from each allocation's
+traceback: those at each phase's largest checkpoint, such as parser node
+trees, and those still held after each check, such as cached parses.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import dis
+import gc
+import statistics
+import tracemalloc
+import types
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+from pre_commit_hooks import tracing
+from pre_commit_hooks import vfs
+
+# Frames kept per allocation, enough to reach a phase function from inside
+# the markdown parser.
+_FRAMES = 32
+
+# Files are flagged when their peak per byte is this many times the median.
+_OUTLIER_FACTOR = 4.0
+
+# Files smaller than this are never flagged, since fixed costs dominate.
+_MIN_OUTLIER_SIZE = 1024
+
+# Checkpoints are only snapshotted when they have this many times the most
+# allocated at earlier snapshots of the same checkpoint, bounding snapshots.
+_CHECKPOINT_GROWTH = 1.1
+
+# How many files and allocation sites to list.
+_TOP_FILES = 10
+_TOP_SITES = 5
+
+# The phase for allocations outside any traced function.
+_OTHER_PHASE = "other"
+
+# Allocations made here or by tracemalloc are profiling's, and those made by
+# imports are modules', rather than the checks'.
+_OWN_FILES = (tracemalloc.__file__, __file__)
+_IMPORT_PREFIX = "<frozen importlib._bootstrap"
+
+# Sizes and counts of allocations by phase and site.
+_Sites = Dict[str, Dict[str, List[int]]]
+
+
+class FileMemory(NamedTuple):
+    path: str
+    size: int
+    # The most allocated at once while checking the file.
+    peak: int
+    # Allocations made while checking the file that are still held after.
+    retained: int
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return "%.1f %s" % (size, unit)
+        size /= 1024
+    return "%.1f GiB" % size
+
+
+def _phase_lines() -> Dict[str, List[Tuple[int, int, str]]]:
+    """Returns line ranges of phase functions by filename."""
+    ranges: Dict[str, List[Tuple[int, int, str]]] = {}
+    for name, code in tracing.phase_code:
+        lines = [line for _, line in dis.findlinestarts(code) if line]
+        ranges.setdefault(code.co_filename, []).append(
+            (code.co_firstlineno, max(lines, default=0), name)
+        )
+    return ranges
+
+
+def _total(by_site: Dict[str, List[int]]) -> int:
+    return sum(size for size, _ in by_site.values())
+
+
+def _sorted_sites(sites: _Sites) -> Dict[str, List[Tuple[str, int, int]]]:
+    """Returns each phase's sites as (site, size, count), largest first."""
+    return {
+        phase: sorted(
+            ((site, size, count) for site, (size, count) in by_site.items()),
+            key=lambda x: -x[1],
+        )
+        for phase, by_site in sites.items()
+    }
+
+
+def _print_sites(out: TextIO, title: str, sites: _Sites) -> None:
+    print(title, file=out)
+    for phase, by_site in sorted(
+        _sorted_sites(sites).items(),
+        key=lambda x: -sum(size for _, size, _ in x[1]),
+    ):
+        total = sum(size for _, size, _ in by_site)
+        print("  %s: %s" % (phase, _format_bytes(total)), file=out)
+        for site, size, count in by_site[:_TOP_SITES]:
+            print(
+                "    %s: %s in %d blocks" % (site, _format_bytes(size), count),
+                file=out,
+            )
+
+
+class MemoryProfiler(object):
+    """Measures memory for each checked file while tracemalloc is tracing.
+
+    Traces are cleared before each check, so that snapshots only hold the
+    check's own allocations, and are cheap enough to take for every check.
+    """
+
+    def __init__(self) -> None:
+        self.files: List[FileMemory] = []
+        # Allocations still held after each check, and those at the largest
+        # checkpoint of each phase.
+        self._retained: _Sites = {}
+        self._peaks: _Sites = {}
+        # The most allocated at snapshots of each checkpoint, by its code.
+        self._checkpoints: Dict[types.CodeType, int] = {}
+        # The check's peak before snapshots, which allocate themselves.
+        self._peak = 0
+        self._phase_lines: Optional[Dict[str, List[Tuple[int, int, str]]]] = (
+            None
+        )
+        # The markdown parser is imported when first needed, which would
+        # otherwise count against the first file parsed.
+        import commonmark  # noqa: F401
+
+        tracemalloc.start(_FRAMES)
+        tracing.set_checkpoint_hook(self._checkpoint)
+
+    def _sites(self, snapshot: tracemalloc.Snapshot) -> _Sites:
+        """Groups a snapshot's allocations by phase and site.
+
+        Each allocation's phase is the innermost phase function in its
+        traceback.
+        """
+        if self._phase_lines is None:
+            self._phase_lines = _phase_lines()
+        sites: _Sites = {}
+        # Allocations with the same traceback are grouped first, which is
+        # far quicker than attributing or filtering each allocation.
+        for stat in snapshot.statistics("traceback"):
+            frames = list(stat.traceback)
+            if frames[-1].filename in _OWN_FILES or any(
+                frame.filename.startswith(_IMPORT_PREFIX) for frame in frames
+            ):
+                continue
+            phase = _OTHER_PHASE
+            # Frames are oldest first.
+            for frame in reversed(frames):
+                for first, last, name in self._phase_lines.get(
+                    frame.filename, ()
+                ):
+                    if first <= frame.lineno <= last:
+                        phase = name
+                        break
+                else:
+                    continue
+                break
+            top = frames[-1]
+            totals = sites.setdefault(phase, {}).setdefault(
+                "%s:%d" % (top.filename, top.lineno), [0, 0]
+            )
+            totals[0] += stat.size
+            totals[1] += stat.count
+        return sites
+
+    def _checkpoint(self, code: types.CodeType) -> None:
+        """Snapshots allocations if a checkpoint has more than before."""
+        current, peak = tracemalloc.get_traced_memory()
+        if current <= self._checkpoints.get(code, 0) * _CHECKPOINT_GROWTH:
+            return
+        self._checkpoints[code] = current
+        self._peak = max(self._peak, peak)
+        for phase, by_site in self._sites(tracemalloc.take_snapshot()).items():
+            if _total(by_site) > _total(self._peaks.get(phase, {})):
+                self._peaks[phase] = by_site
+        # The snapshot has been freed, and its memory isn't the check's.
+        tracemalloc.reset_peak()
+
+    def check(
+        self, check: Callable[[Any, str], bool], state: Any, path: str
+    ) -> bool:
+        """Runs check, measuring its allocations."""
+        tracemalloc.clear_traces()
+        self._peak = 0
+        try:
+            return check(state, path)
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            # Parser node trees have reference cycles, and aren't retained
+            # just because the cycle collector hasn't run yet.
+            gc.collect()
+            after, _ = tracemalloc.get_traced_memory()
+            st = vfs.current().stat(path)
+            self.files.append(
+                FileMemory(
+                    path, st.size if st else 0, max(self._peak, peak), after
+                )
+            )
+            for phase, by_site in self._sites(
+                tracemalloc.take_snapshot()
+            ).items():
+                totals = self._retained.setdefault(phase, {})
+                for site, (size, count) in by_site.items():
+                    site_totals = totals.setdefault(site, [0, 0])
+                    site_totals[0] += size
+                    site_totals[1] += count
+
+    def outliers(self) -> Tuple[float, List[FileMemory]]:
+        """Returns the median peak per byte, and files far above it."""
+        sized = [f for f in self.files if f.size >= _MIN_OUTLIER_SIZE]
+        if not sized:
+            return 0.0, []
+        median = statistics.median(f.peak / f.size for f in sized)
+        outliers = [
+            f for f in sized if f.peak / f.size > median * _OUTLIER_FACTOR
+        ]
+        outliers.sort(key=lambda f: f.peak / f.size, reverse=True)
+        return median, outliers
+
+    def retained_by_phase(self) -> Dict[str, List[Tuple[str, int, int]]]:
+        """Returns allocations still held after each check, summed.
+
+        The allocation sites of each phase are returned as (site, size,
+        count), largest first.
+        """
+        return _sorted_sites(self._retained)
+
+    def peak_by_phase(self) -> Dict[str, List[Tuple[str, int, int]]]:
+        """Returns allocations at each phase's largest checkpoint.
+
+        The allocation sites of each phase are returned as (site, size,
+        count), largest first.
+        """
+        return _sorted_sites(self._peaks)
+
+    def report(self, out: TextIO) -> None:
+        """Prints a summary of the profile."""
+        if not self.files:
+            return
+        peaks = sorted(f.peak for f in self.files)
+        largest = max(self.files, key=lambda f: f.peak)
+        print(
+            "Memory profile of %d files: median peak %s, largest peak %s in "
+            "%s"
+            % (
+                len(self.files),
+                _format_bytes(statistics.median(peaks)),
+                _format_bytes(largest.peak),
+                largest.path,
+            ),
+            file=out,
+        )
+        median, outliers = self.outliers()
+        if outliers:
+            print(
+                "Files with peaks over %gx the median of %.1f bytes per byte "
+                "of contents:" % (_OUTLIER_FACTOR, median),
+                file=out,
+            )
+            for f in outliers[:_TOP_FILES]:
+                print(
+                    "  %s: %s peak for %s (%.1f per byte)"
+                    % (
+                        f.path,
+                        _format_bytes(f.peak),
+                        _format_bytes(f.size),
+                        f.peak / f.size,
+                    ),
+                    file=out,
+                )
+        retained = sorted(self.files, key=lambda f: -f.retained)
+        print("Files retaining the most memory after checks:", file=out)
+        for f in retained[:_TOP_FILES]:
+            print("  %s: %s" % (f.path, _format_bytes(f.retained)), file=out)
+        if self._peaks:
+            _print_sites(
+                out,
+                "Memory allocated at each phase's peak, by phase and site:",
+                self._peaks,
+            )
+        _print_sites(
+            out,
+            "Memory still allocated after checks, by phase and site:",
+            self._retained,
+        )
+
+    def close(self) -> None:
+        tracing.set_checkpoint_hook(None)
+        tracemalloc.stop()
@@ -0,0 +1,127 @@
+"""Tests for memory_profile.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import importlib
+import io
+import os
+import sys
+import tempfile
+from typing import List
+import unittest
+
+from pre_commit_hooks import memory_profile
+from pre_commit_hooks import tracing
+from pre_commit_hooks import vfs
+
+
+@tracing.traced("test phase")
+def _parse(contents: str, scale: int) -> List[bytearray]:
+    # Temporary allocations, which are only seen at the checkpoint.
+    nodes = [bytearray(len(contents)) for _ in range(scale * 10)]
+    tracing.checkpoint()
+    del nodes
+    return [bytearray(len(contents)) for _ in range(scale)]
+
+
+@unittest.skipIf(sys.version_info < (3, 9), "needs tracemalloc.reset_peak()")
+class TestMemoryProfile(unittest.TestCase):
+    def setUp(self) -> None:
+        files = {"%d.md" % i: "x" * 2000 for i in range(10)}
+        files["small.md"] = "x" * 10
+        use_fs = vfs.use(vfs.MemoryFileSystem(files))
+        use_fs.__enter__()
+        self.addCleanup(use_fs.__exit__, None, None, None)
+        self._profiler = memory_profile.MemoryProfiler()
+        self.addCleanup(self._profiler.close)
+        self._kept: List[List[bytearray]] = []
+
+    def _check(self, state: None, path: str) -> bool:
+        scale = 20 if path == "9.md" else 2
+        contents = vfs.current().read(path)
+        self._kept.append(_parse(contents, scale))
+        return False
+
+    def _check_all(self) -> None:
+        for path in ["%d.md" % i for i in range(10)] + ["small.md"]:
+            self._profiler.check(self._check, None, path)
+
+    def test_files(self) -> None:
+        self._check_all()
+        files = {f.path: f for f in self._profiler.files}
+        self.assertEqual(files["0.md"].size, 2000)
+        self.assertGreaterEqual(files["0.md"].peak, 2 * 2000)
+        self.assertGreaterEqual(files["9.md"].retained, 20 * 2000)
+        median, outliers = self._profiler.outliers()
+        self.assertGreaterEqual(median, 2)
+        # Small files aren't flagged, since fixed costs dominate.
+        self.assertEqual([f.path for f in outliers], ["9.md"])
+
+    def test_retained_by_phase(self) -> None:
+        self._check_all()
+        by_phase = self._profiler.retained_by_phase()
+        self.assertIn("test phase", by_phase)
+        sites = by_phase["test phase"]
+        self.assertIn(__file__, sites[0][0])
+        self.assertGreaterEqual(
+            sum(size for _, size, _ in sites), (9 * 2 + 20) * 2000
+        )
+
+    def test_peak_by_phase(self) -> None:
+        self._check_all()
+        by_phase = self._profiler.peak_by_phase()
+        sites = by_phase["test phase"]
+        self.assertIn(__file__, sites[0][0])
+        # The largest checkpoint was for 9.md.
+        self.assertGreaterEqual(sites[0][1], 20 * 10 * 2000)
+        files = {f.path: f for f in self._profiler.files}
+        self.assertGreaterEqual(files["9.md"].peak, 20 * 10 * 2000)
+        retained = sum(
+            size
+            for _, size, _ in self._profiler.retained_by_phase()["test phase"]
+        )
+        self.assertLess(retained, 20 * 10 * 2000)
+
+    def test_imports(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "_profiled.py"), "w") as f:
+                f.write("DATA = [bytearray(1000) for _ in range(100)]\n")
+            sys.path.insert(0, temp_dir)
+            self.addCleanup(sys.path.remove, temp_dir)
+            self.addCleanup(sys.modules.pop, "_profiled", None)
+
+            def check(state: None, path: str) -> bool:
+                importlib.import_module("_profiled")
+                return False
+
+            self._profiler.check(check, None, "0.md")
+        # Modules' allocations aren't attributed to checks.
+        for sites in self._profiler.retained_by_phase().values():
+            for site, _, _ in sites:
+                self.assertNotIn("_profiled", site)
+
+    def test_report(self) -> None:
+        out = io.StringIO()
+        self._profiler.report(out)
+        self.assertEqual(out.getvalue(), "")
+        self._check_all()
+        self._profiler.report(out)
+        report = out.getvalue()
+        self.assertIn("Memory profile of 11 files", report)
+        self.assertIn("  9.md: ", report)
+        self.assertIn("  test phase: ", report)
+        self.assertIn("at each phase's peak", report)
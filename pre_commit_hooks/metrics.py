@@ -0,0 +1,225 @@
+"""Aggregate counters for --metrics-out, written as JSON or Prometheus text.
+
+Counters are only kept once started, so counting costs a global check when
+metrics are off. Wall and CPU time per phase come from tracing spans.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+# Bumped when metrics are renamed or change meaning; adding metrics doesn't
+# change the version.
+SCHEMA_VERSION = 1
+
+# Counters, with descriptions for Prometheus. Every counter is written, even
+# if zero, so that the schema doesn't depend on which files were checked.
+COUNTERS = {
+    "files_seen": "Paths given to the hook.",
+    "files_skipped": "Paths skipped by extension or skip pattern.",
+    "bytes_read": "Bytes of files read.",
+    "parses": "Markdown parses.",
+    "blocks_parsed": "Markdown blocks parsed, after reusing unchanged blocks.",
+    "link_cache_hits": "Link cache lookups which reused a parse.",
+    "link_cache_misses": "Link cache lookups which needed a parse.",
+    "stat_calls": "File and directory stats.",
+    "rewrites": "Files written with fixes.",
+    "style_code_bytes_skipped": "Bytes of code skipped by style checks.",
+}
+
+# The prefix for Prometheus metric names.
+_PROMETHEUS_PREFIX = "pre_commit_tool_hooks_"
+
+# Counts by name, or None when metrics are off.
+_counters: Optional[Dict[str, int]] = None
+
+# Guards updates to counts, which worker threads make concurrently.
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return _counters is not None
+
+
+def start() -> None:
+    global _counters
+    _counters = {}
+
+
+def stop() -> Dict[str, int]:
+    """Stops counting, returning counts since the last take."""
+    global _counters
+    counters = _counters or {}
+    _counters = None
+    return counters
+
+
+def take() -> Dict[str, int]:
+    """Returns and clears counts so far, such as for a worker."""
+    global _counters
+    if _counters is None:
+        return {}
+    counters = _counters
+    _counters = {}
+    return counters
+
+
+def add(counters: Dict[str, int]) -> None:
+    """Adds counts made elsewhere, such as by workers."""
+    totals = _counters
+    if totals is None:
+        return
+    with _lock:
+        for name, value in counters.items():
+            totals[name] = totals.get(name, 0) + value
+
+
+def count(name: str, value: int = 1) -> None:
+    """Adds to a counter, if metrics are on."""
+    counters = _counters
+    if counters is None:
+        return
+    with _lock:
+        counters[name] = counters.get(name, 0) + value
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Returns the peak RSS of this process or any waited-for child.
+
+    Returns None on platforms without the resource module.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # macOS reports bytes, and Linux KiB.
+    if sys.platform == "darwin":
+        return peak
+    return peak * 1024
+
+
+def report(
+    hook: str,
+    counters: Dict[str, int],
+    phases: Dict[str, List[float]],
+    wall_seconds: float,
+    cpu_seconds: float,
+) -> Dict[str, Any]:
+    """Returns metrics for a run, in the schema written as JSON.
+
+    phases has the count, wall seconds, and CPU seconds of each phase.
+    """
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "hook": hook,
+        "counters": {name: counters.get(name, 0) for name in COUNTERS},
+        "phases": {
+            name: {
+                "count": int(count),
+                "wall_seconds": wall,
+                "cpu_seconds": cpu,
+            }
+            for name, (count, wall, cpu) in sorted(phases.items())
+        },
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": cpu_seconds,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prometheus(metrics: Dict[str, Any]) -> str:
+    """Formats metrics for the node exporter's textfile collector.
+
+    Values are from a single run, so they're gauges rather than counters.
+    """
+    hook_label = 'hook="%s"' % _escape_label(metrics["hook"])
+    lines = []
+
+    def add_metric(
+        name: str, description: str, samples: List[Any], labels: List[str]
+    ) -> None:
+        full_name = _PROMETHEUS_PREFIX + name
+        lines.append("# HELP %s %s" % (full_name, description))
+        lines.append("# TYPE %s gauge" % full_name)
+        for value, label in zip(samples, labels):
+            lines.append("%s{%s} %s" % (full_name, label, value))
+
+    for name, description in COUNTERS.items():
+        add_metric(name, description, [metrics["counters"][name]], [hook_label])
+    phase_labels = [
+        '%s,phase="%s"' % (hook_label, _escape_label(phase))
+        for phase in metrics["phases"]
+    ]
+    for field, description in (
+        ("count", "Spans of each phase."),
+        ("wall_seconds", "Wall time in each phase, including nested phases."),
+        ("cpu_seconds", "CPU time in each phase, including nested phases."),
+    ):
+        add_metric(
+            "phase_" + field,
+            description,
+            [phase[field] for phase in metrics["phases"].values()],
+            phase_labels,
+        )
+    add_metric(
+        "wall_seconds",
+        "Wall time of the run.",
+        [metrics["wall_seconds"]],
+        [hook_label],
+    )
+    add_metric(
+        "cpu_seconds",
+        "CPU time of the run, including worker processes.",
+        [metrics["cpu_seconds"]],
+        [hook_label],
+    )
+    if metrics["peak_rss_bytes"] is not None:
+        add_metric(
+            "peak_rss_bytes",
+            "Peak RSS of the main or any worker process.",
+            [metrics["peak_rss_bytes"]],
+            [hook_label],
+        )
+    return "\n".join(lines) + "\n"
+
+
+def write(path: str, metrics: Dict[str, Any]) -> None:
+    """Writes metrics as Prometheus text for `.prom` paths, otherwise JSON.
+
+    The file is replaced atomically, so that collectors never read a partial
+    file.
+    """
+    if path.endswith(".prom"):
+        contents = _prometheus(metrics)
+    else:
+        contents = json.dumps(metrics, indent=2) + "\n"
+    temp_path = "%s.%d.tmp" % (path, os.getpid())
+    with open(temp_path, "w") as f:
+        f.write(contents)
+    os.replace(temp_path, path)
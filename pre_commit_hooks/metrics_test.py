@@ -0,0 +1,91 @@
+"""Tests for metrics.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from pre_commit_hooks import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.addCleanup(metrics.stop)
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+
+    def test_off(self) -> None:
+        self.assertFalse(metrics.enabled())
+        metrics.count("parses")
+        self.assertEqual(metrics.take(), {})
+
+    def test_count(self) -> None:
+        metrics.start()
+        metrics.count("parses")
+        metrics.count("bytes_read", 10)
+        worker_counters = metrics.take()
+        self.assertEqual(worker_counters, {"parses": 1, "bytes_read": 10})
+        metrics.count("parses")
+        metrics.add(worker_counters)
+        self.assertEqual(metrics.stop(), {"parses": 2, "bytes_read": 10})
+
+    def test_report(self) -> None:
+        report = metrics.report(
+            "check-links", {"parses": 3}, {"parse": [3, 0.5, 0.25]}, 1.0, 0.5
+        )
+        # Every counter is present, so the schema is stable.
+        self.assertEqual(list(report["counters"]), list(metrics.COUNTERS))
+        self.assertEqual(report["counters"]["parses"], 3)
+        self.assertEqual(report["counters"]["rewrites"], 0)
+        self.assertEqual(
+            report["phases"],
+            {"parse": {"count": 3, "wall_seconds": 0.5, "cpu_seconds": 0.25}},
+        )
+        self.assertEqual(report["schema_version"], metrics.SCHEMA_VERSION)
+
+    def test_write(self) -> None:
+        report = metrics.report(
+            "check-links", {"parses": 3}, {"parse": [3, 0.5, 0.25]}, 1.0, 0.5
+        )
+        json_path = os.path.join(self._temp_dir.name, "metrics.json")
+        metrics.write(json_path, report)
+        with open(json_path) as f:
+            self.assertEqual(json.load(f), report)
+
+        prom_path = os.path.join(self._temp_dir.name, "metrics.prom")
+        metrics.write(prom_path, report)
+        with open(prom_path) as f:
+            lines = f.read().splitlines()
+        self.assertIn(
+            "# TYPE pre_commit_tool_hooks_parses gauge",
+            lines,
+        )
+        self.assertIn(
+            'pre_commit_tool_hooks_parses{hook="check-links"} 3', lines
+        )
+        self.assertIn(
+            "pre_commit_tool_hooks_phase_wall_seconds"
+            '{hook="check-links",phase="parse"} 0.5',
+            lines,
+        )
+        # Only the written files remain.
+        self.assertEqual(
+            sorted(os.listdir(self._temp_dir.name)),
+            ["metrics.json", "metrics.prom"],
+        )
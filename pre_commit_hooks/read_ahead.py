@@ -0,0 +1,163 @@
+"""Prefetches upcoming files while earlier ones are checked.
+
+Hooks read each file when they check it, so on network filesystems or with a
+cold page cache, checks would otherwise wait on I/O. Prefetching reads files
+into the page cache on background threads, so hooks' own reads are served from
+memory, without changing how hooks read files.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import collections
+import os
+import queue
+import threading
+from typing import Deque, Iterable, Iterator, List, Optional
+
+# The number of prefetching threads. Reads mostly wait on I/O, so a few
+# threads overlap latency without contending for the GIL.
+_THREADS = 4
+
+# How many files to prefetch ahead of the file being checked.
+_MAX_FILES = 32
+
+# The most bytes of prefetched files not yet checked, so that prefetched files
+# aren't evicted from the page cache before they're checked.
+_MAX_BYTES = 32 * 1024 * 1024
+
+# The size of reads when prefetching; the data read is discarded.
+_READ_SIZE = 256 * 1024
+
+
+class _Entry(object):
+    """A path to prefetch, and the bytes reserved for it."""
+
+    __slots__ = ("path", "reserved", "checked")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.reserved = 0
+        self.checked = False
+
+
+class _Prefetcher(object):
+    """Reads files on background threads, within a budget of bytes."""
+
+    def __init__(self, threads: int, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._reserved = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._queue: "queue.SimpleQueue[Optional[_Entry]]" = queue.SimpleQueue()
+        self._threads: List[threading.Thread] = []
+        for _ in range(threads):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def add(self, entry: _Entry) -> None:
+        self._queue.put(entry)
+
+    def done(self, entry: _Entry) -> None:
+        """Releases an entry's reservation once it's been checked."""
+        with self._condition:
+            entry.checked = True
+            self._reserved -= entry.reserved
+            entry.reserved = 0
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _reserve(self, entry: _Entry, size: int) -> bool:
+        """Waits for budget to prefetch a file, returning false to skip it."""
+        size = min(size, self._max_bytes)
+        with self._condition:
+            while (
+                self._reserved
+                and self._reserved + size > self._max_bytes
+                and not entry.checked
+                and not self._closed
+            ):
+                self._condition.wait()
+            if entry.checked or self._closed:
+                return False
+            self._reserved += size
+            entry.reserved = size
+            return True
+
+    def _work(self) -> None:
+        buf = bytearray(_READ_SIZE)
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            if entry.checked or self._closed:
+                continue
+            try:
+                with open(entry.path, "rb", buffering=0) as f:
+                    if not self._reserve(entry, os.fstat(f.fileno()).st_size):
+                        continue
+                    if hasattr(os, "posix_fadvise"):
+                        # Reads the whole file in the kernel, which is cheaper
+                        # than reading it here.
+                        os.posix_fadvise(
+                            f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED
+                        )
+                        continue
+                    while f.readinto(buf) and not entry.checked:
+                        pass
+            except OSError:
+                # Errors are left to the check.
+                pass
+
+
+def read_ahead(
+    paths: Iterable[str],
+    threads: int = _THREADS,
+    max_files: int = _MAX_FILES,
+    max_bytes: int = _MAX_BYTES,
+) -> Iterator[str]:
+    """Yields paths, prefetching those after the one just yielded.
+
+    Each path is assumed to be checked before the next is requested.
+    """
+    path_iter = iter(paths)
+    pending: Deque[_Entry] = collections.deque()
+    prefetcher = _Prefetcher(threads, max_bytes)
+    try:
+        while True:
+            while len(pending) < max_files:
+                path = next(path_iter, None)
+                if path is None:
+                    break
+                entry = _Entry(path)
+                pending.append(entry)
+                prefetcher.add(entry)
+            if not pending:
+                return
+            entry = pending.popleft()
+            yield entry.path
+            prefetcher.done(entry)
+    finally:
+        prefetcher.close()
@@ -0,0 +1,86 @@
+"""Tests for read_ahead.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from pre_commit_hooks import read_ahead
+
+
+class TestReadAhead(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+
+    def _write(self, filename: str, size: int) -> str:
+        path = os.path.join(self._temp_dir.name, filename)
+        with open(path, "w") as f:
+            f.write("x" * size)
+        return path
+
+    def test_order(self) -> None:
+        paths = [self._write(f"{i:02d}.md", i * 1000) for i in range(50)]
+        # Missing files are left to the check.
+        paths.insert(10, os.path.join(self._temp_dir.name, "missing.md"))
+        self.assertEqual(
+            list(read_ahead.read_ahead(paths, max_files=8, max_bytes=4096)),
+            paths,
+        )
+
+    def test_close_early(self) -> None:
+        paths = [self._write(f"{i}.md", 1) for i in range(10)]
+        thread_count = threading.active_count()
+        prefetched = read_ahead.read_ahead(paths)
+        self.assertEqual(next(prefetched), paths[0])
+        prefetched.close()  # type: ignore[attr-defined]
+        self.assertEqual(threading.active_count(), thread_count)
+
+    def test_budget(self) -> None:
+        prefetcher = read_ahead._Prefetcher(threads=0, max_bytes=10)
+        self.addCleanup(prefetcher.close)
+        first = read_ahead._Entry("first")
+        second = read_ahead._Entry("second")
+        self.assertTrue(prefetcher._reserve(first, 6))
+        # The second file waits until the first is checked.
+        reserved = []
+        thread = threading.Thread(
+            target=lambda: reserved.append(prefetcher._reserve(second, 6))
+        )
+        thread.start()
+        thread.join(0.05)
+        self.assertEqual(reserved, [])
+        prefetcher.done(first)
+        thread.join()
+        self.assertEqual(reserved, [True])
+        self.assertEqual(prefetcher._reserved, 6)
+
+    def test_oversized(self) -> None:
+        prefetcher = read_ahead._Prefetcher(threads=0, max_bytes=10)
+        self.addCleanup(prefetcher.close)
+        # Files larger than the budget are prefetched alone.
+        self.assertTrue(prefetcher._reserve(read_ahead._Entry("a"), 100))
+        self.assertEqual(prefetcher._reserved, 10)
+
+    def test_checked(self) -> None:
+        prefetcher = read_ahead._Prefetcher(threads=0, max_bytes=10)
+        self.addCleanup(prefetcher.close)
+        entry = read_ahead._Entry("a")
+        prefetcher.done(entry)
+        self.assertFalse(prefetcher._reserve(entry, 1))
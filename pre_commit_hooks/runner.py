@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+
+"""Runs multiple hooks over files, reading and parsing each file once."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import functools
+from pathlib import Path
+import sys
+from typing import List, Optional, Tuple
+
+from pre_commit_hooks import check_copyright
+from pre_commit_hooks import check_google_doc_style
+from pre_commit_hooks import check_links
+from pre_commit_hooks import daemon
+from pre_commit_hooks import executor
+from pre_commit_hooks import findings
+from pre_commit_hooks import markdown_links
+from pre_commit_hooks import markdown_toc
+from pre_commit_hooks import metrics
+from pre_commit_hooks import vfs
+
+# Hooks in the order they're applied. Rewriting hooks come first, so that
+# checks see the final contents.
+HOOKS = (
+    "check-google-doc-style",
+    "markdown-toc",
+    "check-copyright",
+    "check-links",
+)
+
+
+def _parse_hooks(arg: str) -> List[str]:
+    """Splits a comma-separated --hooks argument."""
+    hooks = [hook.strip() for hook in arg.split(",") if hook.strip()]
+    for hook in hooks:
+        if hook not in HOOKS:
+            raise argparse.ArgumentTypeError(
+                "Unknown hook `%s`; expected one of: %s"
+                % (hook, ", ".join(HOOKS))
+            )
+    return hooks
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses command-line arguments and flags."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser(
+        "run",
+        description="Runs the given hooks over each file in one pass. Hook "
+        "flags, such as --copyright or --anchors-only, are accepted as for "
+        "the individual hooks.",
+    )
+    run_parser.add_argument(
+        "--hooks",
+        metavar="HOOK[,HOOK...]",
+        type=_parse_hooks,
+        default=list(HOOKS),
+        help="A comma-separated list of hooks to run. Defaults to all of: %s."
+        % ", ".join(HOOKS),
+    )
+    check_copyright.add_options(run_parser)
+    check_links.add_options(run_parser)
+    executor.add_arguments(run_parser)
+    run_parser.add_argument(
+        "paths",
+        metavar="PATH",
+        nargs="*",
+        help="Paths of files to check.",
+    )
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        description="Manages a daemon for the current repository, which "
+        "hooks forward to in order to avoid startup costs.",
+    )
+    daemon_parser.add_argument(
+        "action",
+        choices=("start", "stop", "status", "serve"),
+        help="`serve` runs the daemon in the foreground.",
+    )
+    daemon_parser.add_argument(
+        "--idle-timeout",
+        metavar="SECS",
+        type=float,
+        default=daemon.DEFAULT_IDLE_TIMEOUT_SECS,
+        help="Exits after this long without requests. Defaults to %d."
+        % daemon.DEFAULT_IDLE_TIMEOUT_SECS,
+    )
+    parsed_args = parser.parse_args(args=argv)
+    if parsed_args.command == "run":
+        executor.require_paths(run_parser, parsed_args)
+    return parsed_args
+
+
+def _print_error(path: str, error: findings.Finding) -> None:
+    """Prints an error as its hook would alone."""
+    if error.hook == "check-google-doc-style":
+        check_google_doc_style.print_finding(path, error)
+    elif error.hook == "markdown-toc":
+        markdown_toc.print_finding(path, error)
+    elif error.hook == "check-copyright":
+        check_copyright.print_finding(path, error)
+    else:
+        check_links.print_error(path, error)
+
+
+class Runner(object):
+    """Applies the selected hooks to each file's in-memory contents."""
+
+    def __init__(
+        self,
+        parsed_args: argparse.Namespace,
+        repo_root: Optional[Path] = None,
+    ) -> None:
+        hooks = set(parsed_args.hooks)
+
+        self._replacers: Optional[List[Tuple[str, str]]] = None
+        if "check-google-doc-style" in hooks:
+            self._replacers = list(check_google_doc_style.build_replacers())
+
+        self._header_cache: Optional[markdown_toc.HeaderCache] = None
+        if "markdown-toc" in hooks:
+            self._header_cache = markdown_toc.HeaderCache()
+
+        self._copyright_validator: Optional[
+            check_copyright.CopyrightValidator
+        ] = None
+        if "check-copyright" in hooks:
+            self._copyright_validator = check_copyright.CopyrightValidator(
+                parsed_args.copyright,
+                parsed_args.skip_pattern,
+                parsed_args.custom_formats,
+            )
+
+        self._link_checker: Optional[check_links.LinkChecker] = None
+        if "check-links" in hooks:
+            self._link_checker = check_links.LinkChecker(parsed_args, repo_root)
+
+    def wants(self, path: str) -> bool:
+        """Returns true if any hook applies to a file."""
+        return path.endswith(".md") or bool(
+            self._copyright_validator
+            and self._copyright_validator.applies(path)
+        )
+
+    def check(
+        self, path: str, contents: str, write: bool = True
+    ) -> Tuple[str, List[findings.Finding]]:
+        """Runs hooks on a file's contents, returning fixed contents and errors.
+
+        Fixes are written to the file if write is true. Nothing is printed.
+        """
+        is_markdown = path.endswith(".md")
+        wants_copyright = bool(
+            self._copyright_validator
+            and self._copyright_validator.applies(path)
+        )
+
+        errors: List[findings.Finding] = []
+        new_contents = contents
+        parsed: Optional[
+            Tuple[List[markdown_links.Header], List[markdown_links.Link]]
+        ] = None
+        # Unparseable files still get style fixes, but skip other markdown
+        # hooks.
+        parse_failed = False
+        if is_markdown:
+            if self._replacers is not None:
+                new_contents, error = check_google_doc_style.fix_style(
+                    self._replacers, new_contents
+                )
+                if error:
+                    errors.append(error)
+
+            # Parse once, sharing results between the TOC and link checks.
+            needs_toc = bool(self._header_cache) and (
+                "<!-- toc -->" in new_contents
+            )
+            if self._link_checker or needs_toc:
+                try:
+                    parsed = markdown_links.get_links(new_contents)
+                except ValueError as e:
+                    # Reported by the first hook that needed the parse.
+                    hook = "markdown-toc" if needs_toc else "check-links"
+                    errors.append(findings.Finding(hook, None, str(e)))
+                    parse_failed = True
+
+            if self._header_cache and not parse_failed:
+                toc_contents, error = markdown_toc.fix_toc(
+                    path,
+                    new_contents,
+                    self._header_cache,
+                    parsed[0] if parsed else None,
+                )
+                if error:
+                    errors.append(error)
+                elif toc_contents != new_contents:
+                    # The TOC adds headers and links, so it must be reparsed.
+                    new_contents = toc_contents
+                    parsed = None
+
+        if write and new_contents != contents:
+            vfs.current().write(path, new_contents)
+            if self._header_cache:
+                self._header_cache.invalidate(path)
+
+        if self._copyright_validator and wants_copyright:
+            error = self._copyright_validator.check_contents(path, new_contents)
+            if error:
+                errors.append(error)
+
+        if self._link_checker and is_markdown and not parse_failed:
+            if parsed is None:
+                parsed = markdown_links.get_links(new_contents)
+            self._link_checker.link_cache.put(Path(path).resolve(), *parsed)
+            errors.extend(self._link_checker.check(path))
+        return new_contents, errors
+
+    def invalidate(self, path: str) -> None:
+        """Drops cached results for a file, such as for unwritten contents."""
+        if self._header_cache:
+            self._header_cache.invalidate(path)
+        if self._link_checker:
+            self._link_checker.link_cache.invalidate(Path(path).resolve())
+
+    def run(self, path: str) -> bool:
+        """Runs hooks on a file, returning true on errors."""
+        if not self.wants(path):
+            metrics.count("files_skipped")
+            return False
+
+        try:
+            contents = vfs.current().read(path)
+        except UnicodeDecodeError as e:
+            print("Skipping %s: %s\n" % (path, e))
+            return False
+
+        _, errors = self.check(path, contents)
+        for error in errors:
+            _print_error(path, error)
+        return bool(errors)
+
+    def dependents(self, path: str) -> List[str]:
+        """Returns checked files affected by changes to a path."""
+        if self._link_checker:
+            return self._link_checker.dependents(path)
+        return []
+
+    def refresh(self) -> None:
+        """Prepares to run again, revalidating cached files."""
+        if self._header_cache:
+            self._header_cache.refresh()
+        if self._link_checker:
+            self._link_checker.refresh()
+
+    def finish(self) -> None:
+        """Writes any outputs that cover the whole run."""
+        if self._link_checker:
+            self._link_checker.finish()
+
+
+def _setup(parsed_args: argparse.Namespace) -> Runner:
+    """Builds the runner, once per process."""
+    try:
+        return Runner(parsed_args)
+    except ValueError as e:
+        # Such as for invalid copyright patterns.
+        sys.exit(str(e))
+
+
+def _check(runner: Runner, path: str) -> bool:
+    """Checks a path, returning true on errors."""
+    return runner.run(path)
+
+
+def _dependents(runner: Runner, path: str) -> List[str]:
+    """Returns checked files affected by changes to a path."""
+    return runner.dependents(path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    if not argv:
+        argv = sys.argv
+    parsed_args = _parse_args(argv[1:])
+    if parsed_args.command == "daemon":
+        return daemon.control(parsed_args.action, parsed_args.idle_timeout)
+    return executor.run(
+        "tool-hooks",
+        parsed_args,
+        functools.partial(_setup, parsed_args),
+        _check,
+        finish=Runner.finish,
+        # These cover every checked file.
+        needs_all_files="check-links" in parsed_args.hooks
+        and bool(parsed_args.graph or parsed_args.export_anchors),
+        dependents=_dependents,
+        extra_options=(
+            check_copyright.cache_options()
+            if "check-copyright" in parsed_args.hooks
+            else None
+        ),
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
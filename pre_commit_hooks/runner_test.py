@@ -0,0 +1,161 @@
+"""Tests for runner.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import tempfile
+from typing import List
+import unittest
+from unittest import mock
+
+from pre_commit_hooks import check_google_doc_style
+from pre_commit_hooks import markdown_links
+from pre_commit_hooks import runner
+
+_COPYRIGHT = "<!--\ntest\n-->\n"
+
+
+class TestRunner(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        subprocess_patcher = mock.patch(
+            "pre_commit_hooks.check_links.subprocess.check_output",
+            return_value=self._temp_dir.name.encode(),
+        )
+        subprocess_patcher.start()
+        self.addCleanup(subprocess_patcher.stop)
+        self.addCleanup(self._temp_dir.cleanup)
+
+    def _write(self, filename: str, contents: str) -> str:
+        path = os.path.join(self._temp_dir.name, filename)
+        with open(path, "w") as f:
+            f.write(contents)
+        return path
+
+    def _read(self, path: str) -> str:
+        with open(path) as f:
+            return f.read()
+
+    def _run(self, paths: List[str], flags: List[str] = []) -> int:
+        return runner.main(["bin", "run", "--copyright=test"] + flags + paths)
+
+    def test_all_hooks(self) -> None:
+        path = self._write(
+            "a.md",
+            _COPYRIGHT + "# Doc\n\n<!-- toc --><!-- tocstop -->\n\n"
+            "## Pros and cons\n\n[Pros](#pros-and-cons)\n",
+        )
+        self.assertEqual(self._run([path]), 0)
+        self.assertEqual(
+            self._read(path),
+            _COPYRIGHT + "# Doc\n\n<!-- toc -->\n\n## Table of contents\n\n"
+            "-   [Advantages and disadvantages](#advantages-and-disadvantages)"
+            "\n\n<!-- tocstop -->\n\n"
+            "## Advantages and disadvantages\n\n"
+            "[Advantages](#advantages-and-disadvantages)\n",
+        )
+
+    def test_single_parse(self) -> None:
+        contents = (
+            _COPYRIGHT + "# Doc\n\n<!-- toc -->\n\n## Table of contents\n\n"
+            "-   [Section](#section)\n\n<!-- tocstop -->\n\n## Section\n"
+        )
+        path = self._write("a.md", contents)
+        with mock.patch(
+            "pre_commit_hooks.markdown_links.get_links",
+            wraps=markdown_links.get_links,
+        ) as get_links, mock.patch("builtins.open", wraps=open) as mock_open:
+            self.assertEqual(self._run([path]), 0)
+        get_links.assert_called_once()
+        # The file is read once, and not written because it's unchanged.
+        mock_open.assert_called_once_with(path)
+        self.assertEqual(self._read(path), contents)
+
+    def test_errors(self) -> None:
+        path = self._write("a.md", "# Doc\n\n[test](#missing)\n")
+        with mock.patch("builtins.print"), mock.patch(
+            "pre_commit_hooks.check_links.print_error"
+        ) as print_error:
+            self.assertEqual(self._run([path]), 1)
+        print_error.assert_called_once()
+
+    def test_hooks_subset(self) -> None:
+        path = self._write("a.md", "Cons\n")
+        self.assertEqual(self._run([path], ["--hooks=check-links"]), 0)
+        self.assertEqual(self._read(path), "Cons\n")
+
+    def test_non_markdown(self) -> None:
+        path = self._write("a.py", "Cons\n")
+        with mock.patch("builtins.print") as mock_print:
+            self.assertEqual(self._run([path]), 1)
+        mock_print.assert_called_once()
+        self.assertEqual(self._read(path), "Cons\n")
+
+    def test_fixed_toc_source(self) -> None:
+        # The chapter is fixed earlier in the run, so the index should list
+        # its fixed header.
+        index = self._write(
+            "index.md",
+            _COPYRIGHT + '<!-- toc src="chapter*.md" --><!-- tocstop -->\n',
+        )
+        chapter = self._write("chapter1.md", _COPYRIGHT + "# Cons\n")
+        self.assertEqual(self._run([chapter, index]), 0)
+        self.assertIn("[Disadvantages](chapter1.md)", self._read(index))
+        self.assertEqual(self._read(chapter), _COPYRIGHT + "# Disadvantages\n")
+
+    def test_style_fixed_once(self) -> None:
+        paths = [
+            self._write(
+                "%s.md" % name,
+                _COPYRIGHT + "# Repo %s\n\n<!-- toc --><!-- tocstop -->\n\n"
+                "[a](a.md#repo-a) [b](b.md#repo-b) [c](c.md)\n" % name,
+            )
+            for name in ("a", "b")
+        ]
+        self._write("c.md", _COPYRIGHT + "# Repo c\n")
+        with mock.patch.object(
+            check_google_doc_style,
+            "fix_style",
+            wraps=check_google_doc_style.fix_style,
+        ) as fix_style:
+            self._run(paths)
+        # Only checked files are fixed, not the files that they link to.
+        self.assertEqual(fix_style.call_count, 2)
+
+    def test_unchecked_link_target(self) -> None:
+        # Files outside the run aren't fixed, so links are checked against
+        # their contents as they are.
+        self._write("b.md", _COPYRIGHT + "# B\n\n## Use e.g. this\n")
+        path = self._write("a.md", _COPYRIGHT + "[x](b.md#use-eg-this)\n")
+        self.assertEqual(
+            self._run([path], ["--hooks=check-google-doc-style,check-links"]),
+            0,
+        )
+
+    def test_unknown_hook(self) -> None:
+        with mock.patch("sys.stderr"):
+            self.assertRaises(
+                SystemExit, self._run, ["a.md"], ["--hooks=unknown"]
+            )
+
+    def test_bad_header_level(self) -> None:
+        path = self._write("a.md", _COPYRIGHT + "### Cons\n")
+        with mock.patch("builtins.print") as mock_print:
+            self.assertEqual(self._run([path]), 1)
+        mock_print.assert_called_once()
+        # Style fixes are still applied.
+        self.assertEqual(self._read(path), _COPYRIGHT + "### Disadvantages\n")
@@ -0,0 +1,285 @@
+"""Records spans of hook work for --trace and --metrics-out.
+
+Spans are recorded as events in Chrome trace-event format, which load in
+chrome://tracing or https://ui.perfetto.dev, and as totals of each phase's
+time for metrics. Each checked file gets a span, with nested spans for phases
+such as parsing and file reads. Recording is off unless started, when spans
+only cost a global check.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import types
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from pre_commit_hooks import metrics
+from pre_commit_hooks import vfs
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Recorded events, or None when tracing is off.
+_events: Optional[List[Dict[str, Any]]] = None
+
+# The count, wall seconds, and CPU seconds of spans by name, or None when
+# phases aren't totaled.
+_phases: Optional[Dict[str, List[float]]] = None
+
+# Whether either of the above is recorded.
+_active = False
+
+# Guards updates to phase totals, which worker threads make concurrently.
+# Events are only appended, which is already thread-safe.
+_lock = threading.Lock()
+
+# The code of functions decorated by traced(), with their phase names, so
+# that profiles can attribute work to phases.
+phase_code: List[Tuple[str, types.CodeType]] = []
+
+# Called by checkpoint() with its caller's code, such as by memory profiles,
+# or None.
+_checkpoint_hook: Optional[Callable[[types.CodeType], None]] = None
+
+# Returned by span() when tracing is off.
+_NULL_SPAN: ContextManager[None] = contextlib.nullcontext()
+
+
+def _now_us() -> float:
+    # The monotonic clock is shared by processes, so worker timestamps line
+    # up with the main process's.
+    return time.monotonic_ns() / 1000
+
+
+class Recorded(NamedTuple):
+    events: List[Dict[str, Any]]
+    phases: Dict[str, List[float]]
+
+
+def enabled() -> bool:
+    """Returns true if spans are being recorded."""
+    return _active
+
+
+def recording() -> Tuple[bool, bool]:
+    """Returns whether events and phases are being recorded, for workers."""
+    return (_events is not None, _phases is not None)
+
+
+def start(
+    process_name: str = "main", events: bool = True, phases: bool = False
+) -> None:
+    """Starts recording, discarding anything recorded before."""
+    global _events, _phases, _active
+    _events = None
+    if events:
+        _events = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "args": {"name": process_name},
+            }
+        ]
+    _phases = {} if phases else None
+    _active = events or phases
+
+
+def stop() -> Recorded:
+    """Stops recording, returning what was recorded since the last take."""
+    global _events, _phases, _active
+    recorded = Recorded(_events or [], _phases or {})
+    _events = None
+    _phases = None
+    _active = False
+    return recorded
+
+
+def take() -> Recorded:
+    """Returns and clears what was recorded so far, such as for a worker."""
+    global _events, _phases
+    recorded = Recorded(_events or [], _phases or {})
+    if _events is not None:
+        _events = []
+    if _phases is not None:
+        _phases = {}
+    return recorded
+
+
+def add(recorded: Recorded) -> None:
+    """Adds what was recorded elsewhere, such as by workers."""
+    if _events is not None:
+        _events.extend(recorded.events)
+    if _phases is not None:
+        for name, totals in recorded.phases.items():
+            _add_phase(name, *totals)
+
+
+def _add_phase(name: str, count: float, wall: float, cpu: float) -> None:
+    phases = _phases
+    assert phases is not None
+    with _lock:
+        totals = phases.get(name)
+        if totals is None:
+            phases[name] = [count, wall, cpu]
+        else:
+            totals[0] += count
+            totals[1] += wall
+            totals[2] += cpu
+
+
+class _Span(object):
+    __slots__ = ("_name", "_args", "_start", "_start_cpu")
+
+    def __init__(self, name: str, args: Optional[Dict[str, Any]]) -> None:
+        self._name = name
+        self._args = args
+        self._start = 0.0
+        self._start_cpu = 0.0
+
+    def __enter__(self) -> None:
+        self._start = _now_us()
+        self._start_cpu = time.thread_time()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        end = _now_us()
+        if _phases is not None:
+            _add_phase(
+                self._name,
+                1,
+                (end - self._start) / 1e6,
+                time.thread_time() - self._start_cpu,
+            )
+        # Tracing may have stopped during the span.
+        if _events is None:
+            return
+        event: Dict[str, Any] = {
+            "name": self._name,
+            "ph": "X",
+            "ts": self._start,
+            "dur": end - self._start,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if self._args:
+            event["args"] = self._args
+        _events.append(event)
+
+
+def span(name: str, path: Optional[str] = None) -> ContextManager[None]:
+    """Returns a context manager recording a span, if recording."""
+    if not _active:
+        return _NULL_SPAN
+    return _Span(name, {"path": path} if path is not None else None)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorates a function to record a span for each call, if recording."""
+
+    def decorator(fn: F) -> F:
+        phase_code.append((name, fn.__code__))
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _active:
+                return fn(*args, **kwargs)
+            with _Span(name, None):
+                return fn(*args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def set_checkpoint_hook(
+    hook: Optional[Callable[[types.CodeType], None]],
+) -> None:
+    """Sets the function called at checkpoints, or None for none."""
+    global _checkpoint_hook
+    _checkpoint_hook = hook
+
+
+def checkpoint() -> None:
+    """Marks where a phase's temporary allocations are at their largest.
+
+    Allocations such as parser node trees are freed before their phase
+    returns, so memory profiles sample them here instead.
+    """
+    hook = _checkpoint_hook
+    if hook is not None:
+        hook(sys._getframe(1).f_code)
+
+
+class TracedFileSystem(vfs.FileSystem):
+    """Records spans and metrics for access to another file system."""
+
+    def __init__(self, base: vfs.FileSystem) -> None:
+        self._base = base
+
+    def read_bytes(self, path: str) -> bytes:
+        with span("read", path):
+            contents = self._base.read_bytes(path)
+        metrics.count("bytes_read", len(contents))
+        return contents
+
+    def read(self, path: str) -> str:
+        with span("read", path):
+            contents = self._base.read(path)
+        if metrics.enabled():
+            metrics.count("bytes_read", len(contents.encode()))
+        return contents
+
+    def write(self, path: str, contents: str) -> None:
+        with span("write", path):
+            self._base.write(path, contents)
+        metrics.count("rewrites")
+
+    def stat(self, path: str) -> Optional[vfs.FileStat]:
+        with span("stat", path):
+            st = self._base.stat(path)
+        metrics.count("stat_calls")
+        return st
+
+    def list(self, path: str) -> List[str]:
+        with span("list", path):
+            return self._base.list(path)
+
+    def glob(self, pattern: str) -> List[str]:
+        with span("glob", pattern):
+            return self._base.glob(pattern)
+
+
+def write(path: str, events: List[Dict[str, Any]]) -> None:
+    """Writes events as a trace file."""
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,98 @@
+"""Tests for tracing.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+
+from pre_commit_hooks import metrics
+from pre_commit_hooks import tracing
+from pre_commit_hooks import vfs
+
+
+@tracing.traced("double")
+def _double(value: int) -> int:
+    return value * 2
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self) -> None:
+        self.addCleanup(tracing.stop)
+
+    def test_off(self) -> None:
+        self.assertFalse(tracing.enabled())
+        with tracing.span("check", "a.md"):
+            pass
+        self.assertEqual(_double(2), 4)
+        self.assertEqual(tracing.take(), ([], {}))
+
+    def test_spans(self) -> None:
+        tracing.start()
+        with tracing.span("check", "a.md"):
+            self.assertEqual(_double(2), 4)
+        events = tracing.stop().events
+        self.assertEqual(
+            [(e["name"], e["ph"]) for e in events],
+            [("process_name", "M"), ("double", "X"), ("check", "X")],
+        )
+        inner, outer = events[1:]
+        self.assertEqual(outer["args"], {"path": "a.md"})
+        self.assertNotIn("args", inner)
+        # The inner span is nested in the outer one.
+        self.assertLessEqual(outer["ts"], inner["ts"])
+        self.assertLessEqual(
+            inner["ts"] + inner["dur"], outer["ts"] + outer["dur"]
+        )
+
+    def test_phases(self) -> None:
+        tracing.start(events=False, phases=True)
+        for _ in range(3):
+            with tracing.span("check"):
+                _double(2)
+        recorded = tracing.stop()
+        self.assertEqual(recorded.events, [])
+        self.assertEqual(sorted(recorded.phases), ["check", "double"])
+        count, wall, cpu = recorded.phases["check"]
+        self.assertEqual(count, 3)
+        self.assertGreaterEqual(wall, recorded.phases["double"][1])
+
+    def test_take_and_add(self) -> None:
+        tracing.start("worker", phases=True)
+        with tracing.span("check"):
+            pass
+        recorded = tracing.take()
+        self.assertEqual(len(recorded.events), 2)
+        self.assertEqual(recorded.phases["check"][0], 1)
+        self.assertEqual(tracing.take(), ([], {}))
+        tracing.add(recorded)
+        tracing.add(recorded)
+        self.assertEqual(tracing.stop().phases["check"][0], 2)
+
+    def test_file_system(self) -> None:
+        fs = tracing.TracedFileSystem(vfs.MemoryFileSystem({"/a.md": "é"}))
+        tracing.start()
+        metrics.start()
+        self.addCleanup(metrics.stop)
+        self.assertEqual(fs.read("/a.md"), "é")
+        fs.write("/a.md", "b")
+        self.assertTrue(fs.is_file("/a.md"))
+        self.assertEqual(
+            [e["name"] for e in tracing.stop().events[1:]],
+            ["read", "write", "stat"],
+        )
+        self.assertEqual(
+            metrics.stop(), {"bytes_read": 2, "rewrites": 1, "stat_calls": 1}
+        )
@@ -0,0 +1,349 @@
+"""A persistent cache of per-file hook results.
+
+Results are keyed by file contents and path, hook, effective options, and tool
+version, so the cache may be shared between repositories and CI runs. Results
+which depend on other files, such as link targets, also record hashes of those
+files' contents and are only reused while they're unchanged. Contents are
+hashed rather than stat'ed, because checkouts reset modification times.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+
+from pre_commit_hooks import vfs
+
+if TYPE_CHECKING:
+    import sqlite3
+
+_DB_NAME = "verdicts.sqlite"
+_DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_DEFAULT_MAX_AGE_DAYS = 30
+
+# Refreshing last-used times on every hit would make reads into writes, so
+# only refresh entries that haven't been used for a while.
+_TOUCH_INTERVAL_SECS = 60 * 60
+
+# Wait for other processes holding the write lock, rather than failing.
+_BUSY_TIMEOUT_MSECS = 30 * 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    key TEXT PRIMARY KEY,
+    has_errors INTEGER NOT NULL,
+    stdout TEXT NOT NULL,
+    stderr TEXT NOT NULL,
+    deps TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS verdicts_last_used ON verdicts (last_used);
+"""
+
+# Content hashes of dependencies, by path, with the fingerprint when hashed.
+_content_hashes: Dict[str, Tuple[Optional[List[int]], Optional[str]]] = {}
+
+# Paths that each thread's current check depends on, as `dependencies`, which
+# is None when not recording.
+_recording = threading.local()
+
+
+class Verdict(NamedTuple):
+    has_errors: bool
+    stdout: str
+    stderr: str
+
+
+def default_dir() -> str:
+    """Returns the default cache directory, following XDG conventions."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "pre-commit-tool-hooks")
+
+
+def depend_on(path: Union[str, "os.PathLike[str]"]) -> None:
+    """Records that the current check's result depends on a path.
+
+    This is a no-op unless results are being cached.
+    """
+    dependencies = getattr(_recording, "dependencies", None)
+    if dependencies is not None:
+        dependencies.append(os.fspath(path))
+
+
+def start_recording() -> None:
+    """Starts recording dependencies for a check in this thread."""
+    _recording.dependencies = []
+
+
+def stop_recording() -> List[str]:
+    """Stops recording dependencies, returning those recorded."""
+    dependencies: List[str] = getattr(_recording, "dependencies", None) or []
+    _recording.dependencies = None
+    return dependencies
+
+
+def fingerprint(path: str) -> Optional[List[int]]:
+    """Returns a cheap fingerprint of a path, or None if it doesn't exist.
+
+    Paths are looked up in the current file system.
+    """
+    st = vfs.current().stat(path)
+    if st is None:
+        return None
+    return [st.size, st.mtime_ns]
+
+
+def content_hash(path: str) -> Optional[str]:
+    """Returns a hash of a path's contents, or None if it doesn't exist.
+
+    Directories are hashed by their entries' names. Hashes are reused while
+    the path's fingerprint is unchanged.
+    """
+    path_fingerprint = fingerprint(path)
+    cached = _content_hashes.get(path)
+    if cached is not None and cached[0] == path_fingerprint:
+        return cached[1]
+    fs = vfs.current()
+    try:
+        if path_fingerprint is None:
+            digest = None
+        elif fs.is_dir(path):
+            names = "".join(name + "\0" for name in fs.list(path))
+            digest = hashlib.sha256(
+                b"dir\0" + names.encode("utf-8", "surrogateescape")
+            ).hexdigest()
+        else:
+            digest = hashlib.sha256(b"file\0" + fs.read_bytes(path)).hexdigest()
+    except OSError:
+        # Such as if the path was removed since its stat.
+        digest = None
+    _content_hashes[path] = (path_fingerprint, digest)
+    return digest
+
+
+def _tool_version() -> str:
+    """Returns a hash of this package's code, so that changes invalidate."""
+    package_dir = Path(__file__).parent
+    digest = hashlib.sha256()
+    for path in sorted(package_dir.glob("*.py")):
+        if not path.name.endswith("_test.py"):
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class VerdictCache(object):
+    """Stores verdicts in SQLite, in WAL mode for concurrent processes.
+
+    Connections are opened lazily and per process, so instances may be passed
+    to worker processes. Worker threads share a connection, which is used by
+    one thread at a time.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        hook: str,
+        options: Dict[str, Any],
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        max_age_days: float = _DEFAULT_MAX_AGE_DAYS,
+        repo_root: Optional[str] = None,
+    ) -> None:
+        self._path = os.path.join(cache_dir, _DB_NAME)
+        # Paths are keyed relative to this, so that clones share results.
+        self._repo_root = os.path.abspath(repo_root or os.curdir)
+        self._max_bytes = max_bytes
+        self._max_age_secs = max_age_days * 24 * 60 * 60
+        key_parts = [hook, json.dumps(options, sort_keys=True, default=str)]
+        key_parts.append(_tool_version())
+        self._key_prefix = hashlib.sha256(
+            "\0".join(key_parts).encode()
+        ).hexdigest()
+        self._conn: Optional["sqlite3.Connection"] = None
+        self._conn_pid = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> "sqlite3.Connection":
+        """Returns this process's connection, which needs self._lock held."""
+        if self._conn is None or self._conn_pid != os.getpid():
+            # Only imported when caching, because it's slow to import.
+            import sqlite3
+
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            conn = sqlite3.connect(
+                self._path,
+                timeout=_BUSY_TIMEOUT_MSECS / 1000,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def key(self, contents: bytes, path: Optional[str] = None) -> str:
+        """Returns the cache key for a file's contents and path.
+
+        Verdicts depend on the path, such as for relative links, and their
+        output names the path as given, so both the repository-relative path
+        and the path as given are keyed. Only results that depend on contents
+        alone, such as anchors, should omit the path.
+        """
+        digest = hashlib.sha256(self._key_prefix.encode())
+        if path is not None:
+            rel_path = os.path.relpath(os.path.abspath(path), self._repo_root)
+            for part in (rel_path, path):
+                digest.update(part.encode("utf-8", "surrogateescape"))
+                digest.update(b"\0")
+        digest.update(contents)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Verdict]:
+        """Returns a verdict if cached and its dependencies are unchanged."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT has_errors, stdout, stderr, deps, last_used "
+                    "FROM verdicts WHERE key = ?",
+                    (key,),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        has_errors, stdout, stderr, deps, last_used = row
+        for rel_path, dep_hash in json.loads(deps):
+            path = os.path.join(self._repo_root, rel_path)
+            if content_hash(path) != dep_hash:
+                return None
+        now = time.time()
+        if now - last_used > _TOUCH_INTERVAL_SECS:
+            with self._lock:
+                self._connect().execute(
+                    "UPDATE verdicts SET last_used = ? WHERE key = ?",
+                    (now, key),
+                )
+        return Verdict(bool(has_errors), stdout, stderr)
+
+    def put(self, key: str, verdict: Verdict, dependencies: List[str]) -> None:
+        """Stores a verdict, with content hashes of its dependencies.
+
+        Dependencies are stored relative to the repository root, so that
+        clones share results.
+        """
+        deps = json.dumps(
+            [
+                [
+                    os.path.relpath(os.path.abspath(path), self._repo_root),
+                    content_hash(path),
+                ]
+                for path in sorted(set(dependencies))
+            ]
+        )
+        size = len(key) + len(verdict.stdout) + len(verdict.stderr) + len(deps)
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    int(verdict.has_errors),
+                    verdict.stdout,
+                    verdict.stderr,
+                    deps,
+                    size,
+                    time.time(),
+                ),
+            )
+
+    def get_anchors(self, key: str) -> Optional[List[str]]:
+        """Returns anchors stored by put_anchors, if any."""
+        verdict = self.get(key)
+        if verdict is None:
+            return None
+        anchors: List[str] = json.loads(verdict.stdout)
+        return anchors
+
+    def put_anchors(self, key: str, anchors: List[str]) -> None:
+        """Stores a document's anchors, so that link targets needn't be parsed.
+
+        Anchors are stored as a verdict's output, so that they're evicted in
+        the same way.
+        """
+        self.put(key, Verdict(False, json.dumps(anchors), ""), [])
+
+    def prune(self) -> None:
+        """Evicts entries by age, then least recently used entries by size."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "DELETE FROM verdicts WHERE last_used < ?",
+                (time.time() - self._max_age_secs,),
+            )
+            (total_size,) = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM verdicts"
+            ).fetchone()
+            if total_size > self._max_bytes:
+                # Evict down to 90% of the limit, so that pruning isn't needed
+                # again on every run.
+                excess = total_size - self._max_bytes * 9 // 10
+                conn.execute(
+                    "DELETE FROM verdicts WHERE key IN ("
+                    "  SELECT key FROM ("
+                    "    SELECT key, size,"
+                    "      SUM(size) OVER (ORDER BY last_used, key)"
+                    "        AS running_size"
+                    "    FROM verdicts"
+                    "  ) WHERE running_size - size < ?"
+                    ")",
+                    (excess,),
+                )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
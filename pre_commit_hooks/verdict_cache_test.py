@@ -0,0 +1,166 @@
+"""Tests for verdict_cache.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, List
+import unittest
+from unittest import mock
+
+from pre_commit_hooks import verdict_cache
+
+
+class TestVerdictCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+
+    def _cache(self, **kwargs: Any) -> verdict_cache.VerdictCache:
+        cache = verdict_cache.VerdictCache(
+            self._temp_dir.name, "hook", {"option": 1}, **kwargs
+        )
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_keys(self) -> None:
+        cache = self._cache()
+        self.assertEqual(cache.key(b"a"), cache.key(b"a"))
+        self.assertNotEqual(cache.key(b"a"), cache.key(b"b"))
+        other_hook = verdict_cache.VerdictCache(
+            self._temp_dir.name, "other", {"option": 1}
+        )
+        self.assertNotEqual(cache.key(b"a"), other_hook.key(b"a"))
+        other_options = verdict_cache.VerdictCache(
+            self._temp_dir.name, "hook", {"option": 2}
+        )
+        self.assertNotEqual(cache.key(b"a"), other_options.key(b"a"))
+
+    def test_path_keys(self) -> None:
+        cache = self._cache()
+        self.assertEqual(cache.key(b"a", "a.md"), cache.key(b"a", "a.md"))
+        self.assertNotEqual(cache.key(b"a", "a.md"), cache.key(b"a", "b.md"))
+        self.assertNotEqual(cache.key(b"a", "a.md"), cache.key(b"a"))
+        # Paths are relative to the repository, so that clones share keys.
+        keys = []
+        for repo_root in ("/one", "/two"):
+            clone = verdict_cache.VerdictCache(
+                self._temp_dir.name, "hook", {"option": 1}, repo_root=repo_root
+            )
+            with mock.patch("os.getcwd", return_value=repo_root):
+                keys.append(clone.key(b"a", "a.md"))
+                keys.append(clone.key(b"a", "sub/../a.md"))
+        self.assertEqual(keys[0], keys[2])
+        # Output names the path as given, so it's keyed too.
+        self.assertNotEqual(keys[0], keys[1])
+
+    def test_get_put(self) -> None:
+        cache = self._cache()
+        key = cache.key(b"contents")
+        self.assertIsNone(cache.get(key))
+        verdict = verdict_cache.Verdict(True, "out", "err")
+        cache.put(key, verdict, [])
+        self.assertEqual(cache.get(key), verdict)
+        # Other connections, such as other processes, see the verdict.
+        self.assertEqual(self._cache().get(key), verdict)
+
+    def test_dependencies(self) -> None:
+        dep_path = os.path.join(self._temp_dir.name, "dep.md")
+        cache = self._cache()
+        key = cache.key(b"contents")
+        verdict = verdict_cache.Verdict(False, "", "")
+        # Missing dependencies are hashed too.
+        cache.put(key, verdict, [dep_path])
+        self.assertEqual(cache.get(key), verdict)
+        with open(dep_path, "w") as f:
+            f.write("changed")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, verdict, [dep_path])
+        self.assertEqual(cache.get(key), verdict)
+
+    def test_dependencies_checkout(self) -> None:
+        # Clones checked out elsewhere, with new modification times, share
+        # results.
+        verdict = verdict_cache.Verdict(False, "", "")
+        keys: List[str] = []
+        for name in ("one", "two"):
+            repo_root = os.path.join(self._temp_dir.name, name)
+            os.makedirs(os.path.join(repo_root, "sub"))
+            dep_path = os.path.join(repo_root, "dep.md")
+            with open(dep_path, "w") as f:
+                f.write("dep")
+            os.utime(dep_path, ns=(0, len(keys)))
+            cache = self._cache(repo_root=repo_root)
+            with mock.patch("os.getcwd", return_value=repo_root):
+                key = cache.key(b"contents", "a.md")
+            if not keys:
+                cache.put(key, verdict, [dep_path, repo_root])
+            keys.append(key)
+            self.assertEqual(cache.get(key), verdict)
+        self.assertEqual(keys[0], keys[1])
+        # Directories are hashed by their entries.
+        os.makedirs(os.path.join(self._temp_dir.name, "two", "new"))
+        self.assertIsNone(cache.get(keys[1]))
+
+    def test_recording(self) -> None:
+        verdict_cache.depend_on("ignored")
+        verdict_cache.start_recording()
+        verdict_cache.depend_on("a")
+        self.assertEqual(verdict_cache.stop_recording(), ["a"])
+        self.assertEqual(verdict_cache.stop_recording(), [])
+
+    def test_prune_age(self) -> None:
+        cache = self._cache(max_age_days=1)
+        old_key = cache.key(b"old")
+        new_key = cache.key(b"new")
+        verdict = verdict_cache.Verdict(False, "", "")
+        with mock.patch("time.time", return_value=time.time() - 2 * 86400):
+            cache.put(old_key, verdict, [])
+        cache.put(new_key, verdict, [])
+        cache.prune()
+        self.assertIsNone(cache.get(old_key))
+        self.assertEqual(cache.get(new_key), verdict)
+
+    def test_prune_size(self) -> None:
+        cache = self._cache(max_bytes=1000)
+        keys = [cache.key(b"%d" % i) for i in range(5)]
+        now = time.time()
+        for i, key in enumerate(keys):
+            with mock.patch("time.time", return_value=now + i):
+                cache.put(key, verdict_cache.Verdict(True, "x" * 200, ""), [])
+        cache.prune()
+        # Least recently used entries are evicted to get under the limit.
+        self.assertEqual(
+            [cache.get(key) is not None for key in keys],
+            [False, False, True, True, True],
+        )
+
+    def test_pickle(self) -> None:
+        cache = self._cache()
+        key = cache.key(b"contents")
+        cache.put(key, verdict_cache.Verdict(False, "", ""), [])
+        unpickled = pickle.loads(pickle.dumps(cache))
+        self.addCleanup(unpickled.close)
+        self.assertIsNotNone(unpickled.get(key))
+
+    def test_default_dir(self) -> None:
+        with mock.patch.dict(os.environ, {"XDG_CACHE_HOME": "/xdg"}):
+            self.assertEqual(
+                verdict_cache.default_dir(), "/xdg/pre-commit-tool-hooks"
+            )
@@ -0,0 +1,388 @@
+"""File systems that hooks read and write files through.
+
+Hooks use the current file system rather than the disk directly, so that
+callers such as editor integrations and tests can check in-memory contents,
+or staged contents from the git index, without writing files. Outputs that
+aren't hook inputs, such as caches and --graph files, always use the disk.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import abc
+import contextlib
+import errno
+import fnmatch
+import glob
+import io
+import os
+import re
+import stat
+import threading
+from typing import (
+    Dict,
+    IO,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+if TYPE_CHECKING:
+    import subprocess
+
+# Matches glob patterns which need matching against directory listings.
+_MAGIC_RE = re.compile(r"[*?[]")
+
+# The mode of submodules in `git ls-files --stage`, whose IDs are commits.
+_GITLINK_MODE = b"160000"
+
+
+class FileStat(NamedTuple):
+    size: int
+    # Changes whenever contents do; a version for files not on disk.
+    mtime_ns: int
+    is_dir: bool
+
+
+def _not_found(path: str) -> OSError:
+    return FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+
+
+class FileSystem(abc.ABC):
+    """The interface for file systems.
+
+    Paths are as given to hooks, so may be relative to the current directory.
+    """
+
+    @abc.abstractmethod
+    def read_bytes(self, path: str) -> bytes:
+        raise NotImplementedError
+
+    def read(self, path: str) -> str:
+        """Reads a text file, decoding it as `open` would."""
+        with io.TextIOWrapper(io.BytesIO(self.read_bytes(path))) as f:
+            return f.read()
+
+    @abc.abstractmethod
+    def write(self, path: str, contents: str) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def stat(self, path: str) -> Optional[FileStat]:
+        """Returns the file or directory's stat, or None if it's missing."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def list(self, path: str) -> List[str]:
+        """Returns the sorted names of entries in a directory."""
+        raise NotImplementedError
+
+    def is_file(self, path: str) -> bool:
+        st = self.stat(path)
+        return st is not None and not st.is_dir
+
+    def is_dir(self, path: str) -> bool:
+        st = self.stat(path)
+        return st is not None and st.is_dir
+
+    def glob(self, pattern: str) -> List[str]:
+        """Returns paths matching a pattern, as `glob.glob` would."""
+        if not _MAGIC_RE.search(pattern):
+            return [pattern] if self.stat(pattern) else []
+        dirname, basename = os.path.split(pattern)
+        if _MAGIC_RE.search(dirname):
+            dirnames = [d for d in self.glob(dirname) if self.is_dir(d)]
+        else:
+            dirnames = [dirname]
+        matches = []
+        for dirname in dirnames:
+            try:
+                names = self.list(dirname or os.curdir)
+            except OSError:
+                continue
+            for name in names:
+                # As with glob.glob, hidden files need an explicit `.`.
+                if name.startswith(".") and not basename.startswith("."):
+                    continue
+                if fnmatch.fnmatch(name, basename):
+                    matches.append(os.path.join(dirname, name))
+        return matches
+
+
+class DiskFileSystem(FileSystem):
+    """Files on disk.
+
+    Files are rewritten in place, keeping their links, owner, and mode. So
+    that worker threads never read a partially written file, such as for its
+    anchors, reads and writes through one instance are serialized.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def read_bytes(self, path: str) -> bytes:
+        with self._lock, open(path, "rb") as f:
+            return f.read()
+
+    def read(self, path: str) -> str:
+        with self._lock, open(path) as f:
+            return f.read()
+
+    def write(self, path: str, contents: str) -> None:
+        with self._lock, open(path, "w") as f:
+            f.write(contents)
+
+    def stat(self, path: str) -> Optional[FileStat]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return FileStat(st.st_size, st.st_mtime_ns, stat.S_ISDIR(st.st_mode))
+
+    def list(self, path: str) -> List[str]:
+        return sorted(os.listdir(path))
+
+    def glob(self, pattern: str) -> List[str]:
+        return glob.glob(pattern)
+
+
+class MemoryFileSystem(FileSystem):
+    """Files held in memory, optionally layered over another file system.
+
+    Writes only change memory, so with a base file system, written files
+    shadow the base's files.
+    """
+
+    def __init__(
+        self,
+        files: Optional[Dict[str, str]] = None,
+        base: Optional[FileSystem] = None,
+    ) -> None:
+        self._base = base
+        # Contents and versions of files, by absolute path.
+        self._files: Dict[str, Tuple[str, int]] = {}
+        # Versions of directories containing files, which change when files
+        # are added.
+        self._dirs: Dict[str, int] = {}
+        self._version = 0
+        for path, contents in (files or {}).items():
+            self.write(path, contents)
+
+    def read_bytes(self, path: str) -> bytes:
+        return self.read(path).encode()
+
+    def read(self, path: str) -> str:
+        entry = self._files.get(os.path.abspath(path))
+        if entry is not None:
+            return entry[0]
+        if self._base:
+            return self._base.read(path)
+        raise _not_found(path)
+
+    def write(self, path: str, contents: str) -> None:
+        key = os.path.abspath(path)
+        self._version += 1
+        if key not in self._files:
+            parent = os.path.dirname(key)
+            while True:
+                self._dirs[parent] = self._version
+                if os.path.dirname(parent) == parent:
+                    break
+                parent = os.path.dirname(parent)
+        self._files[key] = (contents, self._version)
+
+    def stat(self, path: str) -> Optional[FileStat]:
+        key = os.path.abspath(path)
+        entry = self._files.get(key)
+        if entry is not None:
+            return FileStat(len(entry[0].encode()), entry[1], False)
+        base_stat = self._base.stat(path) if self._base else None
+        if key in self._dirs:
+            version = self._dirs[key]
+            if base_stat:
+                # Changes to either layer change the directory.
+                version ^= base_stat.mtime_ns
+            return FileStat(0, version, True)
+        return base_stat
+
+    def list(self, path: str) -> List[str]:
+        key = os.path.abspath(path)
+        names: Set[str] = set()
+        if self._base and self._base.is_dir(path):
+            names.update(self._base.list(path))
+        elif key not in self._dirs:
+            raise _not_found(path)
+        for child in list(self._files) + list(self._dirs):
+            if os.path.dirname(child) == key and child != key:
+                names.add(os.path.basename(child))
+        return sorted(names)
+
+
+class GitIndexFileSystem(FileSystem):
+    """Read-only staged files from a git repository's index.
+
+    To check staged files with hooks that rewrite files, layer a
+    MemoryFileSystem over this, which keeps rewrites in memory.
+    """
+
+    # `git cat-file` processes for each mode, started on first use.
+    _cat_files: Dict[str, "subprocess.Popen[bytes]"]
+
+    def __init__(self, repo_root: Optional[str] = None) -> None:
+        # Only imported when needed, because it's slow to import.
+        import subprocess
+
+        if repo_root is None:
+            repo_root = (
+                subprocess.check_output(["git", "rev-parse", "--show-toplevel"])
+                .rstrip()
+                .decode("utf-8")
+            )
+        self._repo_root = repo_root
+        # Blob IDs of staged files, and the directories containing them, by
+        # path relative to the repository root.
+        self._blobs: Dict[str, str] = {}
+        self._dirs: Set[str] = {""}
+        output = subprocess.check_output(
+            ["git", "ls-files", "--stage", "-z"], cwd=repo_root
+        )
+        for record in output.split(b"\0"):
+            if not record:
+                continue
+            info, rel_path = record.split(b"\t", 1)
+            mode, blob, stage = info.split()
+            path = os.fsdecode(rel_path)
+            if mode == _GITLINK_MODE:
+                # Submodules are checked out as directories, but their files
+                # aren't in this index.
+                self._dirs.add(path)
+            elif path not in self._blobs or stage == b"0":
+                # Only stage 0 is present unless there are merge conflicts,
+                # when the first stage is used.
+                self._blobs[path] = blob.decode()
+            parent = os.path.dirname(path)
+            while parent not in self._dirs:
+                self._dirs.add(parent)
+                parent = os.path.dirname(parent)
+        self._cat_files = {}
+
+    def _rel_path(self, path: str) -> Optional[str]:
+        """Returns path relative to the repository, or None if outside it."""
+        rel_path = os.path.relpath(os.path.abspath(path), self._repo_root)
+        if rel_path == os.curdir:
+            return ""
+        if rel_path.split(os.sep, 1)[0] == os.pardir:
+            return None
+        return rel_path.replace(os.sep, "/")
+
+    def _cat_file(
+        self, mode: str, blob: str, path: str
+    ) -> Tuple[int, IO[bytes]]:
+        """Looks up a path's blob with `git cat-file --<mode>`.
+
+        Returns the blob's size, and the output to read any contents from.
+        Raises FileNotFoundError if the blob is missing from the repository.
+        """
+        cat_file = self._cat_files.get(mode)
+        if cat_file is None:
+            import subprocess
+
+            cat_file = self._cat_files[mode] = subprocess.Popen(
+                ["git", "cat-file", f"--{mode}"],
+                cwd=self._repo_root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        stdin: IO[bytes] = cat_file.stdin  # type: ignore[assignment]
+        stdout: IO[bytes] = cat_file.stdout  # type: ignore[assignment]
+        stdin.write(blob.encode() + b"\n")
+        stdin.flush()
+        # Responses start with a `<blob> blob <size>` line, or are a
+        # `<blob> missing` line.
+        response = stdout.readline().split()
+        if len(response) != 3:
+            raise _not_found(path)
+        return (int(response[2]), stdout)
+
+    def read_bytes(self, path: str) -> bytes:
+        rel_path = self._rel_path(path)
+        blob = self._blobs.get(rel_path) if rel_path is not None else None
+        if blob is None:
+            raise _not_found(path)
+        size, stdout = self._cat_file("batch", blob, path)
+        contents = stdout.read(size)
+        # Contents are followed by a newline.
+        stdout.read(1)
+        return contents
+
+    def write(self, path: str, contents: str) -> None:
+        raise OSError(errno.EROFS, "The git index is read-only", path)
+
+    def stat(self, path: str) -> Optional[FileStat]:
+        rel_path = self._rel_path(path)
+        if rel_path is None:
+            return None
+        blob = self._blobs.get(rel_path)
+        if blob is not None:
+            try:
+                size, _ = self._cat_file("batch-check", blob, path)
+            except FileNotFoundError:
+                # Such as in partial clones, or for corrupt indexes.
+                return None
+            # Blob IDs change with contents, so serve as versions.
+            return FileStat(size, int(blob[:15], 16), False)
+        if rel_path in self._dirs:
+            return FileStat(0, 0, True)
+        return None
+
+    def list(self, path: str) -> List[str]:
+        rel_path = self._rel_path(path)
+        if rel_path not in self._dirs:
+            raise _not_found(path)
+        names = set()
+        for child in list(self._blobs) + list(self._dirs):
+            if child and os.path.dirname(child) == rel_path:
+                names.add(os.path.basename(child))
+        return sorted(names)
+
+    def close(self) -> None:
+        for cat_file in self._cat_files.values():
+            cat_file.communicate()
+        self._cat_files.clear()
+
+
+_current: FileSystem = DiskFileSystem()
+
+
+def current() -> FileSystem:
+    """Returns the file system that hooks should use."""
+    return _current
+
+
+@contextlib.contextmanager
+def use(fs: FileSystem) -> Iterator[FileSystem]:
+    """Makes hooks use fs within the context."""
+    global _current
+    previous = _current
+    _current = fs
+    try:
+        yield fs
+    finally:
+        _current = previous
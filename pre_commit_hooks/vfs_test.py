@@ -0,0 +1,213 @@
+"""Tests for vfs.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from pre_commit_hooks import markdown_toc
+from pre_commit_hooks import vfs
+
+
+class TestMemoryFileSystem(unittest.TestCase):
+    def test_read_write(self) -> None:
+        fs = vfs.MemoryFileSystem({"/docs/a.md": "a"})
+        self.assertEqual(fs.read("/docs/a.md"), "a")
+        self.assertEqual(fs.read_bytes("/docs/a.md"), b"a")
+        with self.assertRaises(FileNotFoundError):
+            fs.read("/docs/b.md")
+
+        before = fs.stat("/docs/a.md")
+        fs.write("/docs/a.md", "b")
+        self.assertNotEqual(fs.stat("/docs/a.md"), before)
+        self.assertEqual(fs.read("/docs/a.md"), "b")
+
+    def test_dirs(self) -> None:
+        fs = vfs.MemoryFileSystem({"/docs/sub/a.md": "a", "/docs/b.md": "b"})
+        self.assertTrue(fs.is_dir("/docs"))
+        self.assertTrue(fs.is_file("/docs/b.md"))
+        self.assertFalse(fs.is_file("/docs/sub"))
+        self.assertIsNone(fs.stat("/other"))
+        self.assertEqual(fs.list("/docs"), ["b.md", "sub"])
+        with self.assertRaises(FileNotFoundError):
+            fs.list("/other")
+        # Adding files changes the directory.
+        before = fs.stat("/docs")
+        fs.write("/docs/c.md", "c")
+        self.assertNotEqual(fs.stat("/docs"), before)
+
+    def test_glob(self) -> None:
+        fs = vfs.MemoryFileSystem(
+            {
+                "/docs/a.md": "",
+                "/docs/b.txt": "",
+                "/docs/.hidden.md": "",
+                "/docs/sub/c.md": "",
+            }
+        )
+        self.assertEqual(fs.glob("/docs/*.md"), ["/docs/a.md"])
+        self.assertEqual(fs.glob("/docs/*/*.md"), ["/docs/sub/c.md"])
+        self.assertEqual(fs.glob("/docs/b.txt"), ["/docs/b.txt"])
+        self.assertEqual(fs.glob("/other/*.md"), [])
+
+    def test_base(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            disk_path = os.path.join(temp_dir, "disk.md")
+            with open(disk_path, "w") as f:
+                f.write("disk")
+            memory_path = os.path.join(temp_dir, "memory.md")
+            fs = vfs.MemoryFileSystem(
+                {memory_path: "memory"}, base=vfs.DiskFileSystem()
+            )
+            self.assertEqual(fs.read(disk_path), "disk")
+            self.assertEqual(fs.list(temp_dir), ["disk.md", "memory.md"])
+            # Writes shadow the base, rather than changing it.
+            fs.write(disk_path, "changed")
+            self.assertEqual(fs.read(disk_path), "changed")
+            with open(disk_path) as f:
+                self.assertEqual(f.read(), "disk")
+            self.assertFalse(os.path.exists(memory_path))
+
+    def test_hook(self) -> None:
+        fs = vfs.MemoryFileSystem(
+            {
+                "/guide/index.md": '<!-- toc src="ch*.md" -->\n'
+                "<!-- tocstop -->\n",
+                "/guide/ch1.md": "# One\n\n## Setup\n",
+            }
+        )
+        with vfs.use(fs):
+            self.assertIs(vfs.current(), fs)
+            self.assertFalse(
+                markdown_toc._update_toc(
+                    "/guide/index.md", markdown_toc.HeaderCache()
+                )
+            )
+        self.assertIsInstance(vfs.current(), vfs.DiskFileSystem)
+        self.assertEqual(
+            fs.read("/guide/index.md"),
+            '<!-- toc src="ch*.md" -->\n'
+            "\n"
+            "-   [One](ch1.md)\n"
+            "    -   [Setup](ch1.md#setup)\n"
+            "\n"
+            "<!-- tocstop -->\n",
+        )
+
+
+class TestDiskFileSystem(unittest.TestCase):
+    def test_write(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "run.sh")
+            with open(path, "w") as f:
+                f.write("old")
+            os.chmod(path, 0o750)
+            link_path = os.path.join(temp_dir, "link.sh")
+            os.symlink(path, link_path)
+            hardlink_path = os.path.join(temp_dir, "hardlink.sh")
+            os.link(path, hardlink_path)
+            fs = vfs.DiskFileSystem()
+            fs.write(link_path, "new")
+            # The file is rewritten in place, keeping its links and mode.
+            self.assertTrue(os.path.islink(link_path))
+            self.assertEqual(fs.read(path), "new")
+            self.assertEqual(fs.read(hardlink_path), "new")
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o750)
+            fs.write(os.path.join(temp_dir, "new.md"), "created")
+            self.assertEqual(
+                sorted(os.listdir(temp_dir)),
+                ["hardlink.sh", "link.sh", "new.md", "run.sh"],
+            )
+
+
+@unittest.skipUnless(shutil.which("git"), "Requires git")
+class TestGitIndexFileSystem(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self._repo_root = os.path.realpath(temp_dir.name)
+        subprocess.check_call(["git", "init", "-q"], cwd=self._repo_root)
+        os.mkdir(os.path.join(self._repo_root, "docs"))
+        self._path = os.path.join(self._repo_root, "docs", "a.md")
+        self._write("staged")
+        # Names starting with `..` are still in the repository.
+        with open(os.path.join(self._repo_root, "..notes.md"), "w") as f:
+            f.write("notes")
+        subprocess.check_call(["git", "add", "."], cwd=self._repo_root)
+        # Unstaged changes aren't visible.
+        self._write("unstaged!")
+        self._fs = vfs.GitIndexFileSystem(self._repo_root)
+        self.addCleanup(self._fs.close)
+
+    def _write(self, contents: str) -> None:
+        with open(self._path, "w") as f:
+            f.write(contents)
+
+    def test_read(self) -> None:
+        self.assertEqual(self._fs.read(self._path), "staged")
+        self.assertEqual(self._fs.read(self._path), "staged")
+        with self.assertRaises(FileNotFoundError):
+            self._fs.read(os.path.join(self._repo_root, "missing.md"))
+        with self.assertRaises(OSError):
+            self._fs.write(self._path, "changed")
+
+    def test_stat(self) -> None:
+        st = self._fs.stat(self._path)
+        assert st is not None
+        self.assertEqual((st.size, st.is_dir), (6, False))
+        self.assertTrue(self._fs.is_dir(os.path.join(self._repo_root, "docs")))
+        self.assertTrue(self._fs.is_dir(self._repo_root))
+        self.assertIsNone(self._fs.stat("/"))
+        self.assertEqual(self._fs.list(self._repo_root), ["..notes.md", "docs"])
+        self.assertEqual(
+            self._fs.read(os.path.join(self._repo_root, "..notes.md")), "notes"
+        )
+        self.assertEqual(
+            self._fs.glob(os.path.join(self._repo_root, "*", "*.md")),
+            [self._path],
+        )
+
+    def test_missing_objects(self) -> None:
+        # Submodules are staged as commits, which aren't in this repository.
+        for cacheinfo in (
+            "160000,%s,docs/sub" % ("1" * 40),
+            "100644,%s,docs/gone.md" % ("2" * 40),
+        ):
+            subprocess.check_call(
+                ["git", "update-index", "--add", "--cacheinfo", cacheinfo],
+                cwd=self._repo_root,
+            )
+        fs = vfs.GitIndexFileSystem(self._repo_root)
+        self.addCleanup(fs.close)
+        sub_path = os.path.join(self._repo_root, "docs", "sub")
+        self.assertTrue(fs.is_dir(sub_path))
+        self.assertEqual(fs.list(sub_path), [])
+        gone_path = os.path.join(self._repo_root, "docs", "gone.md")
+        self.assertIsNone(fs.stat(gone_path))
+        with self.assertRaises(FileNotFoundError):
+            fs.read(gone_path)
+        # The cat-file processes still answer after missing objects.
+        self.assertEqual(fs.read(self._path), "staged")
+
+    def test_layered(self) -> None:
+        fs = vfs.MemoryFileSystem(base=self._fs)
+        fs.write(self._path, "fixed")
+        self.assertEqual(fs.read(self._path), "fixed")
+        self.assertEqual(self._fs.read(self._path), "staged")
@@ -0,0 +1,195 @@
+"""Watches a directory tree for changed files, using Linux inotify.
+
+inotify is called through ctypes, so that watching needs no dependencies.
+Events are debounced, because editors often write a file in several steps.
+"""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import ctypes
+import os
+import select
+import struct
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# Flags from <sys/inotify.h>.
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+# Changes are reported when writes finish, rather than on each write.
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_ONLYDIR
+)
+
+# The fixed part of struct inotify_event: wd, mask, cookie, and len.
+_EVENT = struct.Struct("iIII")
+
+_READ_SIZE = 64 * 1024
+
+# Changes are reported once no events have arrived for this long.
+_DEBOUNCE_SECS = 0.1
+
+# Directories which are never watched.
+_SKIP_DIRS = frozenset((".git",))
+
+
+def walk_files(directory: str) -> Iterator[str]:
+    """Yields files under a directory, as watched by Watcher."""
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(d for d in dirnames if d not in _SKIP_DIRS)
+        for filename in sorted(filenames):
+            yield os.path.join(dirpath, filename)
+
+
+class _Inotify(object):
+    """A minimal wrapper of an inotify file descriptor."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify isn't supported on this platform")
+        self._libc = libc
+        self._fd = self._call(libc.inotify_init1, _IN_NONBLOCK | _IN_CLOEXEC)
+
+    def _call(self, func: Callable[..., int], *args: object) -> int:
+        result = func(*args)
+        if result < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return result
+
+    def add_watch(self, path: str) -> int:
+        """Watches a directory, returning its watch descriptor."""
+        return self._call(
+            self._libc.inotify_add_watch,
+            self._fd,
+            os.fsencode(path),
+            _WATCH_MASK,
+        )
+
+    def read(self, timeout: Optional[float]) -> List[Tuple[int, int, str]]:
+        """Returns (wd, mask, name) events, waiting up to timeout for any."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            buf = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, length = _EVENT.unpack_from(buf, offset)
+            start = offset + _EVENT.size
+            offset = start + length
+            name = buf[start:offset].rstrip(b"\0")
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class Watcher(object):
+    """Reports changed files under a directory tree.
+
+    inotify watches aren't recursive, so each directory is watched, including
+    directories created while watching.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+        self._inotify = _Inotify()
+        # Watched directories, by watch descriptor.
+        self._dirs: Dict[int, str] = {}
+        for _ in self._add_tree(directory):
+            pass
+
+    def _add_tree(self, directory: str) -> Iterator[str]:
+        """Watches a directory and its subdirectories, yielding their files."""
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = sorted(d for d in dirnames if d not in _SKIP_DIRS)
+            try:
+                self._dirs[self._inotify.add_watch(dirpath)] = dirpath
+            except OSError:
+                # Removed since it was listed.
+                continue
+            for filename in filenames:
+                yield os.path.join(dirpath, filename)
+
+    def _handle(
+        self, events: List[Tuple[int, int, str]], changed: Set[str]
+    ) -> None:
+        """Adds paths changed by events to changed."""
+        for wd, mask, name in events:
+            if mask & _IN_Q_OVERFLOW:
+                # Events were dropped, so anything may have changed.
+                changed.update(walk_files(self._directory))
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            dirpath = self._dirs.get(wd)
+            if dirpath is None:
+                continue
+            if name in _SKIP_DIRS:
+                continue
+            path = os.path.join(dirpath, name)
+            if not mask & _IN_ISDIR:
+                changed.add(path)
+            elif mask & (_IN_CREATE | _IN_MOVED_TO):
+                # Files may be written before the directory is watched.
+                changed.update(self._add_tree(path))
+            elif mask & _IN_MOVED_FROM:
+                # Moved directories stay watched, but under a stale path.
+                prefix = path + os.sep
+                for moved_wd, moved_dir in list(self._dirs.items()):
+                    if moved_dir == path or moved_dir.startswith(prefix):
+                        del self._dirs[moved_wd]
+
+    def changes(self) -> Iterator[Set[str]]:
+        """Yields sets of changed paths, waiting for each.
+
+        Paths include deleted files, which callers may need to handle.
+        """
+        while True:
+            changed: Set[str] = set()
+            self._handle(self._inotify.read(None), changed)
+            while True:
+                events = self._inotify.read(_DEBOUNCE_SECS)
+                if not events:
+                    break
+                self._handle(events, changed)
+            if changed:
+                yield changed
+
+    def close(self) -> None:
+        self._inotify.close()
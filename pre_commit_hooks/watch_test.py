@@ -0,0 +1,70 @@
+"""Tests for watch.py."""
+
+__copyright__ = """
+Copyright 2026 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+from pre_commit_hooks import watch
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "Requires inotify")
+class TestWatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+        os.mkdir(os.path.join(self._temp_dir.name, ".git"))
+        self._watcher = watch.Watcher(self._temp_dir.name)
+        self.addCleanup(self._watcher.close)
+        self._changes = self._watcher.changes()
+
+    def _write(self, filename: str) -> str:
+        path = os.path.join(self._temp_dir.name, filename)
+        with open(path, "w") as f:
+            f.write(filename)
+        return path
+
+    def test_changes(self) -> None:
+        path = self._write("a.md")
+        self.assertEqual(next(self._changes), {path})
+        os.unlink(path)
+        self.assertEqual(next(self._changes), {path})
+
+    def test_debounce(self) -> None:
+        paths = {self._write("a.md"), self._write("b.md")}
+        self._write("a.md")
+        self.assertEqual(next(self._changes), paths)
+
+    def test_new_directory(self) -> None:
+        os.mkdir(os.path.join(self._temp_dir.name, "sub"))
+        path = self._write(os.path.join("sub", "a.md"))
+        self.assertIn(path, next(self._changes))
+        # The new directory is watched.
+        path = self._write(os.path.join("sub", "b.md"))
+        self.assertEqual(next(self._changes), {path})
+
+    def test_skip_dirs(self) -> None:
+        self._write(os.path.join(".git", "index"))
+        path = self._write("a.md")
+        self.assertEqual(next(self._changes), {path})
+
+    def test_walk_files(self) -> None:
+        path = self._write("a.md")
+        self._write(os.path.join(".git", "index"))
+        self.assertEqual(list(watch.walk_files(self._temp_dir.name)), [path])